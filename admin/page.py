@@ -0,0 +1,106 @@
+"""Módulo de administração da aplicação utilizando Streamlit.
+
+Este módulo fornece um painel restrito a administradores com as métricas de
+latência das consultas ao banco de dados, permitindo identificar quais
+páginas e funções concentram a carga no banco.
+
+Funcionalidades principais:
+    - Tabela de estatísticas por função de origem da consulta
+    - Exportação das métricas em JSON
+    - Reinício da coleta de métricas
+    - Estado dos disjuntores (circuit breakers) de cada servidor
+
+Dependências:
+    - streamlit: Para criação da interface web
+    - db.metrics: Para leitura e exportação das métricas coletadas
+    - db.conn.breaker_states: Estado dos disjuntores das conexões
+
+Configuração:
+    - ADMIN_USER_IDS: IDs de usuários administradores, separados por vírgula
+"""
+
+import os
+import streamlit as st
+from db import metrics
+from db.conn import breaker_states
+
+
+def is_admin(user_id):
+    """Verifica se o usuário está configurado como administrador.
+
+    Args:
+        user_id (int): ID do usuário logado.
+
+    Returns:
+        bool: True se o ID estiver em ADMIN_USER_IDS.
+
+    Example:
+        >>> is_admin(1)
+    """
+    admin_ids = {
+        item.strip() for item in os.getenv("ADMIN_USER_IDS", "").split(",") if item
+    }
+    return str(user_id) in admin_ids
+
+
+def db_metrics_page():
+    """Renderiza o painel de métricas das consultas ao banco de dados.
+
+    Returns:
+        None: A função não retorna valor, mas atualiza a interface do Streamlit.
+    """
+    if not is_admin(st.session_state.get("user_id")):
+        st.error("Acesso restrito a administradores.")
+        return
+
+    st.markdown(
+        """
+        <h1 style='text-align: center;'>📊 Métricas do Banco de Dados</h1>
+        <hr>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.caption(
+        f"Consultas acima de {metrics.SLOW_QUERY_MS:.0f} ms são registradas "
+        "no log como consultas lentas."
+    )
+
+    open_breakers = {
+        name: state for name, state in breaker_states().items() if state != "closed"
+    }
+    for name, state in open_breakers.items():
+        st.warning(f"Disjuntor {'aberto' if state == 'open' else 'em teste'}: {name}")
+
+    stats = metrics.snapshot()
+    if not stats:
+        st.info("Nenhuma consulta registrada desde o último reinício.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Função": entry["caller"],
+                    "Tipo": entry["kind"],
+                    "Chamadas": entry["calls"],
+                    "Erros": entry["errors"],
+                    "Linhas": entry["rows"],
+                    "Total (ms)": round(entry["total_ms"], 1),
+                    "Média (ms)": round(entry["avg_ms"], 1),
+                    "Máximo (ms)": round(entry["max_ms"], 1),
+                    "Lentas": entry["slow"],
+                }
+                for entry in stats
+            ],
+            use_container_width=True,
+        )
+
+    col1, col2, _ = st.columns([2, 2, 4])
+    col1.download_button(
+        "⬇️ Exportar JSON",
+        data=metrics.export_json(),
+        file_name="db_metrics.json",
+        mime="application/json",
+    )
+    if col2.button("🔄 Reiniciar métricas"):
+        metrics.reset()
+        st.rerun()
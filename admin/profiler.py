@@ -0,0 +1,213 @@
+"""Módulo de perfilamento das execuções (reruns) das páginas Streamlit.
+
+Cada interação do usuário reexecuta o app.py e a página ativa. Este módulo
+mede, de forma opcional, como o tempo de cada execução se divide entre o
+banco de dados e o código Python/emissão de widgets, exibindo os resultados
+em um painel de depuração na barra lateral.
+
+Componentes principais:
+    - is_enabled: Indica se o perfilamento está ativo na sessão
+    - profiled: Envolve uma função de página para medi-la
+    - section: Mede um trecho específico dentro de uma página
+    - render_profile_panel: Exibe o painel de depuração na barra lateral
+
+Configuração:
+    - APP_PROFILE: "1" ativa o perfilamento para todas as sessões de administradores
+    - Parâmetro de URL ?profile=1: ativa o perfilamento apenas na sessão atual
+    - O perfilamento é restrito aos administradores (ADMIN_USER_IDS), pois
+      grava arquivos no servidor e expõe detalhes internos das páginas
+    - APP_PROFILE_DIR: Diretório onde arquivos .pstats (cProfile) são gravados
+
+Dependências:
+    - streamlit: Para o painel de depuração
+    - cProfile: Para geração opcional dos arquivos de perfil
+    - db.conn: Para contagem das consultas de cada execução
+    - .page: Para a verificação de administrador (is_admin)
+"""
+
+import cProfile
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+import streamlit as st
+from db.conn import register_query_hook, unregister_query_hook
+from .page import is_admin
+
+PROFILE_HISTORY_SIZE = 20
+
+_local = threading.local()
+
+
+def is_enabled():
+    """Verifica se o perfilamento está ativo para a sessão atual.
+
+    Returns:
+        bool: True se o usuário logado for administrador e APP_PROFILE=1 ou
+            a URL contiver ?profile=1.
+    """
+    if os.getenv("APP_PROFILE") != "1" and st.query_params.get("profile") != "1":
+        return False
+    return is_admin(st.session_state.get("user_id"))
+
+
+class _RerunProfile:
+    """Acumula as medições de uma execução de página na thread atual."""
+
+    def __init__(self, page):
+        self.page = page
+        self.thread = threading.get_ident()
+        self.started = time.perf_counter()
+        self.sections = []
+        self.queries = 0
+        self.connections = 0
+        self.db_ms = 0.0
+
+    def on_query(self, event):
+        """Gancho do db.conn; considera apenas comandos desta thread."""
+        if threading.get_ident() != self.thread:
+            return
+        if event["kind"] == "connect":
+            self.connections += 1
+        else:
+            self.queries += 1
+        self.db_ms += event["duration"] * 1000
+
+    def as_dict(self):
+        """Converte as medições para o formato exibido no painel."""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return {
+            "page": self.page,
+            "total_ms": total_ms,
+            "db_ms": self.db_ms,
+            "python_ms": max(total_ms - self.db_ms, 0.0),
+            "queries": self.queries,
+            "connections": self.connections,
+            "sections": self.sections,
+            "at": time.strftime("%H:%M:%S"),
+        }
+
+
+@contextmanager
+def section(name):
+    """Mede o tempo e as consultas de um trecho de uma página perfilada.
+
+    Fora de uma página perfilada, não tem efeito.
+
+    Args:
+        name (str): Nome do trecho exibido no painel.
+
+    Example:
+        >>> with section("Listagem"):
+        >>>     display_bills(bills)
+    """
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    queries = profile.queries
+    try:
+        yield
+    finally:
+        profile.sections.append(
+            {
+                "name": name,
+                "ms": (time.perf_counter() - start) * 1000,
+                "queries": profile.queries - queries,
+            }
+        )
+
+
+def profiled(name, page_func):
+    """Envolve uma função de página para medir cada execução quando ativo.
+
+    Registra o tempo total, o tempo gasto no banco de dados e o número de
+    consultas. Com APP_PROFILE_DIR definido, grava também um arquivo .pstats
+    do cProfile por execução.
+
+    Args:
+        name (str): Nome da página exibido no painel.
+        page_func (callable): Função que renderiza a página.
+
+    Returns:
+        callable: Função com a mesma assinatura de page_func.
+
+    Example:
+        >>> profiled("Boletos", slips_page)()
+    """
+
+    @functools.wraps(page_func)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return page_func(*args, **kwargs)
+
+        profile = _RerunProfile(name)
+        _local.profile = profile
+        register_query_hook(profile.on_query)
+
+        profile_dir = os.getenv("APP_PROFILE_DIR")
+        profiler = cProfile.Profile() if profile_dir else None
+        try:
+            if profiler:
+                profiler.enable()
+            return page_func(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+                os.makedirs(profile_dir, exist_ok=True)
+                file_name = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{id(profile)}"
+                profiler.dump_stats(
+                    os.path.join(profile_dir, f"{file_name}.pstats".replace(" ", "_"))
+                )
+            unregister_query_hook(profile.on_query)
+            _local.profile = None
+
+            history = st.session_state.setdefault("_profile_runs", [])
+            history.append(profile.as_dict())
+            del history[:-PROFILE_HISTORY_SIZE]
+
+    return wrapper
+
+
+def render_profile_panel():
+    """Exibe na barra lateral as medições das últimas execuções perfiladas.
+
+    Returns:
+        None: A função não retorna valor, mas atualiza a interface do Streamlit.
+    """
+    if not is_enabled():
+        return
+
+    history = st.session_state.get("_profile_runs", [])
+    with st.sidebar.expander("🐞 Perfil de execução", expanded=True):
+        if not history:
+            st.caption("Nenhuma execução medida ainda.")
+            return
+
+        last = history[-1]
+        st.write(f"**{last['page']}** às {last['at']}")
+        st.write(
+            f"Total: {last['total_ms']:.1f} ms  \n"
+            f"Banco de dados: {last['db_ms']:.1f} ms "
+            f"({last['queries']} consultas, {last['connections']} conexões)  \n"
+            f"Python/widgets: {last['python_ms']:.1f} ms"
+        )
+        for item in last["sections"]:
+            st.caption(f"{item['name']}: {item['ms']:.1f} ms, {item['queries']} consultas")
+
+        st.dataframe(
+            [
+                {
+                    "Página": run["page"],
+                    "Hora": run["at"],
+                    "Total (ms)": round(run["total_ms"], 1),
+                    "BD (ms)": round(run["db_ms"], 1),
+                    "Consultas": run["queries"],
+                }
+                for run in reversed(history)
+            ],
+            use_container_width=True,
+        )
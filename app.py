@@ -10,6 +10,10 @@ Componentes principais:
     - main: Interface de autenticação (login/cadastro)
     - logged: Dashboard principal pós-login
     - Controle de estado via st.session_state
+    - Restauração da sessão via token assinado (auth.session)
+    - Descarte dos caches da sessão alterados em outros processos (db.notify)
+    - Aviso ao usuário quando uma consulta excede o tempo limite
+      (db.conn.QueryTimeoutError), sem interromper a sessão
 
 Módulos integrados:
     - auth: Gerenciamento de usuários e autenticação
@@ -18,21 +22,29 @@ Módulos integrados:
     - income: Gerenciamento de renda
     - fixedaccounts: Contas fixas recorrentes
     - summary: Visão geral consolidada
+    - admin: Painel de métricas do banco de dados
 
 Fluxo da aplicação:
-    1. Configuração inicial da página
+    1. Configuração inicial da página e do esquema do banco de dados
     2. Verificação do estado de login
     3. Redirecionamento para interface adequada
     4. Gerenciamento de navegação e sessão
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from auth.page import *
+from auth.session import get_user_profile
 from creditcard.page import *
 from slips.page import *
 from income.page import *
 from fixedaccounts.page import *
 from summary.page import *
+from admin.page import is_admin, db_metrics_page
+from admin.profiler import profiled, render_profile_panel
+from db import metrics, notify, shards
+from db.conn import QueryTimeoutError, set_session_resolver
+from db.schema import SchemaError, ensure_schema
 
 
 st.set_page_config(
@@ -43,6 +55,41 @@ st.set_page_config(
 )
 
 
+def streamlit_session_id():
+    """Identifica a sessão do navegador para a leitura das próprias escritas."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def streamlit_user_id():
+    """Identifica o usuário logado na sessão para o roteamento entre shards."""
+    if get_script_run_ctx() is None:
+        return None
+    return st.session_state.get("user_id")
+
+
+metrics.install()
+set_session_resolver(streamlit_session_id)
+shards.set_user_resolver(streamlit_user_id)
+try:
+    ensure_schema()
+except SchemaError as e:
+    st.error(f"Erro ao preparar o banco de dados: {e}")
+    st.stop()
+notify.start_listener()
+
+# Caches da sessão descartados quando a tabela é alterada por outro processo.
+# As listas (bills, credit_cards, accounts) já são atualizadas pela leitura
+# incremental de cada página; aqui são descartados os dados derivados.
+CACHE_KEYS = {
+    "boletos": ["upcoming_bills", "dados_financeiros"],
+    "cartoes_credito": ["dados_financeiros"],
+    "contas_fixas": ["month_accounts", "dados_financeiros"],
+    "contas_fixas_mensais": ["month_accounts", "dados_financeiros"],
+    "renda_historico": ["existing_income", "dados_financeiros"],
+}
+
+
 def main():
     """Gerencia a interface de autenticação e registro de usuários.
 
@@ -72,6 +119,22 @@ def main():
         forgot_password_page()
 
 
+def evict_stale_caches(user_id):
+    """Descarta os caches da sessão alterados desde a última execução.
+
+    Args:
+        user_id (int): ID do usuário logado.
+    """
+    tables, st.session_state["_notify_seen"] = notify.changed_tables(
+        user_id, st.session_state.get("_notify_seen")
+    )
+    if tables is None:
+        tables = CACHE_KEYS
+    for table in tables:
+        for key in CACHE_KEYS.get(table, []):
+            st.session_state.pop(key, None)
+
+
 def logged():
     """Gerencia o dashboard principal pós-autenticação.
 
@@ -87,45 +150,63 @@ def logged():
         - Boletos: Controle de pagamentos (slips_page)
         - Contas fixas: Despesas recorrentes (fixed_accounts_page)
         - Renda: Gerenciamento de receitas (income_page)
+        - Métricas do BD: Latência das consultas, apenas administradores (db_metrics_page)
 
     Comportamentos:
         - Atualiza interface ao alterar seleção no menu
-        - Reinicia estado ao efetuar logout
+        - Reinicia estado, revoga o token de sessão e remove o cookie ao efetuar logout
         - Mantém sessão ativa até logout explícito
+        - Descarta os caches alterados por outras réplicas antes de renderizar
+        - Mede cada execução das páginas quando o perfilamento está ativo
+          (APP_PROFILE=1 ou ?profile=1), apenas para administradores
     """
 
+    evict_stale_caches(st.session_state["user_id"])
+
     st.sidebar.title("Opções de Navegação")
-    dashboard_menu = st.sidebar.selectbox(
-        "Selecione uma opção",
-        [
-            "Resumo",
-            "Cartões de Crédito",
-            "Boletos",
-            "Contas fixas",
-            "Renda",
-        ],
-    )
+    options = [
+        "Resumo",
+        "Cartões de Crédito",
+        "Boletos",
+        "Contas fixas",
+        "Renda",
+    ]
+    if is_admin(st.session_state["user_id"]):
+        options.append("Métricas do BD")
+
+    dashboard_menu = st.sidebar.selectbox("Selecione uma opção", options)
+
+    profile = get_user_profile(st.session_state["user_id"])
+    if profile:
+        st.sidebar.caption(f"Olá, {profile['nome']}!")
 
     if st.sidebar.button("Sair"):
-        st.session_state["logged_in"] = False
+        end_session()
         st.rerun()
 
     if dashboard_menu == "Resumo":
-        summary_page()
+        profiled("Resumo", summary_page)()
     elif dashboard_menu == "Cartões de Crédito":
-        credit_card_page()
+        profiled("Cartões de Crédito", credit_card_page)()
     elif dashboard_menu == "Boletos":
-        slips_page()
+        profiled("Boletos", slips_page)()
     elif dashboard_menu == "Contas fixas":
-        fixed_accounts_page()
+        profiled("Contas fixas", fixed_accounts_page)()
     elif dashboard_menu == "Renda":
-        income_page()
+        profiled("Renda", income_page)()
+    elif dashboard_menu == "Métricas do BD":
+        db_metrics_page()
+
+    render_profile_panel()
 
 
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
 
-if st.session_state["logged_in"]:
-    logged()
-else:
-    main()
+try:
+    if restore_session():
+        logged()
+    else:
+        main()
+except QueryTimeoutError as e:
+    st.warning(f"⏳ {e}")
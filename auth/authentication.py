@@ -1,24 +1,30 @@
 """Módulo de gerenciamento de segurança e comunicação para aplicativo.
 
-Este módulo fornece funcionalidades para hash de senhas e envio de mensagens SMS.
-Integra-se com o Twilio para envio de SMS e utiliza bcrypt para segurança de senhas.
+Este módulo fornece funcionalidades para hash de senhas, geração de tokens de
+recuperação e envio de mensagens SMS. Integra-se com o Twilio para envio de SMS
+e utiliza bcrypt para segurança de senhas.
 
 Componentes principais:
     - bcrypt: Biblioteca para hashing de senhas
+    - secrets: Para geração de tokens de recuperação
+    - .session.keyed_hash: HMAC dos tokens de recuperação com o segredo do servidor
     - os: Para acesso a variáveis de ambiente
     - dotenv: Para carregar variáveis de ambiente de um arquivo .env
     - Client: Classe do Twilio para gerenciamento de envio de mensagens SMS
 
 Funcionalidades:
     * Hash seguro de senhas utilizando bcrypt
+    * Geração de tokens de recuperação imprevisíveis e armazenáveis como hash
     * Carregamento de credenciais e configuração do ambiente
     * Envio de mensagens SMS via API do Twilio
 """
 
 import bcrypt
 import os
+import secrets
 from dotenv import load_dotenv
 from twilio.rest import Client
+from .session import keyed_hash
 
 load_dotenv()
 
@@ -60,6 +66,42 @@ def check_password(password, hashed):
     return bcrypt.checkpw(password.encode("utf-8"), hashed)
 
 
+def generate_reset_token():
+    """Gera um token numérico de 6 dígitos para recuperação de senha.
+
+    Utiliza o módulo secrets, adequado para valores que não podem ser
+    previstos por terceiros.
+
+    Returns:
+        str: Token de 6 dígitos.
+
+    Example:
+        >>> token = generate_reset_token()
+    """
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def hash_reset_token(phone, token):
+    """Gera o HMAC-SHA256 de um token de recuperação vinculado ao telefone.
+
+    O token nunca é armazenado em texto claro; apenas este hash é persistido
+    e comparado na validação. Por usar o segredo do servidor (SESSION_SECRET),
+    o hash de um código de 6 dígitos não pode ser invertido por quem tem
+    acesso apenas à tabela tokens_recuperacao.
+
+    Args:
+        phone (str): Telefone ao qual o token foi enviado.
+        token (str): Token em texto claro.
+
+    Returns:
+        str: Hash hexadecimal de 64 caracteres.
+
+    Example:
+        >>> token_hash = hash_reset_token("+5511999999999", "123456")
+    """
+    return keyed_hash(f"reset:{phone}:{token}")
+
+
 def send_sms(to_phone, message):
     """Envia uma mensagem SMS para o número de telefone especificado.
 
@@ -6,32 +6,46 @@ banco de dados através do módulo queries.
 
 Componentes principais:
     - get_user_by_email: Função para recuperar um usuário a partir do e-mail
-    - check_existing_email: Função para verificar se um e-mail já está cadastrado
-    - check_existing_phone: Função para verificar se um telefone já está cadastrado
-    - create_user: Função para criar um novo usuário
+    - create_user: Função para criar um novo usuário, validando e-mail e telefone
+      duplicados na mesma consulta
     - get_password_by_phone: Função para recuperar a senha de um usuário pelo telefone
     - update_password_by_phone: Função para atualizar a senha de um usuário
+    - save_reset_token / verify_reset_token: Tokens de recuperação armazenados no servidor
+    - start_session / restore_session / end_session: Sessão assinada que sobrevive
+      a reconexões do navegador, mantida em um cookie e revogada no logout
 
 Funcionalidades:
     * Autenticação de usuários com e-mail e senha
     * Registro de novos usuários com validação de dados
     * Recuperação de senha via token enviado por SMS
     * Verificação de dados existentes (e-mail e telefone) para evitar duplicações
+    * Restauração da sessão a partir de um token assinado, sem novo login
 """
 
+import json
 import streamlit as st
+import streamlit.components.v1 as components
 from .authentication import *
 from .queries import (
     get_user_by_email,
-    check_existing_email,
-    check_existing_phone,
     create_user,
     get_password_by_phone,
     update_password_by_phone,
+    save_reset_token,
+    verify_reset_token,
+    delete_reset_token,
+)
+from .session import (
+    SESSION_TTL_SECONDS,
+    create_session_token,
+    decode_session_token,
+    invalidate_user_profile,
+    revoke_sessions,
 )
-import random
 import re
 
+SESSION_COOKIE = "sessao"
+
 
 def is_valid_email(email):
     """Verifica se o e-mail fornecido está no formato válido.
@@ -50,6 +64,111 @@ def is_valid_email(email):
     return re.match(r"[^@]+@[^@]+\.[^@]+", email) is not None
 
 
+def _set_session_cookie(token, max_age):
+    """Agenda a gravação do cookie de sessão na próxima execução da página.
+
+    O cookie é gravado pelo navegador (st.context.cookies é somente leitura);
+    a gravação é adiada para sobreviver ao st.rerun() que segue o login e o
+    logout. Com token vazio e max_age 0, o cookie é removido.
+
+    Args:
+        token (str): Token de sessão, ou "" para remover o cookie.
+        max_age (int): Validade do cookie, em segundos.
+    """
+    st.session_state["session_cookie"] = (token, max_age)
+
+
+def _write_session_cookie():
+    """Grava no navegador o cookie agendado por _set_session_cookie, se houver."""
+    pending = st.session_state.pop("session_cookie", None)
+    if pending is None:
+        return
+
+    token, max_age = pending
+    cookie = f"{SESSION_COOKIE}={token}; Path=/; Max-Age={max_age}; SameSite=Strict"
+    components.html(
+        f"""
+        <script>
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        window.parent.document.cookie = {json.dumps(cookie)} + secure;
+        </script>
+        """,
+        height=0,
+    )
+
+
+def start_session(user_id):
+    """Marca o usuário como autenticado e emite o token de sessão.
+
+    O token assinado é mantido em um cookie, e não na URL, permitindo
+    restaurar a sessão após uma reconexão sem novo login e sem expô-lo no
+    histórico do navegador, em links compartilhados ou em logs de acesso.
+
+    O cookie é gravado por JavaScript, pois o Streamlit não permite enviar
+    Set-Cookie: ele não pode ser HttpOnly e fica acessível a scripts da
+    página. Após o logout, o token continua no navegador até a próxima
+    reconexão. Se vazar, a única proteção é a revogação por sessao_versao e
+    a validade curta do token (SESSION_TTL_HOURS).
+
+    Args:
+        user_id (int): ID do usuário autenticado.
+    """
+    st.session_state["logged_in"] = True
+    st.session_state["user_id"] = user_id
+
+    token = create_session_token(user_id)
+    if token:
+        _set_session_cookie(token, SESSION_TTL_SECONDS)
+
+
+def restore_session():
+    """Restaura a sessão a partir do cookie de sessão, se o token for válido.
+
+    A validação usa o cache de perfis, de modo que execuções sucessivas da
+    página não geram consultas ao banco. Tokens revogados no logout são
+    rejeitados e o cookie é removido.
+
+    Returns:
+        bool: True se o usuário estiver autenticado após a verificação.
+    """
+    _write_session_cookie()
+    if st.session_state.get("logged_in"):
+        return True
+
+    # Os cookies são lidos na conexão: após o logout, o token antigo continua
+    # visível até a próxima reconexão e é rejeitado uma única vez
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if not token or token == st.session_state.get("rejected_session_token"):
+        return False
+
+    user_id = decode_session_token(token)
+    if user_id is None:
+        st.session_state["rejected_session_token"] = token
+        _set_session_cookie("", 0)
+        _write_session_cookie()
+        return False
+
+    st.session_state["logged_in"] = True
+    st.session_state["user_id"] = user_id
+    return True
+
+
+def end_session():
+    """Encerra a sessão do usuário, revoga seus tokens e remove o cookie.
+
+    A revogação é feita no servidor (revoke_sessions): os tokens emitidos ao
+    usuário deixam de ser aceitos em todos os navegadores, mesmo que uma
+    cópia do cookie tenha sido preservada.
+    """
+    user_id = st.session_state.get("user_id")
+    if user_id is not None:
+        revoke_sessions(user_id)
+
+    st.session_state["logged_in"] = False
+    st.session_state.pop("user_id", None)
+    _set_session_cookie("", 0)
+
+
 def login_page():
     """Gerencia a interface de login do usuário.
 
@@ -81,8 +200,7 @@ def login_page():
                 hashed_password = bytes.fromhex(senha_hex[2:])
                 if check_password(password, hashed_password):
                     st.success("Login realizado com sucesso!")
-                    st.session_state["logged_in"] = True
-                    st.session_state["user_id"] = user_id
+                    start_session(user_id)
                     st.rerun()
                 else:
                     st.error("Senha incorreta.")
@@ -124,20 +242,20 @@ def create_user_page():
             st.error("Por favor, insira um telefone válido no formato +CCXXXXXXXXXX.")
             return
 
-        existing_email = check_existing_email(mail)
-        existing_phone = check_existing_phone(phone) if phone else None
+        conflict_messages = {
+            "email": "Este e-mail já está cadastrado.",
+            "phone": "Este telefone já está cadastrado.",
+            "conflict": "Este e-mail ou telefone já está cadastrado.",
+        }
 
         try:
-            if existing_email:
-                st.error("Este e-mail já está cadastrado.")
-                return
+            pw_hash = hash_password(password)
+            conflict = create_user(name, surname, mail, pw_hash, phone)
 
-            if existing_phone:
-                st.error("Este telefone já está cadastrado.")
+            if conflict:
+                st.error(conflict_messages[conflict])
                 return
 
-            pw_hash = hash_password(password)
-            create_user(name, surname, mail, pw_hash, phone)
             st.success("Usuário cadastrado com sucesso!")
 
         except Exception as e:
@@ -160,37 +278,54 @@ def forgot_password_page():
         result = get_password_by_phone(phone)
 
         if result:
-            # Gerar um token aleatório
-            token = str(random.randint(100000, 999999))
-            message = f"Seu token de recuperação de senha é: {token}"
-            send_sms(phone, message)
-
-            # Salvar o token na sessão para validação posterior
-            st.session_state["token"] = token
-            st.session_state["telefone"] = phone
-
-            st.success(
-                "Token enviado com sucesso! Insira o token para redefinir sua senha."
-            )
-            st.session_state["awaiting_token"] = True
+            # O token é persistido apenas como hash no servidor, com validade
+            # e limite de tentativas, e não depende do estado da sessão
+            token = generate_reset_token()
+            if save_reset_token(phone, hash_reset_token(phone, token)):
+                message = f"Seu token de recuperação de senha é: {token}"
+                send_sms(phone, message)
+
+                st.session_state["telefone"] = phone
+
+                st.success(
+                    "Token enviado com sucesso! Insira o token para redefinir sua senha."
+                )
+                st.session_state["awaiting_token"] = True
+            else:
+                st.warning(
+                    "Um token foi enviado recentemente. Aguarde um minuto antes de "
+                    "solicitar outro."
+                )
         else:
             st.error("Telefone não encontrado.")
 
-    if st.session_state.get("awaiting_token"):
+    has_token = st.checkbox(
+        "Já recebi um token", value=st.session_state.get("awaiting_token", False)
+    )
+
+    if has_token:
         token_input = st.text_input("Insira o token recebido")
         new_pw = st.text_input("Nova Senha", type="password")
         confirm_pw = st.text_input("Confirmar Nova Senha", type="password")
 
         if st.button("Redefinir Senha"):
-            if token_input == st.session_state["token"]:
-                if new_pw == confirm_pw:
-                    pw_hash = hash_password(new_pw)
-                    update_password_by_phone(st.session_state["telefone"], pw_hash)
-                    st.success("Senha redefinida com sucesso!")
-                    st.session_state["awaiting_token"] = False
-                    del st.session_state["token"]
-                    del st.session_state["telefone"]
-                else:
-                    st.error("As senhas não coincidem.")
+            token_phone = st.session_state.get("telefone") or phone
+
+            if not token_phone:
+                st.error("Informe o telefone para o qual o token foi enviado.")
+            elif new_pw != confirm_pw:
+                st.error("As senhas não coincidem.")
+            elif verify_reset_token(
+                token_phone, hash_reset_token(token_phone, token_input)
+            ):
+                pw_hash = hash_password(new_pw)
+                user_id = update_password_by_phone(token_phone, pw_hash)
+                delete_reset_token(token_phone)
+                if user_id is not None:
+                    # Revoga as sessões emitidas com a senha anterior
+                    invalidate_user_profile(user_id)
+                st.success("Senha redefinida com sucesso!")
+                st.session_state["awaiting_token"] = False
+                st.session_state.pop("telefone", None)
             else:
-                st.error("Token inválido.")
+                st.error("Token inválido ou expirado.")
@@ -7,98 +7,233 @@ Integra-se com o sistema de autenticação e outras funcionalidades da aplicaç
 Componentes principais:
     - execute_query: Função para executar consultas SQL de leitura
     - execute_update: Função para executar comandos SQL de escrita
-    - get_connection: Função para estabelecer e retornar a conexão com o banco de dados
+    - save_reset_token / verify_reset_token: Armazenamento e validação de tokens
+      de recuperação de senha no servidor
+    - increment_session_version: Revogação dos tokens de sessão de um usuário
 
 Funcionalidades:
     * Execução de consultas SQL para recuperação de dados
     * Execução de comandos SQL para atualização de registros
+    * Tokens de recuperação com expiração, limite de tentativas e limpeza periódica
+    * Com shards configurados (db.shards), logins por e-mail e telefone são
+      resolvidos pelo diretório global de usuários e os demais comandos são
+      executados no shard do usuário
     * Gerenciamento seguro de conexões com o banco de dados
     * Tratamento de exceções e registro de erros durante operações de banco de dados
 """
 
-from db.conn import execute_query, execute_update, get_connection
+import threading
+import time
+from contextlib import contextmanager
+from db.conn import dialect, execute_query, execute_update, prepared, transaction
+from db.shards import for_each_shard, is_sharded, use_shard, use_user_shard
 
+RESET_TOKEN_TTL_MINUTES = 10
+RESET_TOKEN_MAX_ATTEMPTS = 5
+RESET_TOKEN_COOLDOWN_SECONDS = 60
+RESET_TOKEN_PURGE_INTERVAL_SECONDS = 300
 
-def get_user_by_email(email):
-    """Recupera um usuário a partir do e-mail fornecido.
+# Consulta de cada login, preparada uma vez por conexão
+GET_USER_BY_EMAIL = prepared(
+    "get_user_by_email", "SELECT id, senha FROM usuarios WHERE email = %s;"
+)
 
-    Esta função executa uma consulta para obter o ID e a senha do usuário
-    associado ao e-mail fornecido.
-
-    Args:
-        email (str): O e-mail do usuário a ser pesquisado.
+_purge_lock = threading.Lock()
+_last_purge = None
 
-    Returns:
-        tuple: Tupla contendo o ID do usuário e a senha, se encontrado; caso contrário, None.
-
-    Example:
-        >>> user = get_user_by_email("usuario@exemplo.com")
-    """
-    return execute_query("SELECT id, senha FROM usuarios WHERE email = %s;", (email,))
 
+@contextmanager
+def _routed_by(column, value):
+    """Fixa o shard do usuário com o e-mail ou telefone informado.
 
-def check_existing_email(email):
-    """Verifica se um e-mail já está cadastrado no sistema.
-
-    Esta função executa uma consulta para verificar a existência do e-mail
-    fornecido na tabela de usuários.
+    Sem shards configurados, o bloco é executado no banco padrão. Com shards,
+    o usuário é localizado no diretório global; se não for encontrado, o
+    gerenciador retorna False e o bloco não deve consultar o banco.
 
     Args:
-        email (str): O e-mail a ser verificado.
-
-    Returns:
-        list: Lista contendo o e-mail se encontrado; caso contrário, uma lista vazia.
+        column (str): "email" ou "telefone".
+        value (str): Valor a localizar.
 
-    Example:
-        >>> exists = check_existing_email("usuario@exemplo.com")
+    Yields:
+        bool: True se o usuário foi localizado (ou não há shards).
     """
-    return execute_query("SELECT email FROM usuarios WHERE email = %s", (email,))
+    if not is_sharded():
+        yield True
+        return
+
+    with use_shard(None):
+        rows = execute_query(
+            f"SELECT id FROM diretorio_usuarios WHERE {column} = %s;", (value,)
+        )
+    if not rows:
+        yield False
+        return
+    with use_user_shard(rows[0][0]):
+        yield True
 
 
-def check_existing_phone(phone):
-    """Verifica se um telefone já está cadastrado no sistema.
+def get_user_by_email(email):
+    """Recupera um usuário a partir do e-mail fornecido.
 
-    Esta função executa uma consulta para verificar a existência do telefone
-    fornecido na tabela de usuários.
+    Esta função executa uma consulta para obter o ID e a senha do usuário
+    associado ao e-mail fornecido.
 
     Args:
-        phone (str): O telefone a ser verificado.
+        email (str): O e-mail do usuário a ser pesquisado.
 
     Returns:
-        list: Lista contendo o telefone se encontrado; caso contrário, uma lista vazia.
+        tuple: Tupla contendo o ID do usuário e a senha, se encontrado; caso contrário, None.
 
     Example:
-        >>> exists = check_existing_phone("+5511999999999")
+        >>> user = get_user_by_email("usuario@exemplo.com")
     """
-    return execute_query("SELECT telefone FROM usuarios WHERE telefone = %s", (phone,))
+    with _routed_by("email", email) as found:
+        if not found:
+            return []
+        return execute_query(GET_USER_BY_EMAIL, (email,))
 
 
 def create_user(name, surname, email, password_hash, phone):
-    """Cria um novo usuário no banco de dados.
+    """Cria um novo usuário no banco de dados em uma única consulta.
 
-    Esta função insere um novo registro de usuário com as informações fornecidas.
+    A inserção utiliza ON CONFLICT DO NOTHING, apoiada pelos índices únicos de
+    e-mail e telefone, e na mesma consulta verifica qual dado já estava
+    cadastrado. Assim o cadastro custa uma única ida ao banco e permanece
+    correto mesmo com cadastros simultâneos. Com shards configurados, a
+    mesma verificação é feita no diretório global, que gera o ID do usuário;
+    o usuário é então criado com esse ID no seu shard. No SQLite, que não
+    aceita INSERT dentro de CTEs, a inserção e a verificação são feitas na
+    mesma transação.
 
     Args:
         name (str): Nome do usuário.
         surname (str): Sobrenome do usuário.
         email (str): E-mail do usuário.
         password_hash (str): Hash da senha do usuário.
-        phone (str): Telefone do usuário.
+        phone (str): Telefone do usuário (opcional).
+
+    Returns:
+        str | None: None se o usuário foi criado; "email" ou "phone" se o
+            respectivo dado já estiver cadastrado; "conflict" se o conflito
+            não puder ser identificado (cadastro concorrente).
 
     Raises:
-        OperationalError: Lança um erro se houver problemas de conexão.
-        IntegrityError: Lança um erro se houver problemas de integridade.
+        RuntimeError: Se a consulta não puder ser executada.
 
     Example:
         >>> create_user("Nome", "Sobrenome", "usuario@exemplo.com", "hashed_password", "+5511999999999")
     """
-    execute_update(
+    phone = phone or None
+    if is_sharded():
+        return _create_sharded_user(name, surname, email, password_hash, phone)
+    if dialect() == "sqlite":
+        return _create_local_user(name, surname, email, password_hash, phone)
+
+    result = execute_update(
         """
-        INSERT INTO usuarios (nome, sobrenome, email, senha, telefone)
-        VALUES (%s, %s, %s, %s, %s);
+        WITH novo AS (
+            INSERT INTO usuarios (nome, sobrenome, email, senha, telefone)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
+            RETURNING id
+        )
+        SELECT
+            (SELECT id FROM novo),
+            EXISTS (SELECT 1 FROM usuarios WHERE email = %s),
+            EXISTS (SELECT 1 FROM usuarios WHERE telefone = %s);
         """,
-        (name, surname, email, password_hash, phone),
+        (name, surname, email, password_hash, phone, email, phone),
+        returning=True,
     )
+    return _creation_result(result)
+
+
+def _create_sharded_user(name, surname, email, password_hash, phone):
+    """Reserva o ID no diretório global e cria o usuário no seu shard.
+
+    Se a criação no shard falhar, a reserva no diretório é desfeita para
+    que o e-mail e o telefone possam ser cadastrados novamente.
+    """
+    with use_shard(None):
+        result = execute_update(
+            """
+            WITH novo AS (
+                INSERT INTO diretorio_usuarios (email, telefone)
+                VALUES (%s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            )
+            SELECT
+                (SELECT id FROM novo),
+                EXISTS (SELECT 1 FROM diretorio_usuarios WHERE email = %s),
+                EXISTS (SELECT 1 FROM diretorio_usuarios WHERE telefone = %s);
+            """,
+            (email, phone, email, phone),
+            returning=True,
+        )
+    conflict = _creation_result(result)
+    if conflict is not None:
+        return conflict
+
+    user_id = result[0][0]
+    try:
+        with use_user_shard(user_id), transaction() as uow:
+            uow.execute(
+                """
+                INSERT INTO usuarios (id, nome, sobrenome, email, senha, telefone)
+                VALUES (%s, %s, %s, %s, %s, %s);
+                """,
+                (user_id, name, surname, email, password_hash, phone),
+            )
+    except Exception as e:
+        with use_shard(None):
+            execute_update("DELETE FROM diretorio_usuarios WHERE id = %s;", (user_id,))
+        raise RuntimeError("Falha ao cadastrar usuário no banco de dados") from e
+    return None
+
+
+def _create_local_user(name, surname, email, password_hash, phone):
+    """Cria o usuário no SQLite, verificando o conflito na mesma transação."""
+    try:
+        with transaction() as uow:
+            created = uow.execute(
+                """
+                INSERT INTO usuarios (nome, sobrenome, email, senha, telefone)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING id;
+                """,
+                (name, surname, email, password_hash, phone),
+                returning=True,
+            )
+            email_exists, phone_exists = uow.query(
+                """
+                SELECT
+                    EXISTS (SELECT 1 FROM usuarios WHERE email = %s),
+                    EXISTS (SELECT 1 FROM usuarios WHERE telefone = %s);
+                """,
+                (email, phone),
+            )[0]
+    except Exception as e:
+        raise RuntimeError("Falha ao cadastrar usuário no banco de dados") from e
+    return _creation_result(
+        [(created[0][0] if created else None, email_exists, phone_exists)]
+    )
+
+
+def _creation_result(result):
+    """Interpreta o resultado (id, email_existe, telefone_existe) do cadastro."""
+    if not result:
+        raise RuntimeError("Falha ao cadastrar usuário no banco de dados")
+
+    user_id, email_exists, phone_exists = result[0]
+    if user_id is not None:
+        return None
+    if email_exists:
+        return "email"
+    if phone_exists:
+        return "phone"
+    return "conflict"
 
 
 def get_password_by_phone(phone):
@@ -116,10 +251,58 @@ def get_password_by_phone(phone):
     Example:
         >>> password = get_password_by_phone("+5511999999999")
     """
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT senha FROM usuarios WHERE telefone = %s;", (phone,))
-        return cursor.fetchone()
+    with _routed_by("telefone", phone) as found:
+        if not found:
+            return None
+        result = execute_query("SELECT senha FROM usuarios WHERE telefone = %s;", (phone,))
+    return result[0] if result else None
+
+
+def get_user_profile_by_id(user_id):
+    """Recupera os dados de perfil de um usuário a partir do ID.
+
+    Args:
+        user_id (int): ID do usuário.
+
+    Returns:
+        list: Lista com uma tupla (id, nome, sobrenome, email, telefone, senha,
+            sessao_versao) se encontrado; caso contrário, uma lista vazia.
+
+    Example:
+        >>> profile = get_user_profile_by_id(123)
+    """
+    with use_user_shard(user_id):
+        return execute_query(
+            """
+            SELECT id, nome, sobrenome, email, telefone, senha, sessao_versao
+            FROM usuarios WHERE id = %s;
+            """,
+            (user_id,),
+        )
+
+
+def increment_session_version(user_id):
+    """Incrementa a versão das sessões do usuário, revogando os tokens emitidos.
+
+    Args:
+        user_id (int): ID do usuário.
+
+    Returns:
+        int | None: Nova versão das sessões, ou None se o usuário não existir.
+
+    Example:
+        >>> increment_session_version(123)
+    """
+    with use_user_shard(user_id):
+        result = execute_update(
+            """
+            UPDATE usuarios SET sessao_versao = sessao_versao + 1
+            WHERE id = %s RETURNING sessao_versao;
+            """,
+            (user_id,),
+            returning=True,
+        )
+    return result[0][0] if result else None
 
 
 def update_password_by_phone(phone, new_password_hash):
@@ -131,13 +314,153 @@ def update_password_by_phone(phone, new_password_hash):
         phone (str): O telefone do usuário cuja senha deve ser atualizada.
         new_password_hash (str): O novo hash da senha a ser definido.
 
+    Returns:
+        int | None: ID do usuário atualizado, ou None se nenhum foi encontrado.
+
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
     """
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute(
-            "UPDATE usuarios SET senha = %s WHERE telefone = %s;",
+    with _routed_by("telefone", phone) as found:
+        if not found:
+            return None
+        result = execute_update(
+            "UPDATE usuarios SET senha = %s WHERE telefone = %s RETURNING id;",
             (new_password_hash, phone),
+            returning=True,
         )
-    conn.commit()
+    return result[0][0] if result else None
+
+
+def save_reset_token(
+    phone,
+    token_hash,
+    ttl_minutes=RESET_TOKEN_TTL_MINUTES,
+    cooldown_seconds=RESET_TOKEN_COOLDOWN_SECONDS,
+):
+    """Armazena o hash de um token de recuperação para o telefone informado.
+
+    Um novo token só é emitido após cooldown_seconds desde o anterior. Enquanto
+    o token anterior não expirar, o novo o substitui mantendo o contador de
+    tentativas e a validade: solicitar outro token não concede novas
+    tentativas, e o limite de RESET_TOKEN_MAX_ATTEMPTS vale para toda a
+    janela de validade. Por ficar no banco de dados, o token continua válido
+    mesmo que a sessão do navegador seja reconectada ou atendida por outra
+    réplica da aplicação.
+
+    Args:
+        phone (str): Telefone ao qual o token será enviado.
+        token_hash (str): Hash do token (ver hash_reset_token).
+        ttl_minutes (int, optional): Validade do token em minutos.
+        cooldown_seconds (int, optional): Intervalo mínimo entre emissões.
+
+    Returns:
+        bool: True se o token foi armazenado e pode ser enviado; False se o
+            telefone não foi encontrado ou se o intervalo mínimo não passou.
+
+    Example:
+        >>> if save_reset_token("+5511999999999", token_hash):
+        >>>     send_sms("+5511999999999", message)
+    """
+    purge_expired_reset_tokens()
+    with _routed_by("telefone", phone) as found:
+        if not found:
+            return False
+        result = execute_update(
+            """
+            INSERT INTO tokens_recuperacao (telefone, token_hash, tentativas, expira_em)
+            VALUES (%s, %s, 0, NOW() + make_interval(mins => %s))
+            ON CONFLICT (telefone) DO UPDATE
+            SET token_hash = EXCLUDED.token_hash,
+                tentativas = CASE WHEN tokens_recuperacao.expira_em > NOW()
+                                  THEN tokens_recuperacao.tentativas ELSE 0 END,
+                expira_em = CASE WHEN tokens_recuperacao.expira_em > NOW()
+                                 THEN tokens_recuperacao.expira_em
+                                 ELSE EXCLUDED.expira_em END,
+                criado_em = NOW()
+            WHERE tokens_recuperacao.expira_em <= NOW()
+               OR tokens_recuperacao.criado_em <= NOW() - make_interval(secs => %s)
+            RETURNING telefone;
+            """,
+            (phone, token_hash, ttl_minutes, cooldown_seconds),
+            returning=True,
+        )
+    return bool(result)
+
+
+def verify_reset_token(phone, token_hash, max_attempts=RESET_TOKEN_MAX_ATTEMPTS):
+    """Valida um token de recuperação, contabilizando a tentativa.
+
+    A tentativa é registrada no mesmo comando que lê o hash armazenado, de modo
+    que o limite de tentativas vale para todas as réplicas. Tokens expirados ou
+    que atingiram o limite nunca são aceitos.
+
+    Args:
+        phone (str): Telefone associado ao token.
+        token_hash (str): Hash do token informado pelo usuário.
+        max_attempts (int, optional): Número máximo de tentativas permitidas.
+
+    Returns:
+        bool: True se o token for válido, False caso contrário.
+
+    Example:
+        >>> verify_reset_token("+5511999999999", token_hash)
+    """
+    with _routed_by("telefone", phone) as found:
+        if not found:
+            return False
+        result = execute_update(
+            """
+            UPDATE tokens_recuperacao
+            SET tentativas = tentativas + 1
+            WHERE telefone = %s
+              AND expira_em > NOW()
+              AND tentativas < %s
+            RETURNING token_hash = %s;
+            """,
+            (phone, max_attempts, token_hash),
+            returning=True,
+        )
+    return bool(result and result[0][0])
+
+
+def delete_reset_token(phone):
+    """Remove o token de recuperação de um telefone após o uso.
+
+    Args:
+        phone (str): Telefone associado ao token.
+
+    Example:
+        >>> delete_reset_token("+5511999999999")
+    """
+    with _routed_by("telefone", phone) as found:
+        if found:
+            execute_update("DELETE FROM tokens_recuperacao WHERE telefone = %s;", (phone,))
+
+
+def purge_expired_reset_tokens(force=False):
+    """Remove em lote os tokens de recuperação expirados.
+
+    A limpeza é executada no máximo uma vez a cada
+    RESET_TOKEN_PURGE_INTERVAL_SECONDS por processo, aproveitando o índice
+    sobre expira_em, a menos que force=True. Com shards configurados, a
+    limpeza é feita em cada shard.
+
+    Args:
+        force (bool, optional): Ignora o intervalo mínimo entre limpezas.
+
+    Example:
+        >>> purge_expired_reset_tokens(force=True)
+    """
+    global _last_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if (
+            not force
+            and _last_purge is not None
+            and now - _last_purge < RESET_TOKEN_PURGE_INTERVAL_SECONDS
+        ):
+            return
+        _last_purge = now
+
+    for _ in for_each_shard():
+        execute_update("DELETE FROM tokens_recuperacao WHERE expira_em <= NOW();")
@@ -0,0 +1,224 @@
+"""Módulo de sessões assinadas e cache de perfis de usuários.
+
+Este módulo permite que a sessão de um usuário sobreviva a reconexões do
+navegador sem novo login e sem consultas extras ao banco a cada execução
+da página.
+
+Componentes principais:
+    - create_session_token: Gera um token de sessão assinado (JWT)
+    - decode_session_token: Valida um token e retorna o usuário associado
+    - get_user_profile: Recupera o perfil do usuário a partir do cache em memória
+    - invalidate_user_profile: Remove um perfil do cache após alterações
+    - revoke_sessions: Revoga no servidor os tokens de sessão de um usuário
+    - keyed_hash: HMAC com o segredo do servidor, para valores guardados no banco
+
+Funcionalidades:
+    * Tokens JWT assinados com HS256 e com prazo de validade
+    * Revogação automática dos tokens quando a senha do usuário é alterada
+    * Revogação no logout pela versão das sessões do usuário (sessao_versao)
+    * Cache LRU por processo, compartilhado entre todas as sessões
+    * Perfis descartados quando outro processo altera o usuário (db.notify)
+
+Dependências:
+    - jwt (PyJWT): Para assinatura e validação dos tokens
+    - cachetools: Para o cache LRU de perfis
+    - .queries: Para leitura do perfil no banco de dados
+    - db.notify: Para invalidação do cache por alterações em outros processos
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+import jwt
+from cachetools import LRUCache
+from dotenv import load_dotenv
+from db.notify import register_handler
+from .queries import get_user_profile_by_id, increment_session_version
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_HOURS", "2")) * 3600
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))
+
+_secret = os.getenv("SESSION_SECRET")
+if not _secret:
+    # Sem segredo configurado os tokens só valem neste processo
+    logger.warning("SESSION_SECRET não configurado; usando segredo temporário")
+    _secret = secrets.token_hex(32)
+
+_profile_cache = LRUCache(maxsize=PROFILE_CACHE_SIZE)
+_profile_lock = threading.Lock()
+
+
+def password_fingerprint(password_hash):
+    """Gera uma impressão curta do hash de senha armazenado.
+
+    A impressão é incluída no token de sessão; quando a senha muda, os tokens
+    emitidos anteriormente deixam de ser aceitos.
+
+    Args:
+        password_hash (str): Hash da senha como armazenado no banco.
+
+    Returns:
+        str: Impressão hexadecimal de 16 caracteres.
+    """
+    return hashlib.sha256(str(password_hash).encode("utf-8")).hexdigest()[:16]
+
+
+def keyed_hash(value):
+    """Gera o HMAC-SHA256 de um valor com o segredo do servidor (SESSION_SECRET).
+
+    O segredo fica fora do banco de dados: quem lê apenas as tabelas não
+    consegue testar valores candidatos contra o hash armazenado.
+
+    Args:
+        value (str): Valor a proteger.
+
+    Returns:
+        str: HMAC hexadecimal de 64 caracteres.
+
+    Example:
+        >>> keyed_hash("reset:+5511999999999:123456")
+    """
+    return hmac.new(_secret.encode("utf-8"), value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def get_user_profile(user_id):
+    """Recupera o perfil de um usuário, consultando o banco apenas em cache miss.
+
+    Args:
+        user_id (int): ID do usuário.
+
+    Returns:
+        dict | None: Perfil com as chaves id, nome, sobrenome, email, telefone,
+            fingerprint e session_version; None se o usuário não existir.
+
+    Example:
+        >>> profile = get_user_profile(123)
+    """
+    user_id = int(user_id)
+    with _profile_lock:
+        profile = _profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    result = get_user_profile_by_id(user_id)
+    if not result:
+        return None
+
+    _, name, surname, email, phone, password_hash, session_version = result[0]
+    profile = {
+        "id": user_id,
+        "nome": name,
+        "sobrenome": surname,
+        "email": email,
+        "telefone": phone,
+        "fingerprint": password_fingerprint(password_hash),
+        "session_version": session_version,
+    }
+    with _profile_lock:
+        _profile_cache[user_id] = profile
+    return profile
+
+
+def invalidate_user_profile(user_id):
+    """Remove o perfil de um usuário do cache.
+
+    Deve ser chamada sempre que o perfil ou a senha do usuário forem alterados.
+
+    Args:
+        user_id (int): ID do usuário.
+    """
+    with _profile_lock:
+        _profile_cache.pop(int(user_id), None)
+
+
+def _on_invalidation(table, user_id):
+    """Descarta perfis alterados em outros processos (ver db.notify)."""
+    if table is None:
+        with _profile_lock:
+            _profile_cache.clear()
+    elif table == "usuarios":
+        invalidate_user_profile(user_id)
+
+
+register_handler(_on_invalidation)
+
+
+def create_session_token(user_id):
+    """Gera um token de sessão assinado para o usuário.
+
+    Args:
+        user_id (int): ID do usuário autenticado.
+
+    Returns:
+        str | None: Token JWT, ou None se o usuário não existir.
+
+    Example:
+        >>> token = create_session_token(123)
+    """
+    profile = get_user_profile(user_id)
+    if profile is None:
+        return None
+
+    now = int(time.time())
+    payload = {
+        "sub": str(profile["id"]),
+        "pwd": profile["fingerprint"],
+        "ver": profile["session_version"],
+        "iat": now,
+        "exp": now + SESSION_TTL_SECONDS,
+    }
+    return jwt.encode(payload, _secret, algorithm="HS256")
+
+
+def decode_session_token(token):
+    """Valida um token de sessão e retorna o ID do usuário associado.
+
+    O token é rejeitado se a assinatura for inválida, se estiver expirado, se
+    a senha do usuário tiver sido alterada após sua emissão ou se as sessões
+    do usuário tiverem sido revogadas (revoke_sessions).
+
+    Args:
+        token (str): Token JWT recebido do navegador.
+
+    Returns:
+        int | None: ID do usuário, ou None se o token for inválido.
+
+    Example:
+        >>> user_id = decode_session_token(token)
+    """
+    try:
+        payload = jwt.decode(token, _secret, algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return None
+
+    profile = get_user_profile(payload.get("sub", 0))
+    if profile is None or profile["fingerprint"] != payload.get("pwd"):
+        return None
+    if profile["session_version"] != payload.get("ver"):
+        return None
+    return profile["id"]
+
+
+def revoke_sessions(user_id):
+    """Revoga todos os tokens de sessão emitidos para o usuário.
+
+    A versão das sessões é incrementada no banco; tokens com a versão anterior
+    passam a ser rejeitados por decode_session_token, inclusive em outros
+    processos, que descartam o perfil em cache via db.notify.
+
+    Args:
+        user_id (int): ID do usuário.
+
+    Example:
+        >>> revoke_sessions(123)
+    """
+    increment_session_version(user_id)
+    invalidate_user_profile(user_id)
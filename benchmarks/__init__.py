@@ -0,0 +1,25 @@
+"""Pacote de benchmarks reprodutíveis do sistema de controle financeiro.
+
+Este pacote gera uma massa de dados sintética e determinística em um banco
+PostgreSQL local e mede, com as mesmas funções utilizadas pelas páginas, o
+tempo das principais consultas e escritas da aplicação.
+
+Componentes principais:
+    - generator: Geração e carga em massa dos dados sintéticos (COPY)
+    - scenarios: Cenários cronometrados de leitura, login e escrita
+    - run: Linha de comando que executa os cenários e grava o resultado em JSON
+    - compare: Comparação entre dois resultados (antes/depois)
+    - render: Latência de execução e elementos emitidos por página, via
+      streamlit.testing.v1.AppTest (sem navegador)
+    - load: Teste de carga com várias sessões simultâneas do AppTest
+
+Exemplo:
+    python -m benchmarks.run --scale small --reset --output antes.json
+    python -m benchmarks.compare antes.json depois.json
+    python -m benchmarks.render --reset --output render.json
+    python -m benchmarks.load --sessions 100 --output load.json
+
+Atenção:
+    A carga com --reset apaga os dados das tabelas da aplicação. Utilize
+    apenas um banco local dedicado, configurado pelas variáveis DB_*.
+"""
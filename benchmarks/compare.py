@@ -0,0 +1,62 @@
+"""Linha de comando para comparar dois resultados de benchmark.
+
+Exemplo:
+    python -m benchmarks.compare antes.json depois.json
+    python -m benchmarks.compare antes.json depois.json --metric p95_ms
+"""
+
+import argparse
+import json
+
+
+def compare(before, after, metric="p50_ms"):
+    """Compara a métrica escolhida de cada cenário presente nos dois resultados.
+
+    Args:
+        before (dict): Resultado de referência (antes).
+        after (dict): Resultado a comparar (depois).
+        metric (str, optional): Estatística comparada. Padrão é p50_ms.
+
+    Returns:
+        list[dict]: Um item por cenário com os valores e a variação percentual.
+    """
+    rows = []
+    for name, stats in before["scenarios"].items():
+        if name not in after["scenarios"]:
+            continue
+        old = stats[metric]
+        new = after["scenarios"][name][metric]
+        rows.append(
+            {
+                "scenario": name,
+                "before": old,
+                "after": new,
+                "change_pct": (new - old) / old * 100 if old else 0.0,
+            }
+        )
+    return rows
+
+
+def main(argv=None):
+    """Imprime a comparação entre dois arquivos de resultado."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--metric", default="p50_ms")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as file:
+        before = json.load(file)
+    with open(args.after, encoding="utf-8") as file:
+        after = json.load(file)
+
+    print(f"{'cenário':<28}{'antes':>12}{'depois':>12}{'variação':>12}")
+    for row in compare(before, after, args.metric):
+        print(
+            f"{row['scenario']:<28}{row['before']:>12.2f}{row['after']:>12.2f}"
+            f"{row['change_pct']:>+11.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Módulo de geração de dados sintéticos para os benchmarks.
+
+Este módulo gera, a partir de uma semente, usuários com renda, lançamentos
+de cartão de crédito, boletos e contas fixas, e os carrega em massa no
+PostgreSQL com COPY (ou no SQLite com executemany, com DB_BACKEND=sqlite),
+permitindo reproduzir a mesma base em 1 mil, 100 mil ou 10 milhões de
+linhas por tabela.
+
+Componentes principais:
+    - SCALES: Tamanhos predefinidos da massa de dados
+    - reset_tables: Esvazia as tabelas da aplicação
+    - generate: Gera e carrega a massa de dados
+
+Dependências:
+    - psycopg2: Carga com COPY FROM STDIN através do cursor
+    - auth.authentication.hash_password: Senha dos usuários sintéticos
+    - db.schema.LEDGER_BACKFILL / SQLITE_LEDGER_BACKFILL: Carga do livro-razão
+      a partir das tabelas geradas
+"""
+
+import io
+import random
+from datetime import date, datetime, timedelta
+from auth.authentication import hash_password
+from db.conn import dialect
+from db.schema import LEDGER_BACKFILL, SQLITE_LEDGER_BACKFILL
+
+# Linhas por tabela: usuários x itens por usuário
+SCALES = {
+    "small": {"users": 100, "bills": 10, "cards": 10, "accounts": 10},
+    "medium": {"users": 1_000, "bills": 100, "cards": 100, "accounts": 100},
+    "large": {"users": 100_000, "bills": 100, "cards": 100, "accounts": 100},
+}
+
+BENCH_PASSWORD = "benchmark123"
+BENCH_EMAIL = "bench_{:07d}@exemplo.com"
+BENCH_EMAIL_PATTERN = "bench\\_%@exemplo.com"
+COPY_CHUNK_ROWS = 50_000
+
+IMPORTANCES = ["Imprevisto", "Consumo próprio", "Necessário", "Lazer", "Outros"]
+BILL_TITLES = ["Aluguel", "Energia", "Água", "Internet", "Condomínio", "IPTU", "Escola"]
+CARD_TITLES = ["Mercado", "Farmácia", "Restaurante", "Viagem", "Eletrônicos", "Roupas"]
+ACCOUNT_TITLES = ["Academia", "Streaming", "Plano de saúde", "Telefone", "Seguro"]
+
+APP_TABLES = [
+    "lancamentos",
+    "lembretes_enviados",
+    "registros_excluidos",
+    "tokens_recuperacao",
+    "renda_historico",
+    "contas_fixas_mensais",
+    "contas_fixas",
+    "boletos",
+    "cartoes_credito",
+    "Renda",
+    "usuarios",
+]
+
+
+def reset_tables(conn):
+    """Esvazia as tabelas da aplicação e reinicia as sequências de IDs.
+
+    Args:
+        conn (connection): Conexão com o banco de dados de benchmark.
+    """
+    with conn.cursor() as cursor:
+        if dialect() == "sqlite":
+            for table in APP_TABLES:
+                cursor.execute(f"DELETE FROM {table}")
+            # Os gatilhos de exclusão registram cada linha apagada
+            cursor.execute("DELETE FROM registros_excluidos")
+            cursor.execute("DELETE FROM sqlite_sequence")
+        else:
+            cursor.execute(
+                f"TRUNCATE {', '.join(APP_TABLES)} RESTART IDENTITY CASCADE"
+            )
+    conn.commit()
+
+
+def _copy_value(value):
+    """Formata um valor no formato texto do COPY."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).replace("\\", "\\\\")
+
+
+def _copy_rows(cursor, table, columns, rows):
+    """Carrega linhas em uma tabela com COPY, em blocos de COPY_CHUNK_ROWS.
+
+    No SQLite, que não tem COPY, os blocos são inseridos com executemany.
+
+    Args:
+        cursor (cursor): Cursor da conexão de carga.
+        table (str): Nome da tabela de destino.
+        columns (list[str]): Colunas na ordem dos valores.
+        rows (iterable): Tuplas de valores.
+
+    Returns:
+        int: Quantidade de linhas carregadas.
+    """
+    if dialect() == "sqlite":
+        return _insert_rows(cursor, table, columns, rows)
+
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    buffer = io.StringIO()
+    pending = 0
+
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+        pending += 1
+        if pending >= COPY_CHUNK_ROWS:
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            total += pending
+            buffer = io.StringIO()
+            pending = 0
+
+    if pending:
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        total += pending
+    return total
+
+
+def _insert_rows(cursor, table, columns, rows):
+    """Carrega linhas com executemany, em blocos de COPY_CHUNK_ROWS (SQLite)."""
+    statement = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= COPY_CHUNK_ROWS:
+            cursor.executemany(statement, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        cursor.executemany(statement, chunk)
+        total += len(chunk)
+    return total
+
+
+def generate(conn, users, bills, cards, accounts, seed=42, anchor=None):
+    """Gera e carrega a massa de dados sintética.
+
+    A mesma semente e a mesma data de referência produzem sempre os mesmos
+    dados. Datas de vencimento são distribuídas em até um ano antes e depois
+    da data de referência.
+
+    Args:
+        conn (connection): Conexão com o banco de dados de benchmark.
+        users (int): Quantidade de usuários.
+        bills (int): Boletos por usuário.
+        cards (int): Lançamentos de cartão de crédito por usuário.
+        accounts (int): Contas fixas por usuário.
+        seed (int, optional): Semente do gerador pseudoaleatório.
+        anchor (date, optional): Data de referência. Padrão é a data atual.
+
+    Returns:
+        dict: Quantidade de linhas carregadas por tabela.
+
+    Example:
+        >>> generate(conn, **SCALES["small"], seed=42)
+    """
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+    anchor_dt = datetime.combine(anchor, datetime.min.time())
+    # Mesmo formato gravado pelo psycopg2 ao salvar o hash (bytes) da aplicação
+    password = "\\x" + hash_password(BENCH_PASSWORD).hex()
+    counts = {}
+
+    with conn.cursor() as cursor:
+        counts["usuarios"] = _copy_rows(
+            cursor,
+            "usuarios",
+            ["nome", "sobrenome", "email", "senha", "telefone"],
+            (
+                (
+                    f"Usuario{i}",
+                    "Benchmark",
+                    BENCH_EMAIL.format(i),
+                    password,
+                    f"+55{31_000_000_000 + i}",
+                )
+                for i in range(users)
+            ),
+        )
+        cursor.execute(
+            "SELECT id FROM usuarios WHERE email LIKE %s ORDER BY id",
+            (BENCH_EMAIL_PATTERN,),
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+        incomes = {user_id: rng.randrange(2_000, 20_000, 100) for user_id in user_ids}
+        counts["Renda"] = _copy_rows(
+            cursor,
+            "Renda",
+            ["user_id", "valor", "data_atualizacao"],
+            ((user_id, value, anchor_dt) for user_id, value in incomes.items()),
+        )
+        counts["renda_historico"] = _copy_rows(
+            cursor,
+            "renda_historico",
+            ["user_id", "valor", "vigente_desde"],
+            ((user_id, value, "1900-01-01") for user_id, value in incomes.items()),
+        )
+
+        def bill_rows():
+            for user_id in user_ids:
+                for _ in range(bills):
+                    due = anchor_dt + timedelta(days=rng.randint(-365, 365))
+                    installment = rng.random() < 0.3
+                    paid = due < anchor_dt and rng.random() < 0.8
+                    yield (
+                        user_id,
+                        rng.choice(BILL_TITLES),
+                        f"{rng.uniform(20, 3_000):.2f}",
+                        due,
+                        installment,
+                        rng.randint(2, 12) if installment else None,
+                        paid,
+                        due - timedelta(days=rng.randint(0, 5)) if paid else None,
+                    )
+
+        counts["boletos"] = _copy_rows(
+            cursor,
+            "boletos",
+            [
+                "usuario_id",
+                "titulo",
+                "valor_total",
+                "data_vencimento",
+                "parcelado",
+                "num_parcelas",
+                "pago",
+                "data_pagamento",
+            ],
+            bill_rows(),
+        )
+
+        def card_rows():
+            for user_id in user_ids:
+                for _ in range(cards):
+                    due = anchor_dt + timedelta(days=rng.randint(-365, 365))
+                    yield (
+                        user_id,
+                        rng.choice(CARD_TITLES),
+                        rng.randint(1, 12),
+                        f"{rng.uniform(10, 1_500):.2f}",
+                        rng.choice(IMPORTANCES),
+                        due,
+                        due - timedelta(days=rng.randint(0, 30)),
+                    )
+
+        counts["cartoes_credito"] = _copy_rows(
+            cursor,
+            "cartoes_credito",
+            [
+                "usuario_id",
+                "nome_conta",
+                "num_parcelas",
+                "valor_parcela",
+                "importancia",
+                "dia_vencimento",
+                "data_criacao",
+            ],
+            card_rows(),
+        )
+
+        counts["contas_fixas"] = _copy_rows(
+            cursor,
+            "contas_fixas",
+            ["usuario_id", "titulo", "valor_total", "data_inicio"],
+            (
+                (
+                    user_id,
+                    rng.choice(ACCOUNT_TITLES),
+                    f"{rng.uniform(30, 800):.2f}",
+                    (anchor - timedelta(days=rng.randint(0, 730))).replace(day=1),
+                )
+                for user_id in user_ids
+                for _ in range(accounts)
+            ),
+        )
+
+        cursor.execute(
+            SQLITE_LEDGER_BACKFILL if dialect() == "sqlite" else LEDGER_BACKFILL
+        )
+        counts["lancamentos"] = cursor.rowcount
+
+        cursor.execute("ANALYZE")
+    conn.commit()
+    return counts
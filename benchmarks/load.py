@@ -0,0 +1,258 @@
+"""Teste de carga com várias sessões Streamlit simultâneas em um processo.
+
+Todas as sessões de um servidor Streamlit compartilham o mesmo processo e o
+mesmo GIL. Este módulo simula centenas de sessões concorrentes com o AppTest,
+cada uma repetindo o fluxo login → resumo → boletos → edição, e relata a
+latência das execuções (p50/p95/p99), as conexões abertas no banco
+(pg_stat_activity; indisponível no SQLite) e o consumo de CPU do processo,
+total e médio por sessão e por execução, permitindo dimensionar workers e
+validar mudanças de pool e cache.
+
+Pré-requisito:
+    Massa de dados gerada com python -m benchmarks.run --reset (ou
+    benchmarks.render --reset); cada sessão usa um usuário sintético diferente.
+
+Exemplos:
+    python -m benchmarks.load --sessions 100 --cycles 5 --output load.json
+    python -m benchmarks.load --sessions 300 --ramp-up 30 --think-time 1
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1.util import patch_config_options
+from db.conn import dialect, get_db_connection
+from .generator import BENCH_EMAIL, BENCH_PASSWORD
+from .render import RenderSession
+from .scenarios import summarize
+
+# Passos de um ciclo do fluxo simulado (após o login)
+FLOW = [
+    ("resumo", lambda session: session.navigate("Resumo")),
+    ("boletos", lambda session: session.navigate("Boletos")),
+    ("editar_boleto", lambda session: session.edit("Boletos")),
+]
+
+
+@contextmanager
+def shared_runtime():
+    """Mantém o estado global do AppTest durante todo o teste de carga.
+
+    Cada execução do AppTest instala um Runtime simulado e a opção
+    global.appTest e os remove ao terminar (Runtime._instance = None). Com
+    várias sessões em threads, a sessão que termina primeiro os removeria
+    das demais ainda em execução, que falhariam ao final do script (ficando
+    presas até o tempo limite do AppTest) ou perderiam o estado de teste dos
+    widgets. Enquanto o bloco estiver ativo, a opção permanece ativa e um
+    Runtime compartilhado é usado sempre que nenhum outro estiver instalado.
+
+    O AppTest também compila o app.py a cada execução; compilações
+    simultâneas em threads falham de forma intermitente no CPython 3.11
+    (SystemError do construtor da AST). Como no servidor Streamlit, o
+    bytecode é compilado uma vez e compartilhado entre as sessões.
+    """
+    script_cache = ScriptCache()
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    with patch.object(
+        Runtime, "instance", classmethod(lambda cls: cls._instance or runtime)
+    ), patch.object(Runtime, "exists", classmethod(lambda cls: True)), patch(
+        "streamlit.testing.v1.local_script_runner.ScriptCache", lambda: script_cache
+    ), patch_config_options({"global.appTest": True}):
+        yield
+
+
+class ConnectionSampler(threading.Thread):
+    """Amostra periodicamente as conexões abertas no banco de dados.
+
+    Utiliza pg_stat_activity e, portanto, apenas o PostgreSQL; no SQLite
+    não há conexões de servidor a contar e a amostragem não é iniciada.
+
+    Args:
+        interval (float): Intervalo entre amostras em segundos.
+    """
+
+    def __init__(self, interval=1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        with get_db_connection() as conn:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                while not self._stop_event.is_set():
+                    cursor.execute(
+                        """
+                        SELECT COUNT(*) FROM pg_stat_activity
+                        WHERE datname = current_database() AND pid <> pg_backend_pid()
+                        """
+                    )
+                    self.samples.append(cursor.fetchone()[0])
+                    self._stop_event.wait(self.interval)
+
+    def stop(self):
+        """Encerra a amostragem e aguarda a thread."""
+        self._stop_event.set()
+        self.join()
+
+
+def simulate_session(index, users, cycles, think_time, rng_seed, results, errors):
+    """Executa o fluxo de uma sessão simulada e acumula suas medições.
+
+    Args:
+        index (int): Número da sessão.
+        users (int): Quantidade de usuários sintéticos disponíveis.
+        cycles (int): Repetições do fluxo após o login.
+        think_time (float): Pausa média entre passos em segundos.
+        rng_seed (int): Semente das pausas aleatórias.
+        results (dict): Destino das durações por passo (compartilhado).
+        errors (list): Destino das mensagens de erro (compartilhado).
+    """
+    rng = random.Random(rng_seed + index)
+    try:
+        session = RenderSession()
+        start = time.perf_counter()
+        session.login(BENCH_EMAIL.format(index % users), BENCH_PASSWORD)
+        results["login"].append((time.perf_counter() - start) * 1000)
+
+        for _ in range(cycles):
+            for step, action in FLOW:
+                time.sleep(rng.uniform(0, 2 * think_time))
+                elapsed = action(session)
+                if elapsed is not None:
+                    results[step].append(elapsed)
+    except Exception as e:
+        errors.append(f"sessão {index}: {e}")
+
+
+def run_load(sessions, users, cycles, ramp_up, think_time, seed=42):
+    """Dispara as sessões simultâneas e consolida as medições.
+
+    Args:
+        sessions (int): Quantidade de sessões simultâneas.
+        users (int): Quantidade de usuários sintéticos disponíveis.
+        cycles (int): Repetições do fluxo por sessão.
+        ramp_up (float): Tempo para iniciar todas as sessões, em segundos.
+        think_time (float): Pausa média entre passos, em segundos.
+        seed (int, optional): Semente das pausas aleatórias.
+
+    Returns:
+        dict: Latências por passo e totais, conexões no banco (None no
+            SQLite), CPU do processo e erros.
+    """
+    results = {"login": [], **{step: [] for step, _ in FLOW}}
+    errors = []
+    sampler = ConnectionSampler() if dialect() == "postgres" else None
+    if sampler is not None:
+        sampler.start()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    threads = []
+    with shared_runtime():
+        for index in range(sessions):
+            thread = threading.Thread(
+                target=simulate_session,
+                args=(index, users, cycles, think_time, seed, results, errors),
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+            if sessions > 1:
+                time.sleep(ramp_up / (sessions - 1))
+
+        for thread in threads:
+            thread.join()
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    if sampler is not None:
+        sampler.stop()
+
+    all_reruns = [value for values in results.values() for value in values]
+    return {
+        "overall": summarize(all_reruns) if all_reruns else None,
+        "steps": {
+            step: summarize(values) if values else None
+            for step, values in results.items()
+        },
+        # Sem amostras (SQLite ou falha na amostragem) a métrica é None, e
+        # não uma contagem de zero conexões
+        "db_connections": (
+            {
+                "max": max(sampler.samples),
+                "mean": statistics.fmean(sampler.samples),
+                "samples": len(sampler.samples),
+            }
+            if sampler is not None and sampler.samples
+            else None
+        ),
+        # CPU do processo inteiro (todas as sessões compartilham o processo e o
+        # script de cada uma é executado em outra thread do AppTest): os
+        # valores por sessão e por execução são médias, não medições isoladas
+        "cpu": {
+            "process_seconds_total": cpu_seconds,
+            "avg_ms_per_session": cpu_seconds * 1000 / sessions,
+            "avg_ms_per_rerun": cpu_seconds * 1000 / len(all_reruns) if all_reruns else 0,
+            "utilization": cpu_seconds / wall_seconds if wall_seconds else 0,
+        },
+        "wall_seconds": wall_seconds,
+        "reruns_per_second": len(all_reruns) / wall_seconds if wall_seconds else 0,
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    """Executa o teste de carga e grava o resultado em JSON."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--users", type=int, default=10, help="Usuários sintéticos")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--ramp-up", type=float, default=10.0)
+    parser.add_argument("--think-time", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    result = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "sessions": args.sessions,
+            "users": args.users,
+            "cycles": args.cycles,
+            "ramp_up": args.ramp_up,
+            "think_time": args.think_time,
+        },
+        "load": run_load(
+            args.sessions,
+            args.users,
+            args.cycles,
+            args.ramp_up,
+            args.think_time,
+            args.seed,
+        ),
+    }
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Benchmark de renderização das páginas sem navegador (Streamlit AppTest).
+
+Os benchmarks de banco de dados não medem o custo de emissão de widgets
+(por exemplo, as seis colunas criadas por boleto em display_bills). Este
+módulo executa o app.py com streamlit.testing.v1.AppTest sobre a massa
+sintética, faz login, navega por todas as opções do menu de logged(),
+realiza edições e registra a latência de cada execução e a quantidade de
+elementos emitidos por página.
+
+Exemplos:
+    python -m benchmarks.render --reset --output render.json
+    python -m benchmarks.render --iterations 20 --bills 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import Widget
+from db.conn import get_db_connection, statement_budget
+from db.schema import ensure_schema
+from . import generator
+from .run import LOCAL_HOSTS
+from .scenarios import summarize
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py")
+MENU_LABEL = "Selecione uma opção"
+PAGES = ["Resumo", "Cartões de Crédito", "Boletos", "Contas fixas", "Renda"]
+
+# Edição realizada em cada página: botão que abre o formulário (ou None) e
+# botão que confirma a alteração
+EDITS = {
+    "Cartões de Crédito": ("✏️ Editar", "💾 Salvar"),
+    "Boletos": ("✏️ Editar", "💾 Salvar"),
+    "Contas fixas": ("✏️ Editar", "💾 Salvar"),
+    "Renda": (None, "💾 Salvar Renda"),
+}
+
+
+def _find(widgets, label):
+    """Retorna o primeiro widget com o rótulo informado."""
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Widget '{label}' não encontrado")
+
+
+def _prune_stale_widgets(node, state):
+    """Remove da árvore os widgets de execuções interrompidas por st.rerun.
+
+    O AppTest monta a árvore com as mensagens de todas as execuções de uma
+    chamada a run(); após um st.rerun (por exemplo, ao salvar uma edição),
+    permanecem os widgets da execução anterior não sobrescritos pela nova,
+    cujo estado já foi descartado e que impediriam a execução seguinte.
+    """
+    children = getattr(node, "children", None) or {}
+    for index, child in list(children.items()):
+        if isinstance(child, Widget) and child.id not in state:
+            del children[index]
+        else:
+            _prune_stale_widgets(child, state)
+
+
+def _count_elements(node):
+    """Conta recursivamente os elementos de um bloco do AppTest."""
+    children = getattr(node, "children", None) or {}
+    return 1 + sum(_count_elements(child) for child in children.values())
+
+
+class RenderSession:
+    """Sessão simulada do app.py com medição de cada execução.
+
+    Args:
+        timeout (float): Tempo máximo de cada execução em segundos.
+    """
+
+    def __init__(self, timeout=60):
+        self.app = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.durations = []
+
+    def run(self, widget=None):
+        """Executa o app (ou a interação pendente) e mede o tempo.
+
+        Args:
+            widget (optional): Widget já manipulado cuja execução é disparada.
+
+        Returns:
+            float: Duração da execução em milissegundos.
+        """
+        start = time.perf_counter()
+        (widget or self.app).run()
+        elapsed = (time.perf_counter() - start) * 1000
+        if self.app.exception:
+            raise RuntimeError(f"Erro na execução do app: {self.app.exception}")
+        _prune_stale_widgets(self.app.main, self.app.session_state)
+        _prune_stale_widgets(self.app.sidebar, self.app.session_state)
+        self.durations.append(elapsed)
+        return elapsed
+
+    def elements(self):
+        """Quantidade de elementos emitidos na área principal e na barra lateral."""
+        return _count_elements(self.app.main) + _count_elements(self.app.sidebar)
+
+    def login(self, email, password):
+        """Realiza o login pelo formulário da página inicial."""
+        self.run()
+        _find(self.app.text_input, "E-mail").input(email)
+        _find(self.app.text_input, "Senha").input(password)
+        self.run(_find(self.app.button, "Login").click())
+        if not self.app.session_state["logged_in"]:
+            raise RuntimeError("Falha no login do usuário de benchmark")
+
+    def navigate(self, page):
+        """Seleciona uma opção do menu de navegação."""
+        return self.run(_find(self.app.sidebar.selectbox, MENU_LABEL).select(page))
+
+    def edit(self, page):
+        """Abre o primeiro formulário de edição da página e o confirma.
+
+        Returns:
+            float | None: Duração da execução de confirmação, ou None se a
+                página não possuir edição (Resumo) ou itens editáveis.
+        """
+        if page not in EDITS:
+            return None
+        open_label, submit_label = EDITS[page]
+        if open_label:
+            try:
+                self.run(_find(self.app.button, open_label).click())
+            except LookupError:
+                return None
+        return self.run(_find(self.app.button, submit_label).click())
+
+
+def benchmark(email, password, iterations):
+    """Mede a renderização e as edições de cada página.
+
+    Args:
+        email (str): E-mail do usuário de benchmark.
+        password (str): Senha do usuário de benchmark.
+        iterations (int): Execuções medidas por página.
+
+    Returns:
+        dict: Estatísticas de latência, elementos emitidos e edições por página.
+    """
+    session = RenderSession()
+    session.login(email, password)
+
+    results = {}
+    for page in PAGES:
+        session.navigate(page)
+        durations = [session.run() for _ in range(iterations)]
+        results[page] = {
+            "rerun": summarize(durations),
+            "elements": session.elements(),
+        }
+
+        edits = []
+        for _ in range(max(1, iterations // 5)):
+            elapsed = session.edit(page)
+            if elapsed is None:
+                break
+            edits.append(elapsed)
+        results[page]["edit"] = summarize(edits) if edits else None
+
+    return results
+
+
+def main(argv=None):
+    """Executa o benchmark de renderização e grava o resultado em JSON."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.render")
+    parser.add_argument("--reset", action="store_true", help="Gera a massa de dados")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--bills", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        if os.getenv("DB_HOST") not in LOCAL_HOSTS:
+            sys.exit("DB_HOST não é local; a carga só é permitida em bancos locais.")
+        ensure_schema()
+        with statement_budget(0), get_db_connection() as conn:
+            generator.reset_tables(conn)
+            generator.generate(
+                conn,
+                users=args.users,
+                bills=args.bills,
+                cards=args.cards,
+                accounts=args.accounts,
+                seed=args.seed,
+                anchor=date.today(),
+            )
+
+    result = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "items_per_user": {
+                "bills": args.bills,
+                "cards": args.cards,
+                "accounts": args.accounts,
+            },
+            "iterations": args.iterations,
+        },
+        "pages": benchmark(
+            generator.BENCH_EMAIL.format(0), generator.BENCH_PASSWORD, args.iterations
+        ),
+    }
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Linha de comando para executar os benchmarks e gravar o resultado em JSON.
+
+O banco de dados utilizado é o configurado pelas variáveis DB_* (as mesmas da
+aplicação, inclusive DB_BACKEND=sqlite). Por segurança, a carga de dados só é aceita em hosts locais, a
+menos que --force seja informado.
+
+Exemplos:
+    python -m benchmarks.run --scale small --reset --output small.json
+    DB_PREPARED=0 python -m benchmarks.run --skip-load --output sem_prepare.json
+    python -m benchmarks.run --scale large --reset --iterations 200
+    python -m benchmarks.run --skip-load --only get_bills search_user_info
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import date
+from db.backends import get_backend
+from db.conn import (
+    POOL_SIZE,
+    PREPARED_ENABLED,
+    dialect,
+    execute_query,
+    get_db_connection,
+    statement_budget,
+)
+from db.schema import ensure_schema
+from . import generator, scenarios
+
+LOCAL_HOSTS = {None, "", "localhost", "127.0.0.1", "::1"}
+
+
+def parse_args(argv=None):
+    """Interpreta os argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Executa os benchmarks do controle financeiro.",
+    )
+    parser.add_argument("--scale", choices=sorted(generator.SCALES), default="small")
+    parser.add_argument("--users", type=int, help="Sobrescreve a quantidade de usuários")
+    parser.add_argument("--bills", type=int, help="Boletos por usuário")
+    parser.add_argument("--cards", type=int, help="Lançamentos de cartão por usuário")
+    parser.add_argument("--accounts", type=int, help="Contas fixas por usuário")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--anchor",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Data de referência da massa (AAAA-MM-DD)",
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--reset", action="store_true", help="Apaga as tabelas e gera a massa de dados"
+    )
+    parser.add_argument(
+        "--skip-load", action="store_true", help="Reutiliza a massa já carregada"
+    )
+    parser.add_argument("--only", nargs="+", choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument(
+        "--force", action="store_true", help="Permite carga em host não local"
+    )
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    """Retorna o commit atual do repositório, se disponível."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load(args, sizes):
+    """Recria o esquema e carrega a massa sintética.
+
+    Args:
+        args (Namespace): Argumentos da linha de comando.
+        sizes (dict): Usuários e itens por usuário a gerar.
+
+    Returns:
+        dict: Linhas carregadas por tabela e tempo de carga em segundos.
+    """
+    ensure_schema()
+    start = time.perf_counter()
+    # A carga das maiores escalas excede o tempo limite das tarefas em lote
+    with statement_budget(0), get_db_connection() as conn:
+        generator.reset_tables(conn)
+        counts = generator.generate(conn, **sizes, seed=args.seed, anchor=args.anchor)
+    return {"rows": counts, "seconds": time.perf_counter() - start}
+
+
+def main(argv=None):
+    """Executa a carga (opcional), os cenários e grava o resultado."""
+    args = parse_args(argv)
+
+    if not args.skip_load and not args.reset:
+        sys.exit("Use --reset para gerar a massa de dados ou --skip-load para reutilizá-la.")
+    if args.reset and os.getenv("DB_HOST") not in LOCAL_HOSTS and not args.force:
+        sys.exit("DB_HOST não é local; use --force para confirmar a carga.")
+
+    sizes = dict(generator.SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+
+    result = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "backend": dialect(),
+            "server_version": (execute_query(get_backend().version_query) or [[None]])[0][0],
+            "pool_size": POOL_SIZE,
+            "prepared": PREPARED_ENABLED,
+            "scale": args.scale,
+            "sizes": sizes,
+            "seed": args.seed,
+            "anchor": args.anchor.isoformat(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "load": load(args, sizes) if args.reset else None,
+        "scenarios": {},
+    }
+
+    ctx = scenarios.BenchContext(args.seed, args.anchor)
+    try:
+        for name in args.only or scenarios.SCENARIOS:
+            result["scenarios"][name] = scenarios.run_scenario(
+                ctx, name, args.iterations, args.warmup
+            )
+            print(
+                f"{name}: p50={result['scenarios'][name]['p50_ms']:.2f} ms",
+                file=sys.stderr,
+            )
+    finally:
+        scenarios.cleanup()
+
+    output = json.dumps(result, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Módulo de cenários cronometrados dos benchmarks.
+
+Cada cenário chama as mesmas funções de queries.py utilizadas pelas páginas,
+sorteando usuários e registros da massa sintética com uma semente fixa.
+Cenários de escrita gravam registros marcados com WRITE_MARKER, removidos ao
+final da execução, para que a massa de dados permaneça estável.
+
+Componentes principais:
+    - BenchContext: Estado compartilhado entre os cenários
+    - SCENARIOS: Registro dos cenários disponíveis
+    - run_scenario: Executa e cronometra um cenário
+    - cleanup: Remove os registros gravados pelos cenários de escrita
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from auth.authentication import check_password
+from auth.queries import get_user_by_email
+from creditcard.queries import (
+    save_credit_card,
+    get_credit_cards,
+    update_credit_card,
+    delete_credit_card,
+)
+from db.conn import execute_query, execute_update
+from fixedaccounts.queries import (
+    save_fixed_account,
+    get_fixed_accounts,
+    get_fixed_account_totals,
+    update_fixed_account,
+    delete_fixed_account,
+)
+from income.queries import get_existing_income, get_income_for_months, save_income
+from ledger.queries import get_monthly_totals
+from slips.queries import save_bill, get_bills, get_bill_changes, update_bill, delete_bill
+from summary.queries import search_user_info
+from .generator import BENCH_EMAIL_PATTERN, BENCH_PASSWORD
+
+WRITE_MARKER = "__bench_write__"
+SAMPLE_USERS = 200
+
+SCENARIOS = {}
+
+
+class BenchContext:
+    """Estado compartilhado entre os cenários de uma execução.
+
+    Args:
+        seed (int): Semente utilizada nos sorteios.
+        anchor (date): Data de referência da massa de dados.
+    """
+
+    def __init__(self, seed, anchor):
+        self.rng = random.Random(seed)
+        self.anchor = anchor
+        rows = execute_query(
+            "SELECT id, email FROM usuarios WHERE email LIKE %s ORDER BY id",
+            (BENCH_EMAIL_PATTERN,),
+        )
+        if not rows:
+            raise RuntimeError("Nenhum usuário de benchmark encontrado; gere a massa.")
+        sample = self.rng.sample(rows, min(SAMPLE_USERS, len(rows)))
+        self.users = [row[0] for row in sample]
+        self.emails = [row[1] for row in sample]
+
+    def user(self):
+        """Sorteia um usuário da amostra."""
+        return self.rng.choice(self.users)
+
+    def email(self):
+        """Sorteia o e-mail de um usuário da amostra."""
+        return self.rng.choice(self.emails)
+
+
+def scenario(name, group, prepare=None):
+    """Registra uma função como cenário de benchmark.
+
+    Args:
+        name (str): Nome único do cenário no resultado JSON.
+        group (str): Grupo do cenário ("read", "login" ou "write").
+        prepare (callable, optional): Função (ctx, iterations) executada fora
+            da medição, cujo retorno é passado a cada iteração.
+    """
+
+    def decorator(func):
+        SCENARIOS[name] = {"group": group, "run": func, "prepare": prepare}
+        return func
+
+    return decorator
+
+
+def _insert_marked_bills(ctx, iterations):
+    """Cria boletos marcados para os cenários de atualização e exclusão."""
+    due = datetime.combine(ctx.anchor, datetime.min.time())
+    user_ids = [ctx.user() for _ in range(iterations)]
+    rows = execute_update(
+        """
+        INSERT INTO boletos (usuario_id, titulo, valor_total, data_vencimento,
+                             parcelado, num_parcelas)
+        SELECT u, %s, 100, %s, FALSE, NULL FROM unnest(%s::int[]) AS u
+        RETURNING id
+        """,
+        (WRITE_MARKER, due, user_ids),
+        returning=True,
+    )
+    return [row[0] for row in rows]
+
+
+def _insert_marked_cards(ctx, iterations):
+    """Cria lançamentos de cartão marcados para o cenário de exclusão."""
+    due = datetime.combine(ctx.anchor, datetime.min.time())
+    user_ids = [ctx.user() for _ in range(iterations)]
+    rows = execute_update(
+        """
+        INSERT INTO cartoes_credito (usuario_id, nome_conta, num_parcelas,
+                                     valor_parcela, importancia, dia_vencimento,
+                                     data_criacao)
+        SELECT u, %s, 1, 50, 'Outros', %s, NOW() FROM unnest(%s::int[]) AS u
+        RETURNING id
+        """,
+        (WRITE_MARKER, due, user_ids),
+        returning=True,
+    )
+    return [row[0] for row in rows]
+
+
+def _insert_marked_accounts(ctx, iterations):
+    """Cria contas fixas marcadas para o cenário de exclusão."""
+    user_ids = [ctx.user() for _ in range(iterations)]
+    rows = execute_update(
+        """
+        INSERT INTO contas_fixas (usuario_id, titulo, valor_total)
+        SELECT u, %s, 80 FROM unnest(%s::int[]) AS u
+        RETURNING id
+        """,
+        (WRITE_MARKER, user_ids),
+        returning=True,
+    )
+    return [row[0] for row in rows]
+
+
+@scenario("search_user_info", "read")
+def _search_user_info(ctx, i, data):
+    search_user_info(ctx.user(), ctx.anchor.month, ctx.anchor.year)
+
+
+@scenario("income_for_12_months", "read")
+def _income_for_12_months(ctx, i, data):
+    index = ctx.anchor.year * 12 + ctx.anchor.month - 1
+    months = [((index - k) // 12, (index - k) % 12 + 1) for k in range(12)]
+    get_income_for_months(ctx.user(), months)
+
+
+@scenario("get_bills", "read")
+def _get_bills(ctx, i, data):
+    get_bills(ctx.user())
+
+
+@scenario("get_bill_changes", "read")
+def _get_bill_changes(ctx, i, data):
+    get_bill_changes(ctx.user(), datetime.now() - timedelta(hours=1))
+
+
+@scenario("get_credit_cards", "read")
+def _get_credit_cards(ctx, i, data):
+    get_credit_cards(ctx.user())
+
+
+@scenario("get_fixed_accounts", "read")
+def _get_fixed_accounts(ctx, i, data):
+    get_fixed_accounts(ctx.user())
+
+
+@scenario("fixed_account_totals_12_months", "read")
+def _fixed_account_totals_12_months(ctx, i, data):
+    index = ctx.anchor.year * 12 + ctx.anchor.month - 1
+    months = [((index - k) // 12, (index - k) % 12 + 1) for k in range(12)]
+    get_fixed_account_totals(ctx.user(), months)
+
+
+@scenario("ledger_totals_12_months", "read")
+def _ledger_totals_12_months(ctx, i, data):
+    index = ctx.anchor.year * 12 + ctx.anchor.month - 1
+    months = [((index - k) // 12, (index - k) % 12 + 1) for k in range(12)]
+    get_monthly_totals(ctx.user(), months)
+
+
+@scenario("get_existing_income", "read")
+def _get_existing_income(ctx, i, data):
+    get_existing_income(ctx.user())
+
+
+@scenario("login_lookup", "login")
+def _login_lookup(ctx, i, data):
+    get_user_by_email(ctx.email())
+
+
+@scenario("login", "login")
+def _login(ctx, i, data):
+    result = get_user_by_email(ctx.email())
+    check_password(BENCH_PASSWORD, bytes.fromhex(result[0][1][2:]))
+
+
+@scenario("save_bill", "write")
+def _save_bill(ctx, i, data):
+    due = ctx.anchor + timedelta(days=ctx.rng.randint(1, 60))
+    save_bill(ctx.user(), WRITE_MARKER, 150.0, due, False, None)
+
+
+@scenario("update_bill", "write", prepare=_insert_marked_bills)
+def _update_bill(ctx, i, data):
+    due = ctx.anchor + timedelta(days=10)
+    update_bill(data[i], WRITE_MARKER, 175.0, due, False, None, True, ctx.anchor)
+
+
+@scenario("delete_bill", "write", prepare=_insert_marked_bills)
+def _delete_bill(ctx, i, data):
+    delete_bill(data[i])
+
+
+@scenario("save_credit_card", "write")
+def _save_credit_card(ctx, i, data):
+    due = datetime.combine(ctx.anchor, datetime.min.time()) + timedelta(days=30)
+    save_credit_card(ctx.user(), WRITE_MARKER, 3, 49.9, "Outros", due)
+
+
+@scenario("update_credit_card", "write", prepare=_insert_marked_cards)
+def _update_credit_card(ctx, i, data):
+    due = datetime.combine(ctx.anchor, datetime.min.time()) + timedelta(days=15)
+    update_credit_card(
+        card_id=data[i],
+        account_name=WRITE_MARKER,
+        installments=2,
+        installment_value=60.0,
+        importance="Lazer",
+        due_date=due,
+    )
+
+
+@scenario("delete_credit_card", "write", prepare=_insert_marked_cards)
+def _delete_credit_card(ctx, i, data):
+    delete_credit_card(data[i])
+
+
+@scenario("save_fixed_account", "write")
+def _save_fixed_account(ctx, i, data):
+    save_fixed_account(ctx.user(), WRITE_MARKER, 99.9)
+
+
+@scenario("update_fixed_account", "write", prepare=_insert_marked_accounts)
+def _update_fixed_account(ctx, i, data):
+    update_fixed_account(data[i], WRITE_MARKER, 120.0)
+
+
+@scenario("delete_fixed_account", "write", prepare=_insert_marked_accounts)
+def _delete_fixed_account(ctx, i, data):
+    delete_fixed_account(data[i])
+
+
+@scenario("save_income", "write")
+def _save_income(ctx, i, data):
+    save_income(ctx.user(), ctx.rng.randrange(2_000, 20_000, 100), ctx.anchor)
+
+
+def _percentile(values, fraction):
+    """Calcula o percentil por interpolação linear de uma lista ordenada."""
+    if len(values) == 1:
+        return values[0]
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(durations_ms):
+    """Resume uma lista de durações em estatísticas de latência.
+
+    Args:
+        durations_ms (list[float]): Durações em milissegundos.
+
+    Returns:
+        dict: Iterações, média, mínimo, máximo e percentis 50/95/99.
+    """
+    ordered = sorted(durations_ms)
+    return {
+        "iterations": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "min_ms": ordered[0],
+        "p50_ms": _percentile(ordered, 0.50),
+        "p95_ms": _percentile(ordered, 0.95),
+        "p99_ms": _percentile(ordered, 0.99),
+        "max_ms": ordered[-1],
+    }
+
+
+def run_scenario(ctx, name, iterations, warmup=0):
+    """Executa um cenário, descartando as iterações de aquecimento.
+
+    Args:
+        ctx (BenchContext): Estado compartilhado da execução.
+        name (str): Nome do cenário registrado em SCENARIOS.
+        iterations (int): Iterações cronometradas.
+        warmup (int, optional): Iterações executadas antes da medição.
+
+    Returns:
+        dict: Grupo do cenário e estatísticas de latência (ver summarize).
+    """
+    spec = SCENARIOS[name]
+    total = warmup + iterations
+    data = spec["prepare"](ctx, total) if spec["prepare"] else None
+
+    durations = []
+    for i in range(total):
+        start = time.perf_counter()
+        spec["run"](ctx, i, data)
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            durations.append(elapsed)
+
+    return {"group": spec["group"], **summarize(durations)}
+
+
+def cleanup():
+    """Remove os registros gravados pelos cenários de escrita."""
+    execute_update("DELETE FROM boletos WHERE titulo = %s", (WRITE_MARKER,))
+    execute_update("DELETE FROM cartoes_credito WHERE nome_conta = %s", (WRITE_MARKER,))
+    execute_update("DELETE FROM contas_fixas WHERE titulo = %s", (WRITE_MARKER,))
+    execute_update("DELETE FROM contas_fixas_mensais WHERE titulo = %s", (WRITE_MARKER,))
+    execute_update("DELETE FROM lancamentos WHERE descricao = %s", (WRITE_MARKER,))
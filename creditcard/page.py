@@ -8,22 +8,30 @@ Funcionalidades principais:
     - Visualização de cartões de crédito existentes
     - Atualização de informações dos cartões
     - Exclusão de cartões de crédito
+    - Edição e exclusão em fragmentos: apenas a linha alterada é reexecutada
+    - Atualização incremental da lista carregada (apenas lançamentos alterados)
 
 Dependências:
     - streamlit: Para criação da interface web
     - datetime: Para manipulação de datas
-    - .queries: Para operações de banco de dados (save_credit_card, get_credit_cards, update_credit_card, delete_credit_card)
+    - ui.fragments: Para reexecutar apenas a linha alterada (rerun_fragment)
+    - .queries: Para operações de banco de dados (save_credit_card, get_credit_card_changes, update_credit_card, delete_credit_card)
 
 Exceções:
     - Erros de validação para campos obrigatórios
+    - Erros do banco de dados nas escritas, exibidos na página (st.error)
     - Erros de sessão para usuários não logados
 """
 
 import streamlit as st
+from admin.profiler import section
 from datetime import datetime
+from db.changes import merge_changes
+from db.conn import QueryTimeoutError
+from ui.fragments import fragment, rerun_fragment
 from .queries import (
     save_credit_card,
-    get_credit_cards,
+    get_credit_card_changes,
     update_credit_card,
     delete_credit_card,
 )
@@ -44,7 +52,7 @@ def credit_card_page():
 
     Componentes:
         - save_credit_card: Função para salvar um novo cartão de crédito
-        - get_credit_cards: Função para recuperar lançamentos existentes
+        - get_credit_card_changes: Função para recuperar lançamentos novos ou alterados
         - display_credit_cards: Função para exibir lançamentos cadastrados
     """
     user_id = st.session_state.get("user_id")
@@ -79,22 +87,61 @@ def credit_card_page():
             if not all([account_name, installments, installment_value]):
                 st.error("Campos obrigatórios marcados com *")
             else:
-                save_credit_card(
-                    user_id,
-                    account_name,
-                    installments,
-                    installment_value,
-                    importance,
-                    due_date,
-                )
-                st.session_state.pop("credit_cards", None)
-                st.rerun()
-
-    if "credit_cards" not in st.session_state:
-        st.session_state.credit_cards = get_credit_cards(user_id)
+                try:
+                    card = save_credit_card(
+                        user_id,
+                        account_name,
+                        installments,
+                        installment_value,
+                        importance,
+                        due_date,
+                    )
+                    replace_card(card[0], card)
+                    st.rerun()
+                except QueryTimeoutError as e:
+                    st.warning(f"⏳ {e}")
+                except Exception as e:
+                    st.error(f"Erro ao salvar o lançamento: {e}")
+
+    with section("Consulta de lançamentos"):
+        refresh_credit_cards(user_id)
     credit_cards = st.session_state.credit_cards
 
-    display_credit_cards(credit_cards, user_id)
+    with section("Listagem de lançamentos"):
+        display_credit_cards(credit_cards, user_id)
+
+
+def refresh_credit_cards(user_id):
+    """Carrega ou atualiza incrementalmente a lista de lançamentos da sessão.
+
+    Na primeira visita todos os lançamentos são lidos; nas seguintes, apenas
+    os alterados ou excluídos desde a última leitura (credit_cards_watermark).
+    Se a marca d'água expirou, a lista é recarregada.
+
+    Args:
+        user_id (int): ID do usuário logado.
+    """
+    watermark = None
+    if st.session_state.get("credit_cards") is not None:
+        watermark = st.session_state.get("credit_cards_watermark")
+
+    try:
+        changes = get_credit_card_changes(user_id, watermark)
+        if changes is None:
+            watermark = None
+            changes = get_credit_card_changes(user_id, None)
+    except Exception as e:
+        st.error(f"Erro ao carregar os lançamentos: {e}")
+        st.session_state.setdefault("credit_cards", [])
+        return
+
+    rows, deleted, st.session_state.credit_cards_watermark = changes
+    if watermark is None:
+        st.session_state.credit_cards = rows
+    elif rows or deleted:
+        st.session_state.credit_cards = merge_changes(
+            st.session_state.credit_cards, rows, deleted
+        )
 
 
 def display_credit_cards(credit_cards, user_id):
@@ -118,13 +165,58 @@ def display_credit_cards(credit_cards, user_id):
         return
 
     for card in credit_cards:
-        with st.container(border=True):
-            editing = st.session_state.get(f"editing_{card[0]}", False)
+        card_row(card[0], user_id)
 
-            if editing:
-                show_edit_form(card, user_id)
-            else:
-                show_card_info(card)
+
+@fragment
+def card_row(card_id, user_id):
+    """Renderiza um lançamento como fragmento independente.
+
+    Edições e exclusões reexecutam apenas este fragmento, lendo o lançamento
+    da lista mantida na sessão.
+
+    Args:
+        card_id (int): ID do lançamento a ser exibido.
+        user_id (int): ID do usuário associado ao lançamento.
+    """
+    cards = st.session_state.get("credit_cards") or []
+    card = next((c for c in cards if c[0] == card_id), None)
+    if card is None:
+        return
+
+    with st.container(border=True):
+        editing = st.session_state.get(f"editing_{card_id}", False)
+
+        if editing:
+            show_edit_form(card, user_id)
+        else:
+            show_card_info(card)
+
+
+def replace_card(card_id, card):
+    """Atualiza a lista de lançamentos da sessão sem consultá-la novamente.
+
+    O lançamento retornado pela escrita (RETURNING) substitui o de mesmo ID
+    ou, se for novo, é acrescentado ao final; com card None o lançamento é
+    removido. Se a lista ainda não foi carregada, nada é feito.
+
+    Args:
+        card_id (int): ID do lançamento alterado.
+        card (tuple | None): Lançamento retornado pela escrita, ou None se foi excluído.
+    """
+    if st.session_state.get("credit_cards") is None:
+        return
+    cards = []
+    found = False
+    for item in st.session_state.credit_cards:
+        if item[0] != card_id:
+            cards.append(item)
+        elif card is not None:
+            cards.append(card)
+            found = True
+    if card is not None and not found:
+        cards.append(card)
+    st.session_state.credit_cards = cards
 
 
 def show_card_info(card):
@@ -160,12 +252,17 @@ def show_card_info(card):
     action_col = cols[4]
     if action_col.button("✏️ Editar", key=f"edit_{card[0]}"):
         st.session_state[f"editing_{card[0]}"] = True
-        st.rerun()
+        rerun_fragment()
 
     if action_col.button("🗑️", key=f"del_{card[0]}"):
-        delete_credit_card(card[0])
-        st.session_state.pop("credit_cards", None)
-        st.rerun()
+        try:
+            delete_credit_card(card[0])
+            replace_card(card[0], None)
+            rerun_fragment()
+        except QueryTimeoutError as e:
+            st.warning(f"⏳ {e}")
+        except Exception as e:
+            st.error(f"Erro ao excluir o lançamento: {e}")
 
 
 def show_edit_form(card, user_id):
@@ -206,18 +303,23 @@ def show_edit_form(card, user_id):
 
         col1, col2, col3 = st.columns([2, 2, 4])
         if col1.form_submit_button("💾 Salvar"):
-            update_credit_card(
-                card_id=card[0],
-                account_name=new_name,
-                installments=new_installments,
-                installment_value=new_value,
-                importance=new_importance,
-                due_date=new_due_date,
-            )
-            st.session_state[f"editing_{card[0]}"] = False
-            st.session_state.pop("credit_cards", None)
-            st.rerun()
+            try:
+                updated = update_credit_card(
+                    card_id=card[0],
+                    account_name=new_name,
+                    installments=new_installments,
+                    installment_value=new_value,
+                    importance=new_importance,
+                    due_date=new_due_date,
+                )
+                st.session_state[f"editing_{card[0]}"] = False
+                replace_card(card[0], updated)
+                rerun_fragment()
+            except QueryTimeoutError as e:
+                st.warning(f"⏳ {e}")
+            except Exception as e:
+                st.error(f"Erro ao atualizar o lançamento: {e}")
 
         if col2.form_submit_button("❌ Cancelar"):
             st.session_state[f"editing_{card[0]}"] = False
-            st.rerun()
+            rerun_fragment()
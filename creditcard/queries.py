@@ -6,16 +6,32 @@ facilitando a interação com as tabelas de dados da aplicação.
 Funcionalidades principais:
     - Execução de consultas SQL de leitura
     - Execução de comandos SQL de escrita (inserção, atualização, exclusão)
+    - Sincronização das parcelas com o livro-razão (lancamentos) na mesma transação
+    - Escritas retornam a linha afetada (RETURNING) para atualizar listas em cache
+    - Leitura incremental dos lançamentos alterados desde uma marca d'água
 
 Dependências:
     - db.conn: Para obter as funções de conexão e execução de consultas (execute_query, execute_update)
+    - ledger.queries: Para sincronizar os lançamentos das parcelas
+    - db.changes.fetch_changes: Para a leitura incremental
 
 Exceções:
     - Erros de execução de consultas
     - Erros de conexão com o banco de dados
 """
 
-from db.conn import execute_query, execute_update
+from db.changes import fetch_changes
+from db.conn import execute_query, execute_update, prepared, transaction
+from ledger.queries import remove_entries, sync_credit_card
+
+# Lido a cada abertura da página de cartões
+GET_CREDIT_CARDS = prepared(
+    "get_credit_cards",
+    """SELECT id, nome_conta, num_parcelas, valor_parcela,
+              importancia, dia_vencimento, data_criacao
+       FROM cartoes_credito
+       WHERE usuario_id = %s""",
+)
 
 
 def save_credit_card(
@@ -33,26 +49,35 @@ def save_credit_card(
         importance (str): Importância do cartão (descrição).
         due_date (datetime): Data de vencimento do cartão.
 
+    Returns:
+        tuple: Lançamento inserido, no mesmo formato de get_credit_cards.
+
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
         IntegrityError: Lança um erro se houver problemas de integridade.
     """
-    execute_update(
-        """
-        INSERT INTO cartoes_credito 
-            (usuario_id, nome_conta, num_parcelas, valor_parcela, importancia,
-             dia_vencimento, data_criacao)
-        VALUES (%s, %s, %s, %s, %s, %s, NOW())
-        """,
-        (
-            user_id,
-            account_name,
-            installments,
-            installment_value,
-            importance,
-            due_date.strftime("%Y-%m-%d %H:%M:%S"),
-        ),
-    )
+    with transaction():
+        rows = execute_update(
+            """
+            INSERT INTO cartoes_credito 
+                (usuario_id, nome_conta, num_parcelas, valor_parcela, importancia,
+                 dia_vencimento, data_criacao)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            RETURNING id, nome_conta, num_parcelas, valor_parcela,
+                      importancia, dia_vencimento, data_criacao
+            """,
+            (
+                user_id,
+                account_name,
+                installments,
+                installment_value,
+                importance,
+                due_date.strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+            returning=True,
+        )
+        sync_credit_card(rows[0][0])
+    return rows[0]
 
 
 def get_credit_cards(user_id):
@@ -70,12 +95,28 @@ def get_credit_cards(user_id):
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
     """
-    return execute_query(
-        """SELECT id, nome_conta, num_parcelas, valor_parcela, 
-                  importancia, dia_vencimento, data_criacao 
-           FROM cartoes_credito 
-           WHERE usuario_id = %s""",
-        (user_id,),
+    return execute_query(GET_CREDIT_CARDS, (user_id,))
+
+
+def get_credit_card_changes(user_id, since):
+    """Recupera os lançamentos alterados e excluídos desde uma marca d'água.
+
+    Args:
+        user_id (int): ID do usuário.
+        since (datetime | None): Marca d'água da leitura anterior; None
+            retorna todos os lançamentos.
+
+    Returns:
+        tuple | None: (lançamentos, ids_excluidos, marca_dagua), com os
+            lançamentos no mesmo formato de get_credit_cards, ou None se a
+            lista precisar ser recarregada por completo.
+    """
+    return fetch_changes(
+        "cartoes_credito",
+        """id, nome_conta, num_parcelas, valor_parcela,
+           importancia, dia_vencimento, data_criacao""",
+        user_id,
+        since,
     )
 
 
@@ -94,29 +135,39 @@ def update_credit_card(
         importance (str): Nova importância do cartão (descrição).
         due_date (datetime): Nova data de vencimento do cartão.
 
+    Returns:
+        tuple | None: Lançamento atualizado, no mesmo formato de
+            get_credit_cards, ou None se o lançamento não existir.
+
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
         IntegrityError: Lança um erro se houver problemas de integridade.
     """
-    execute_update(
-        """
-        UPDATE cartoes_credito SET
-            nome_conta = %s,
-            num_parcelas = %s,
-            valor_parcela = %s,
-            importancia = %s,
-            dia_vencimento = %s
-        WHERE id = %s
-        """,
-        (
-            account_name,
-            installments,
-            installment_value,
-            importance,
-            due_date.strftime("%Y-%m-%d"),
-            card_id,
-        ),
-    )
+    with transaction():
+        rows = execute_update(
+            """
+            UPDATE cartoes_credito SET
+                nome_conta = %s,
+                num_parcelas = %s,
+                valor_parcela = %s,
+                importancia = %s,
+                dia_vencimento = %s
+            WHERE id = %s
+            RETURNING id, nome_conta, num_parcelas, valor_parcela,
+                      importancia, dia_vencimento, data_criacao
+            """,
+            (
+                account_name,
+                installments,
+                installment_value,
+                importance,
+                due_date.strftime("%Y-%m-%d"),
+                card_id,
+            ),
+            returning=True,
+        )
+        sync_credit_card(card_id)
+    return rows[0] if rows else None
 
 
 def delete_credit_card(card_id):
@@ -131,7 +182,9 @@ def delete_credit_card(card_id):
         OperationalError: Lança um erro se houver problemas de conexão.
         IntegrityError: Lança um erro se houver problemas de integridade.
     """
-    execute_update(
-        "DELETE FROM cartoes_credito WHERE id = %s",
-        (card_id,),
-    )
+    with transaction():
+        execute_update(
+            "DELETE FROM cartoes_credito WHERE id = %s",
+            (card_id,),
+        )
+        remove_entries("cartao", card_id)
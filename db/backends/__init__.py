@@ -0,0 +1,59 @@
+"""Backends de banco de dados utilizados pelo db.conn.
+
+O backend é escolhido pela variável DB_BACKEND na primeira conexão:
+
+    - postgres (padrão): Servidor PostgreSQL configurado por DB_HOST/DB_PORT
+    - sqlite: Arquivo SQLite local (DB_SQLITE_PATH), sem processo servidor,
+      para uso offline por um único usuário, testes e benchmarks locais
+
+Cada backend é um módulo com a mesma interface:
+    - NAME: Nome do dialeto ("postgres" ou "sqlite")
+    - OperationalError / IntegrityError: Exceções do driver
+    - connect(host, port, dbname, timeout_ms): Abre uma conexão compatível
+      com a DB-API do psycopg2 (cursor como gerenciador de contexto, commit e
+      rollback), cancelando comandos que excedam timeout_ms
+    - execute_batch(cursor, query, params_seq, page_size): Execução em lote
+    - is_transient(error): Indica se um erro pode ser repetido com segurança
+    - is_timeout(error): Indica se um comando excedeu o tempo limite
+    - is_disconnect(error): Indica se a conexão com o servidor foi perdida
+    - version_query: Consulta que retorna a versão do banco
+
+Exemplo:
+    DB_BACKEND=sqlite DB_SQLITE_PATH=financas.db streamlit run app.py
+"""
+
+import importlib
+import os
+import threading
+
+BACKENDS = {"postgres": "db.backends.postgres", "sqlite": "db.backends.sqlite"}
+
+_backend = None
+_lock = threading.Lock()
+
+
+def get_backend():
+    """Retorna o módulo do backend configurado em DB_BACKEND.
+
+    O módulo é importado apenas na primeira chamada, de modo que o driver
+    do backend não utilizado não precisa estar instalado.
+
+    Returns:
+        module: Módulo do backend.
+
+    Raises:
+        ValueError: Se DB_BACKEND tiver um valor desconhecido.
+
+    Example:
+        >>> get_backend().NAME
+        'postgres'
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                name = os.getenv("DB_BACKEND", "postgres").strip().lower() or "postgres"
+                if name not in BACKENDS:
+                    raise ValueError(f"DB_BACKEND desconhecido: {name}")
+                _backend = importlib.import_module(BACKENDS[name])
+    return _backend
@@ -0,0 +1,100 @@
+"""Backend PostgreSQL (padrão), através do psycopg2."""
+
+import os
+import psycopg2
+from psycopg2 import IntegrityError, OperationalError
+from psycopg2.extras import execute_batch
+
+NAME = "postgres"
+version_query = "SHOW server_version"
+
+# Códigos SQLSTATE de falhas transitórias além da classe 08 (conexão):
+# excesso de conexões, servidor reiniciando/em recuperação e conflitos de
+# serialização e deadlock
+TRANSIENT_CODES = {"53300", "57P01", "57P02", "57P03", "40001", "40P01"}
+
+# Códigos SQLSTATE de conexão encerrada pelo servidor, além da classe 08
+DISCONNECT_CODES = {"57P01", "57P02", "57P03"}
+
+__all__ = [
+    "NAME",
+    "IntegrityError",
+    "OperationalError",
+    "connect",
+    "execute_batch",
+    "is_disconnect",
+    "is_timeout",
+    "is_transient",
+    "version_query",
+]
+
+
+def connect(host=None, port=None, dbname=None, timeout_ms=0):
+    """Abre uma conexão com o servidor PostgreSQL.
+
+    A conexão desiste após DB_CONNECT_TIMEOUT_SECONDS (padrão: 5) e cada
+    comando é cancelado pelo servidor após timeout_ms (statement_timeout,
+    definido na abertura da conexão, sem ida extra ao servidor).
+
+    Args:
+        host (str, optional): Servidor a conectar. Padrão é DB_HOST.
+        port (str, optional): Porta do servidor. Padrão é DB_PORT.
+        dbname (str, optional): Nome do banco. Padrão é DB_NAME.
+        timeout_ms (int, optional): Tempo limite dos comandos; 0 = sem limite.
+
+    Returns:
+        connection: Conexão do psycopg2.
+    """
+    return psycopg2.connect(
+        dbname=dbname or os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=host or os.getenv("DB_HOST"),
+        port=port or os.getenv("DB_PORT"),
+        connect_timeout=os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"),
+        options=f"-c statement_timeout={int(timeout_ms or 0)}",
+    )
+
+
+def is_timeout(error):
+    """Indica se um comando foi cancelado por statement_timeout (SQLSTATE 57014)."""
+    return getattr(error, "pgcode", None) == "57014"
+
+
+def is_transient(error):
+    """Indica se um erro é uma falha transitória, que pode ser repetida.
+
+    Erros sem código SQLSTATE (servidor inacessível, conexão recusada ou
+    interrompida) e os códigos de TRANSIENT_CODES são transitórios; o
+    cancelamento por statement_timeout (57014) não é, para que consultas
+    lentas não sejam repetidas.
+
+    Args:
+        error (Exception): Erro lançado pelo psycopg2.
+
+    Returns:
+        bool: True se o erro for transitório.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+    code = getattr(error, "pgcode", None)
+    return code is None or code.startswith("08") or code in TRANSIENT_CODES
+
+
+def is_disconnect(error):
+    """Indica se um erro é a perda da conexão com o servidor.
+
+    Erros sem código SQLSTATE (conexão interrompida), da classe 08 e de
+    encerramento pelo servidor (DISCONNECT_CODES); conflitos de serialização
+    e deadlock não são.
+
+    Args:
+        error (Exception): Erro lançado pelo psycopg2.
+
+    Returns:
+        bool: True se a conexão foi perdida.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+    code = getattr(error, "pgcode", None)
+    return code is None or code.startswith("08") or code in DISCONNECT_CODES
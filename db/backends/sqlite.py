@@ -0,0 +1,541 @@
+"""Backend SQLite embarcado, para uso offline por um único usuário.
+
+O banco é um arquivo local (DB_SQLITE_PATH, padrão financas.db) aberto em
+modo WAL, de modo que leituras não bloqueiam a escrita em andamento e a
+aplicação inicia sem depender de um servidor. As conexões imitam a
+interface do psycopg2 utilizada pelo db.conn: os comandos continuam
+escritos no dialeto do PostgreSQL, com parâmetros %s, e são traduzidos
+por translate antes da execução.
+
+Traduções realizadas:
+    - Parâmetros %s e %% para ? e %
+    - Conversões ::tipo para date(), CAST ou remoção (timestamptz, arrays)
+    - EXTRACT(campo FROM expr) para strftime
+    - NOW(), CURRENT_TIMESTAMP, clock_timestamp() e CURRENT_DATE na hora local
+    - Aritmética com INTERVAL 'n unidade' e make_interval(unidade => n)
+    - Diferença de datas (expr - CURRENT_DATE) e soma de dias a CURRENT_DATE
+    - unnest(arrays) para json_each, com listas passadas como JSON
+    - ON CONFLICT em INSERT ... SELECT sem WHERE (ambiguidade do SQLite)
+    - ILIKE para LIKE (com ESCAPE '\\', padrão do PostgreSQL) e literais DATE '...'
+
+Não são suportados: CTEs com INSERT/UPDATE/DELETE, LATERAL,
+generate_series, COPY, LISTEN/NOTIFY e particionamento. As consultas que
+os utilizam possuem uma variante para o SQLite em seus módulos (ver
+db.conn.dialect) ou ficam indisponíveis neste backend.
+
+Tipos: colunas DATE, TIMESTAMP e BOOLEAN retornam date, datetime e bool,
+como no psycopg2; NUMERIC retorna float; bytes são gravados no formato
+texto \\x... do PostgreSQL.
+"""
+
+import calendar
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+NAME = "sqlite"
+OperationalError = sqlite3.OperationalError
+IntegrityError = sqlite3.IntegrityError
+version_query = "SELECT sqlite_version()"
+
+DEFAULT_PATH = "financas.db"
+BUSY_TIMEOUT_SECONDS = 5.0
+# Instruções da máquina virtual do SQLite entre verificações do tempo limite
+PROGRESS_STEPS = 10_000
+
+_wal_paths = set()
+_wal_lock = threading.Lock()
+
+
+def _to_date(value):
+    return date.fromisoformat(value.decode()[:10])
+
+
+def _to_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_converter("DATE", _to_date)
+sqlite3.register_converter("TIMESTAMP", _to_datetime)
+sqlite3.register_converter("TIMESTAMPTZ", _to_datetime)
+sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+
+
+def _adapt(value):
+    """Converte um parâmetro do psycopg2 para um valor aceito pelo SQLite."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return json.dumps([_adapt(item) for item in value])
+    return value
+
+
+# Funções do PostgreSQL implementadas em Python e registradas em cada conexão
+
+
+def _now():
+    return datetime.now().isoformat(" ", "milliseconds")
+
+
+def _parse(value):
+    """Interpreta uma data ou data e hora em texto; retorna (valor, só_data)."""
+    if isinstance(value, (int, float)):
+        return None, False
+    value = str(value)
+    if len(value) == 10:
+        return date.fromisoformat(value), True
+    return datetime.fromisoformat(value), False
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def _add_interval(value, amount, unit):
+    """Soma amount unidades (dias, meses, segundos...) a uma data em texto."""
+    if value is None or amount is None:
+        return None
+    parsed, date_only = _parse(value)
+    if parsed is None:
+        return None
+    unit = unit.lower().rstrip("s")
+    if unit in ("month", "mon", "year"):
+        months = int(amount) * (12 if unit == "year" else 1)
+        result = _add_months(parsed, months)
+    else:
+        seconds = {"day": 86400, "hour": 3600, "min": 60, "minute": 60}.get(unit, 1)
+        delta = timedelta(seconds=float(amount) * seconds)
+        if date_only and unit == "day" and float(amount).is_integer():
+            result = parsed + delta
+        else:
+            if date_only:
+                parsed = datetime.combine(parsed, datetime.min.time())
+            result = parsed + delta
+    if isinstance(result, datetime):
+        return result.isoformat(" ")
+    return result.isoformat()
+
+
+def _date_trunc(unit, value):
+    if value is None:
+        return None
+    parsed, _ = _parse(value)
+    unit = unit.lower()
+    if unit == "year":
+        return date(parsed.year, 1, 1).isoformat()
+    if unit == "month":
+        return date(parsed.year, parsed.month, 1).isoformat()
+    return date(parsed.year, parsed.month, parsed.day).isoformat()
+
+
+def _make_date(year, month, day):
+    return date(int(year), int(month), int(day)).isoformat()
+
+
+# Tradução do dialeto do PostgreSQL
+
+_IDENTIFIER = re.compile(r"[\w.?]")
+_CAST = re.compile(r"::\s*(\w+)(\s*\[\])?")
+_CAST_FUNCTIONS = {
+    "date": "date({})",
+    "int": "CAST({} AS INTEGER)",
+    "integer": "CAST({} AS INTEGER)",
+    "bigint": "CAST({} AS INTEGER)",
+    "numeric": "CAST({} AS NUMERIC)",
+    "text": "CAST({} AS TEXT)",
+}
+_EXTRACT_FORMATS = {"year": "%Y", "month": "%m", "day": "%d"}
+_INTERVAL = re.compile(r"INTERVAL\s+'(\d+)\s*(\w+)'|make_interval\s*\(\s*(\w+)\s*=>", re.I)
+
+
+def _closing(sql, start):
+    """Índice do parêntese que fecha o aberto em start."""
+    depth = 0
+    for index in range(start, len(sql)):
+        if sql[index] == "(":
+            depth += 1
+        elif sql[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError("Parênteses desbalanceados")
+
+
+def _opening(sql, end):
+    """Índice do parêntese que abre o fechado em end."""
+    depth = 0
+    for index in range(end, -1, -1):
+        if sql[index] == ")":
+            depth += 1
+        elif sql[index] == "(":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError("Parênteses desbalanceados")
+
+
+def _operand_before(sql, end):
+    """Início e fim do operando que termina antes de end (ignorando espaços)."""
+    stop = end
+    while stop > 0 and sql[stop - 1].isspace():
+        stop -= 1
+    start = stop
+    if start and sql[start - 1] == ")":
+        start = _opening(sql, start - 1)
+    elif start and sql[start - 1] == "'":
+        return sql.rindex("'", 0, start - 1), stop
+    while start and _IDENTIFIER.match(sql[start - 1]):
+        start -= 1
+    return start, stop
+
+
+def _split_arguments(text):
+    """Divide os argumentos de uma chamada nas vírgulas de primeiro nível."""
+    arguments, depth, current = [], 0, ""
+    for char in text:
+        if char == "," and depth == 0:
+            arguments.append(current.strip())
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    arguments.append(current.strip())
+    return arguments
+
+
+def _translate_casts(sql):
+    while True:
+        match = _CAST.search(sql)
+        if match is None:
+            return sql
+        start, stop = _operand_before(sql, match.start())
+        operand = sql[start:stop]
+        kind = match.group(1).lower()
+        if match.group(2) or kind not in _CAST_FUNCTIONS:
+            replacement = operand
+        else:
+            replacement = _CAST_FUNCTIONS[kind].format(operand)
+        sql = sql[:start] + replacement + sql[match.end():]
+
+
+def _translate_unnest(sql):
+    pattern = re.compile(r"\bunnest\s*\(", re.I)
+    while True:
+        match = pattern.search(sql)
+        if match is None:
+            return sql
+        close = _closing(sql, match.end() - 1)
+        arguments = _split_arguments(sql[match.end():close])
+        alias = re.match(r"\s+AS\s+(\w+)(?:\s*\(([^)]*)\))?", sql[close + 1:], re.I)
+        name = alias.group(1) if alias else "unnest"
+        if alias and alias.group(2):
+            columns = [column.strip() for column in alias.group(2).split(",")]
+        elif len(arguments) == 1:
+            columns = [name]
+        else:
+            columns = [f"c{index}" for index in range(len(arguments))]
+        selected = ", ".join(
+            f"j{index}.value AS {column}" for index, column in enumerate(columns)
+        )
+        joins = " ".join(
+            f"JOIN json_each({argument}) j{index} ON j{index}.key = j0.key"
+            for index, argument in enumerate(arguments)
+            if index
+        )
+        replacement = (
+            f"(SELECT {selected} FROM json_each({arguments[0]}) j0 {joins}) AS {name}"
+        )
+        end = close + 1 + (alias.end() if alias else 0)
+        sql = sql[:match.start()] + replacement + sql[end:]
+
+
+def _translate_extract(sql):
+    pattern = re.compile(r"\bEXTRACT\s*\(", re.I)
+    while True:
+        match = pattern.search(sql)
+        if match is None:
+            return sql
+        close = _closing(sql, match.end() - 1)
+        inner = re.match(r"\s*(\w+)\s+FROM\s+(.*)", sql[match.end():close], re.I | re.S)
+        field = _EXTRACT_FORMATS[inner.group(1).lower()]
+        replacement = f"CAST(strftime('{field}', {inner.group(2).strip()}) AS INTEGER)"
+        sql = sql[:match.start()] + replacement + sql[close + 1:]
+
+
+def _translate_intervals(sql):
+    while True:
+        match = _INTERVAL.search(sql)
+        if match is None:
+            return sql
+        if match.group(1):
+            amount, unit, end = match.group(1), match.group(2), match.end()
+        else:
+            close = _closing(sql, sql.index("(", match.start()))
+            amount, unit, end = f"({sql[match.end():close].strip()})", match.group(3), close + 1
+
+        position = match.start()
+        while sql[position - 1].isspace():
+            position -= 1
+        if sql[position - 1] == "*":
+            start, stop = _operand_before(sql, position - 1)
+            amount = f"({sql[start:stop]}) * {amount}"
+            position = start
+            while sql[position - 1].isspace():
+                position -= 1
+        operator = sql[position - 1]
+        if operator not in "+-":
+            raise ValueError("INTERVAL sem operando não é suportado no SQLite")
+        start, stop = _operand_before(sql, position - 1)
+        sign = "-" if operator == "-" else ""
+        replacement = f"add_interval({sql[start:stop]}, {sign}{amount}, '{unit}')"
+        sql = sql[:start] + replacement + sql[end:]
+
+
+def _translate_current_date(sql):
+    # Diferença em dias entre uma data e a data atual
+    pattern = re.compile(r"\s-\s*CURRENT_DATE\b", re.I)
+    while True:
+        match = pattern.search(sql)
+        if match is None:
+            break
+        start, stop = _operand_before(sql, match.start() + 1)
+        replacement = (
+            f"CAST(julianday({sql[start:stop]}) - julianday(CURRENT_DATE) AS INTEGER)"
+        )
+        sql = sql[:start] + replacement + sql[match.end():]
+
+    # Soma e subtração de dias à data atual
+    sql = re.sub(
+        r"\bCURRENT_DATE((?:\s*[+-]\s*(?:\?|\d+))+)",
+        lambda match: f"add_interval(CURRENT_DATE, (0 {match.group(1).strip()}), 'days')",
+        sql,
+        flags=re.I,
+    )
+    sql = re.sub(r"\bCURRENT_DATE\b", "date('now', 'localtime')", sql, flags=re.I)
+    sql = re.sub(
+        r"\bCURRENT_TIMESTAMP(\s+AT\s+TIME\s+ZONE\s+'[^']*')?", "now()", sql, flags=re.I
+    )
+    return re.sub(r"\bclock_timestamp\s*\(\s*\)", "now()", sql, flags=re.I)
+
+
+def _translate_upsert(sql):
+    """Inclui WHERE true em INSERT ... SELECT ... ON CONFLICT sem WHERE."""
+    result, last = "", 0
+    for match in re.finditer(r"\bON\s+CONFLICT\b", sql, re.I):
+        head = sql[last:match.start()]
+        insert = [m.end() for m in re.finditer(r"\bINSERT\b", sql[: match.start()], re.I)]
+        statement = sql[insert[-1]:match.start()] if insert else ""
+        froms = [m.end() for m in re.finditer(r"\bFROM\b", statement, re.I)]
+        if (
+            re.search(r"\bSELECT\b", statement, re.I)
+            and froms
+            and not re.search(r"\bWHERE\b", statement[froms[-1]:], re.I)
+        ):
+            head = head.rstrip() + " WHERE true "
+        result += head
+        last = match.start()
+    return result + sql[last:]
+
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """Traduz um comando do dialeto do PostgreSQL para o SQLite.
+
+    Args:
+        query (str): Comando SQL com parâmetros %s.
+
+    Returns:
+        str: Comando equivalente para o SQLite, com parâmetros ?.
+
+    Example:
+        >>> translate("SELECT * FROM boletos WHERE data_vencimento::date = %s")
+        'SELECT * FROM boletos WHERE date(data_vencimento) = ?'
+    """
+    sql = re.sub(r"%(s|%)", lambda match: "?" if match.group(1) == "s" else "%", query)
+    sql = _translate_casts(sql)
+    sql = _translate_unnest(sql)
+    sql = _translate_extract(sql)
+    sql = _translate_intervals(sql)
+    sql = _translate_current_date(sql)
+    sql = re.sub(r"\bDATE\s+'", "'", sql)
+    sql = re.sub(r"\bILIKE\b", "LIKE", sql, flags=re.I)
+    sql = re.sub(
+        r"(\bLIKE\s+(?:\?|'(?:[^']|'')*'))(?!\s+ESCAPE\b)",
+        r"\1 ESCAPE '\\'",
+        sql,
+        flags=re.I,
+    )
+    return _translate_upsert(sql)
+
+
+class Cursor:
+    """Cursor com a interface do psycopg2 utilizada pelo db.conn."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self._changes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query, params=()):
+        self.connection.begin(query)
+        self.connection.start_deadline()
+        before = self.connection.raw.total_changes
+        self._cursor.execute(translate(query), [_adapt(value) for value in params or ()])
+        # O sqlite3 não informa rowcount em comandos iniciados por WITH
+        self._changes = self.connection.raw.total_changes - before
+
+    def executemany(self, query, params_seq):
+        self.connection.begin(query)
+        self.connection.start_deadline()
+        self._cursor.executemany(
+            translate(query), ([_adapt(value) for value in params] for params in params_seq)
+        )
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        if self._cursor.rowcount < 0 and self._cursor.description is None:
+            return self._changes if self._changes is not None else -1
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    """Conexão SQLite com transações implícitas, como no psycopg2.
+
+    A transação é iniciada no primeiro comando: BEGIN para leituras e
+    BEGIN IMMEDIATE para escritas, que reservam a escrita desde o início e
+    aguardam outras escritas por até BUSY_TIMEOUT_SECONDS. Com timeout_ms,
+    um comando (incluindo a leitura das suas linhas) é interrompido após
+    esse tempo, como o statement_timeout do PostgreSQL.
+    """
+
+    def __init__(self, raw, timeout_ms=0):
+        self.raw = raw
+        self.autocommit = False
+        self.timeout_ms = timeout_ms or 0
+        self._deadline = None
+        if self.timeout_ms > 0:
+            raw.set_progress_handler(self._expired, PROGRESS_STEPS)
+
+    def _expired(self):
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    def start_deadline(self):
+        if self.timeout_ms > 0:
+            self._deadline = time.monotonic() + self.timeout_ms / 1000
+
+    def begin(self, query):
+        if self.autocommit or self.raw.in_transaction:
+            return
+        first = query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+        self.raw.execute("BEGIN" if first == "SELECT" else "BEGIN IMMEDIATE")
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self._deadline = None
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        self._deadline = None
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def close(self):
+        self.raw.close()
+
+
+def connect(host=None, port=None, dbname=None, timeout_ms=0):
+    """Abre o arquivo SQLite configurado, em modo WAL.
+
+    Args:
+        host (str, optional): Ignorado (compatibilidade com o PostgreSQL).
+        port (str, optional): Ignorado.
+        dbname (str, optional): Caminho do arquivo. Padrão é DB_SQLITE_PATH.
+        timeout_ms (int, optional): Tempo limite dos comandos; 0 = sem limite.
+
+    Returns:
+        Connection: Conexão com a interface do psycopg2.
+    """
+    path = dbname or os.getenv("DB_SQLITE_PATH", DEFAULT_PATH)
+    raw = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    raw.create_function("now", 0, _now)
+    raw.create_function("add_interval", 3, _add_interval)
+    raw.create_function("date_trunc", 2, _date_trunc, deterministic=True)
+    raw.create_function("make_date", 3, _make_date, deterministic=True)
+    raw.execute("PRAGMA foreign_keys = ON")
+    raw.execute("PRAGMA synchronous = NORMAL")
+    with _wal_lock:
+        if path not in _wal_paths:
+            raw.execute("PRAGMA journal_mode = WAL")
+            _wal_paths.add(path)
+    return Connection(raw, timeout_ms)
+
+
+def is_timeout(error):
+    """Indica se um comando foi interrompido pelo tempo limite da conexão."""
+    return isinstance(error, sqlite3.OperationalError) and "interrupted" in str(error)
+
+
+def is_transient(error):
+    """Indica se um erro é transitório (banco bloqueado por outra escrita)."""
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in str(error) or "busy" in str(error)
+    )
+
+
+def is_disconnect(error):
+    """Indica se a conexão foi perdida; nunca ocorre com um arquivo local."""
+    return False
+
+
+def execute_batch(cursor, query, params_seq, page_size=500):
+    """Executa o comando para cada conjunto de parâmetros (executemany).
+
+    page_size é aceito por compatibilidade; no SQLite não há idas ao servidor.
+    """
+    cursor.executemany(query, params_seq)
@@ -0,0 +1,169 @@
+"""Módulo de leitura incremental (delta) das listas dos usuários.
+
+As tabelas boletos, cartoes_credito e contas_fixas possuem a coluna
+atualizado_em, mantida por gatilho, e suas exclusões são registradas em
+registros_excluidos. Com isso, uma lista já carregada na sessão pode ser
+atualizada apenas com as linhas alteradas e os IDs excluídos desde a última
+leitura (marca d'água), inclusive quando as alterações foram feitas em
+outra aba, por importação ou pelo agendador.
+
+Componentes principais:
+    - fetch_changes: Linhas alteradas e IDs excluídos desde uma marca d'água
+    - merge_changes: Aplica as alterações a uma lista já carregada
+    - purge_deleted_records: Limpeza dos registros de exclusão antigos
+
+As leituras incrementais são somente de leitura: são feitas na réplica
+escolhida para a sessão e não a fixam no primário.
+
+Dependências:
+    - db.conn.transaction: Leituras da marca d'água e das alterações no mesmo
+      instantâneo, em uma transação somente de leitura (read_only=True)
+    - db.conn.execute_update: Limpeza dos registros de exclusão, em segundo plano
+    - db.shards: Roteamento ao shard do usuário e limpeza em cada shard
+"""
+
+import threading
+import time
+from db.conn import dialect, execute_update, transaction
+from db.shards import for_each_shard, use_user_shard
+
+# Margem aplicada à marca d'água para incluir transações que gravaram antes
+# da leitura anterior mas só confirmaram depois dela
+DELTA_OVERLAP_SECONDS = 5
+
+# Registros de exclusão mais antigos são removidos; marcas d'água anteriores
+# a este período exigem uma recarga completa
+DELETED_RETENTION_DAYS = 7
+DELETED_PURGE_INTERVAL_SECONDS = 3600
+
+_purge_lock = threading.Lock()
+_last_purge = None
+
+
+def fetch_changes(table, columns, user_id, since):
+    """Recupera as linhas alteradas e os IDs excluídos desde uma marca d'água.
+
+    Sem marca d'água (since None), todas as linhas do usuário são retornadas.
+    Linhas lidas novamente por causa da margem DELTA_OVERLAP_SECONDS são
+    inofensivas, pois a lista é atualizada por ID. As consultas usam uma
+    transação somente de leitura no servidor de leitura da sessão; numa
+    réplica, a marca d'água é o instante da última transação replicada, de
+    modo que alterações ainda não replicadas são lidas na próxima vez.
+
+    Args:
+        table (str): "boletos", "cartoes_credito" ou "contas_fixas".
+        columns (str): Colunas selecionadas, com o ID na primeira posição.
+        user_id (int): ID do usuário.
+        since (datetime | None): Marca d'água retornada pela leitura anterior.
+
+    Returns:
+        tuple | None: (linhas, ids_excluidos, marca_dagua), ou None se a
+            marca d'água for anterior à retenção dos registros de exclusão e
+            a lista precisar ser recarregada por completo.
+
+    Example:
+        >>> rows, deleted, watermark = fetch_changes(
+        >>>     "boletos", "id, titulo", 1, None
+        >>> )
+    """
+    purge_deleted_records()
+
+    # No primário pg_last_xact_replay_timestamp() é NULL e vale now()
+    now = "now()"
+    if dialect() == "postgres":
+        now = "COALESCE(pg_last_xact_replay_timestamp(), now())"
+
+    with use_user_shard(user_id), transaction(read_only=True) as uow:
+        watermark, expired = uow.query(
+            f"SELECT {now}, %s::timestamptz < now() - make_interval(days => %s)",
+            (since, DELETED_RETENTION_DAYS),
+        )[0]
+        if since is None:
+            rows = uow.query(
+                f"SELECT {columns} FROM {table} WHERE usuario_id = %s", (user_id,)
+            )
+            return rows, [], watermark
+        if expired:
+            return None
+
+        rows = uow.query(
+            f"""
+            SELECT {columns} FROM {table}
+            WHERE usuario_id = %s
+              AND atualizado_em > %s - make_interval(secs => %s)
+            """,
+            (user_id, since, DELTA_OVERLAP_SECONDS),
+        )
+        deleted = uow.query(
+            """
+            SELECT item_id FROM registros_excluidos
+            WHERE tabela = %s AND usuario_id = %s
+              AND excluido_em > %s - make_interval(secs => %s)
+            """,
+            (table, user_id, since, DELTA_OVERLAP_SECONDS),
+        )
+    return rows, [row[0] for row in deleted], watermark
+
+
+def merge_changes(current, rows, deleted):
+    """Aplica linhas alteradas e IDs excluídos a uma lista já carregada.
+
+    Linhas existentes são substituídas na mesma posição, novas linhas são
+    acrescentadas ao final e IDs excluídos são removidos.
+
+    Args:
+        current (list[tuple]): Lista carregada, com o ID na primeira posição.
+        rows (list[tuple]): Linhas alteradas retornadas por fetch_changes.
+        deleted (list[int]): IDs excluídos retornados por fetch_changes.
+
+    Returns:
+        list[tuple]: Nova lista com as alterações aplicadas.
+
+    Example:
+        >>> merge_changes([(1, "a"), (2, "b")], [(2, "c"), (3, "d")], [1])
+        [(2, 'c'), (3, 'd')]
+    """
+    changed = {row[0]: row for row in rows}
+    removed = set(deleted)
+    merged = [
+        changed.pop(item[0], item) for item in current if item[0] not in removed
+    ]
+    merged.extend(row for row in changed.values() if row[0] not in removed)
+    return merged
+
+
+def purge_deleted_records(force=False):
+    """Remove os registros de exclusão mais antigos que a retenção.
+
+    A limpeza é executada no máximo uma vez a cada
+    DELETED_PURGE_INTERVAL_SECONDS por processo, a menos que force=True,
+    em uma thread em segundo plano: fora da sessão do usuário, a escrita não
+    fixa as leituras da sessão no primário nem atrasa a página. Com shards
+    configurados, a limpeza é feita em cada shard.
+
+    Args:
+        force (bool, optional): Ignora o intervalo mínimo entre limpezas.
+    """
+    global _last_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if (
+            not force
+            and _last_purge is not None
+            and now - _last_purge < DELETED_PURGE_INTERVAL_SECONDS
+        ):
+            return
+        _last_purge = now
+
+    threading.Thread(
+        target=_purge_deleted_records, name="purge-deleted-records", daemon=True
+    ).start()
+
+
+def _purge_deleted_records():
+    """Remove os registros de exclusão antigos em cada shard."""
+    for _ in for_each_shard():
+        execute_update(
+            "DELETE FROM registros_excluidos WHERE excluido_em < now() - make_interval(days => %s)",
+            (DELETED_RETENTION_DAYS,),
+        )
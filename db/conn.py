@@ -1,4 +1,4 @@
-"""Módulo de conexão e gerenciamento de banco de dados PostgreSQL.
+"""Módulo de conexão e gerenciamento de banco de dados.
 
 Este módulo é responsável por gerenciar a conexão com o banco de dados,
 executar consultas e atualizações, e garantir a integridade das transações.
@@ -7,61 +7,598 @@ Funcionalidades principais:
     - Estabelecimento de conexão com o banco de dados
     - Execução de consultas SQL e atualizações
     - Gerenciamento de transações com rollback em caso de erro
+    - Ganchos (hooks) de observação executados após cada comando SQL
+    - Transações com vários comandos (unidade de trabalho) e savepoints
+    - Leituras encaminhadas às réplicas (DB_REPLICA_HOSTS), com leitura das
+      próprias escritas no primário durante DB_READ_YOUR_WRITES_SECONDS
+    - Conexão ao shard do usuário quando DB_SHARDS está configurado (db.shards)
+    - Backend PostgreSQL (padrão) ou SQLite local (DB_BACKEND, ver db.backends)
+    - Novas tentativas de conexão com espera exponencial aleatória em falhas
+      transitórias e disjuntor (circuit breaker) por servidor, que falha
+      imediatamente enquanto o banco estiver fora do ar
+    - Tempo limite dos comandos no servidor (statement_timeout) por ponto de
+      chamada, com padrões distintos para páginas interativas e tarefas em lote
+    - Pool de conexões ociosas por servidor e comandos frequentes preparados
+      (PREPARE) uma vez por conexão e executados pelo nome (prepared)
+    - Conexões do pool encerradas pelo servidor enquanto ociosas são
+      substituídas por uma nova, repetindo uma única vez o comando que falhou
+
+Este é o único ponto de acesso ao banco de dados utilizado pelos módulos
+auth, creditcard, fixedaccounts, income, slips e summary. Recursos
+transversais (medição de tempo, pool de conexões, cache) devem ser
+implementados aqui para valerem em todos os caminhos de leitura e escrita.
 
 Dependências:
-    - psycopg2: Para interação com o banco de dados PostgreSQL
+    - db.backends: Driver do banco configurado (psycopg2 ou sqlite3)
+    - tenacity: Novas tentativas de conexão
     - os: Para acessar variáveis de ambiente
     - contextlib: Para gerenciamento de contexto
     - logging: Para registro de erros e eventos
 
 Exceções:
     - Erros de conexão com o banco de dados
+    - DatabaseUnavailableError: Disjuntor aberto para o servidor
+    - QueryTimeoutError: Comando cancelado por exceder o tempo limite
     - Erros de integridade durante as transações
     - Erros inesperados durante a execução de consultas
 """
 
-import psycopg2
+import itertools
 import os
+import re
+import sys
+import threading
+import time
+import weakref
 from contextlib import contextmanager
-from psycopg2 import OperationalError, IntegrityError
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from db import shards
+from db.backends import get_backend
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_query_hooks = []
+_local = threading.local()
+
+# Janela, após uma escrita, em que as leituras da mesma sessão vão ao primário
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+_replica_counter = itertools.count()
+_last_writes = {}
+_writes_lock = threading.Lock()
+_session_resolver = threading.get_ident
+
+# Tentativas de conexão em falhas transitórias, com espera exponencial
+# aleatória (jitter) entre RETRY_BASE_SECONDS e RETRY_MAX_WAIT_SECONDS
+RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("DB_RETRY_BASE_SECONDS", "0.1"))
+RETRY_MAX_WAIT_SECONDS = float(os.getenv("DB_RETRY_MAX_WAIT_SECONDS", "2"))
+
+# Falhas de conexão seguidas que abrem o disjuntor de um servidor e tempo
+# até uma nova tentativa
+BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("DB_BREAKER_RESET_SECONDS", "30"))
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Tempo limite dos comandos (ms; 0 = sem limite) das páginas interativas e
+# das tarefas em lote (agendador, manutenção, criação do esquema)
+INTERACTIVE_TIMEOUT_MS = int(os.getenv("DB_INTERACTIVE_TIMEOUT_MS", "5000"))
+BATCH_TIMEOUT_MS = int(os.getenv("DB_BATCH_TIMEOUT_MS", "600000"))
+
+
+def _parse_budgets(value):
+    """Lê pares modulo.funcao=ms separados por vírgula (DB_QUERY_BUDGETS)."""
+    budgets = {}
+    for item in value.split(","):
+        caller, _, timeout_ms = item.strip().partition("=")
+        if caller and timeout_ms.strip().isdigit():
+            budgets[caller.strip()] = int(timeout_ms)
+    return budgets
+
+
+# Tempo limite por ponto de chamada (função de queries.py que abre a
+# conexão), sobrepondo o padrão interativo; os agregados do resumo percorrem
+# vários meses e recebem um orçamento maior
+QUERY_BUDGETS_MS = {
+    "ledger.queries.get_monthly_totals": 10_000,
+    "fixedaccounts.queries.materialize_fixed_accounts": 10_000,
+    "fixedaccounts.queries.get_fixed_account_totals": 10_000,
+    "income.queries.get_income_for_months": 10_000,
+    **_parse_budgets(os.getenv("DB_QUERY_BUDGETS", "")),
+}
+
+_workload = "interactive"
+
+# Conexões ociosas mantidas por servidor (0 desativa o pool) e tempo máximo
+# ociosas antes de serem descartadas; apenas no PostgreSQL
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_IDLE_SECONDS = float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+
+# Comandos registrados com prepared(); DB_PREPARED=0 os executa como texto
+# (por exemplo, atrás de um PgBouncer em modo transaction)
+PREPARED_ENABLED = os.getenv("DB_PREPARED", "1") != "0"
+PREPARED_STATEMENTS = {}
+
+_pool = {}
+_pool_lock = threading.Lock()
+# Comandos preparados em cada conexão e conexões retiradas do pool que ainda
+# não executaram nenhum comando; as entradas somem com a própria conexão
+_prepared_on = weakref.WeakKeyDictionary()
+_untouched_checkouts = weakref.WeakSet()
+
+
+class DatabaseUnavailableError(Exception):
+    """Erro lançado sem contatar o servidor enquanto seu disjuntor está aberto."""
+
+
+class QueryTimeoutError(Exception):
+    """Comando cancelado pelo banco por exceder o tempo limite do seu ponto de chamada.
+
+    A mensagem pode ser exibida diretamente ao usuário.
+
+    Args:
+        caller (str): Função que originou o comando.
+        timeout_ms (int): Tempo limite aplicado, em milissegundos.
+    """
+
+    def __init__(self, caller, timeout_ms):
+        super().__init__(
+            f"A consulta demorou mais de {timeout_ms / 1000:g} s e foi cancelada. "
+            "Tente novamente em instantes."
+        )
+        self.caller = caller
+        self.timeout_ms = timeout_ms
+
+
+class CircuitBreaker:
+    """Disjuntor das conexões com um servidor de banco de dados.
+
+    Após BREAKER_FAILURES falhas de conexão seguidas, o disjuntor abre e as
+    novas conexões falham imediatamente com DatabaseUnavailableError, sem
+    aguardar o tempo limite de conexão nem gerar mais carga no servidor.
+    Passados BREAKER_RESET_SECONDS, uma única conexão de teste é permitida:
+    se ela funcionar o disjuntor fecha; caso contrário, volta a abrir.
+
+    Args:
+        name (str): Servidor protegido, usado nas mensagens de log.
+        threshold (int, optional): Falhas seguidas que abrem o disjuntor.
+        reset_seconds (float, optional): Tempo aberto até a conexão de teste.
+
+    Example:
+        >>> breaker = CircuitBreaker("localhost:5432/financas")
+        >>> breaker.before_connect()
+        >>> breaker.record_success()
+    """
+
+    def __init__(self, name, threshold=None, reset_seconds=None):
+        self.name = name
+        self.threshold = threshold or BREAKER_FAILURES
+        self.reset_seconds = BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Estado atual: "closed", "open" ou "half-open"."""
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self.opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def before_connect(self):
+        """Verifica se uma conexão pode ser tentada.
+
+        Raises:
+            DatabaseUnavailableError: Se o disjuntor estiver aberto ou se
+                outra thread já estiver fazendo a conexão de teste.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if not self._probing and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._probing = True
+                return
+        raise DatabaseUnavailableError(f"Banco de dados indisponível: {self.name}")
+
+    def record_success(self):
+        """Registra uma conexão bem-sucedida, fechando o disjuntor."""
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Conexão restabelecida com {self.name}; disjuntor fechado")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Registra uma falha de conexão, abrindo o disjuntor se necessário."""
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.error(
+                        f"Disjuntor aberto para {self.name} após {self.failures} falhas; "
+                        f"novas conexões falham por {self.reset_seconds:g} s"
+                    )
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+def _breaker_for(host, port, dbname):
+    """Retorna o disjuntor do servidor informado, criando-o se necessário."""
+    if dialect() == "postgres":
+        name = (
+            f"{host or os.getenv('DB_HOST') or 'localhost'}:{port or os.getenv('DB_PORT') or ''}"
+            f"/{dbname or os.getenv('DB_NAME') or ''}"
+        )
+    else:
+        name = dbname or os.getenv("DB_SQLITE_PATH", "")
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states():
+    """Retorna o estado do disjuntor de cada servidor já utilizado.
+
+    Returns:
+        dict: Estado ("closed", "open" ou "half-open") por servidor.
+
+    Example:
+        >>> breaker_states()
+        {'localhost:5432/financas': 'closed'}
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+def set_workload(kind):
+    """Define o tipo de carga do processo, que escolhe o tempo limite padrão.
+
+    Processos em lote (agendador de lembretes, manutenção do livro-razão)
+    chamam esta função no início; a aplicação Streamlit mantém o padrão.
+
+    Args:
+        kind (str): "interactive" (INTERACTIVE_TIMEOUT_MS) ou "batch"
+            (BATCH_TIMEOUT_MS).
+
+    Raises:
+        ValueError: Se o tipo for desconhecido.
+
+    Example:
+        >>> set_workload("batch")
+    """
+    global _workload
+    if kind not in ("interactive", "batch"):
+        raise ValueError(f"Tipo de carga desconhecido: {kind}")
+    _workload = kind
+
+
+@contextmanager
+def statement_budget(timeout_ms):
+    """Fixa o tempo limite das conexões abertas no bloco (na thread atual).
+
+    Tem precedência sobre QUERY_BUDGETS_MS e o padrão do tipo de carga.
+
+    Args:
+        timeout_ms (int): Tempo limite em milissegundos; 0 remove o limite.
+
+    Example:
+        >>> with statement_budget(BATCH_TIMEOUT_MS):
+        >>>     ensure_ledger_partitions()
+    """
+    stack = _local.__dict__.setdefault("budgets", [])
+    stack.append(timeout_ms)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+def statement_timeout_ms(caller=None):
+    """Retorna o tempo limite dos comandos de um ponto de chamada.
+
+    A ordem de precedência é: statement_budget ativo na thread,
+    QUERY_BUDGETS_MS do ponto de chamada e o padrão do tipo de carga.
+
+    Args:
+        caller (str, optional): Função no formato "modulo.funcao".
+
+    Returns:
+        int: Tempo limite em milissegundos (0 = sem limite).
+
+    Example:
+        >>> statement_timeout_ms("ledger.queries.get_monthly_totals")
+        10000
+    """
+    stack = getattr(_local, "budgets", None)
+    if stack:
+        return stack[-1]
+    if caller in QUERY_BUDGETS_MS:
+        return QUERY_BUDGETS_MS[caller]
+    return BATCH_TIMEOUT_MS if _workload == "batch" else INTERACTIVE_TIMEOUT_MS
+
+
+class PreparedStatement(str):
+    """Comando SQL registrado com prepared(), executado pelo nome no PostgreSQL.
+
+    É um str com o texto original do comando, de modo que pode ser passado a
+    execute_query, execute_update e à unidade de trabalho como qualquer
+    outro comando (inclusive no SQLite, onde é executado como texto).
+
+    Attributes:
+        name (str): Nome do comando preparado.
+        body (str): Comando com parâmetros $1..$n, usado no PREPARE.
+        param_count (int): Quantidade de parâmetros.
+    """
+
+
+def prepared(name, query):
+    """Registra um comando frequente para ser preparado uma vez por conexão.
 
-def get_connection():
-    """Estabelece uma conexão com o banco de dados PostgreSQL.
+    Na primeira execução em cada conexão do pool, o comando é enviado com
+    PREPARE; as execuções seguintes usam EXECUTE com o nome, sem nova
+    análise e planejamento pelo servidor.
+
+    Args:
+        name (str): Nome único do comando (letras minúsculas, dígitos e _).
+        query (str): Comando SQL com parâmetros %s.
+
+    Returns:
+        PreparedStatement: Comando a ser passado para execute_query.
+
+    Raises:
+        ValueError: Se o nome for inválido ou já estiver registrado com
+            outro comando, ou se o comando usar parâmetros nomeados.
+
+    Example:
+        >>> GET_BILLS = prepared("get_bills", "SELECT * FROM boletos WHERE usuario_id = %s")
+        >>> execute_query(GET_BILLS, (1,))
+    """
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+        raise ValueError(f"Nome de comando preparado inválido: {name}")
+    if "%(" in query:
+        raise ValueError("Comandos preparados não aceitam parâmetros nomeados")
+    existing = PREPARED_STATEMENTS.get(name)
+    if existing is not None and existing != query:
+        raise ValueError(f"Comando preparado já registrado: {name}")
+
+    counter = itertools.count(1)
+    statement = PreparedStatement(query)
+    statement.name = name
+    statement.body = re.sub(
+        r"%(s|%)",
+        lambda match: f"${next(counter)}" if match.group(1) == "s" else "%",
+        query,
+    ).strip().rstrip(";")
+    statement.param_count = next(counter) - 1
+    PREPARED_STATEMENTS[name] = statement
+    return statement
+
+
+def _prepared_sql(cursor, statement):
+    """Prepara o comando na conexão do cursor, se necessário, e retorna o EXECUTE."""
+    names = _prepared_on.setdefault(cursor.connection, set())
+    if statement.name not in names:
+        cursor.execute(f"PREPARE {statement.name} AS {statement.body}")
+        names.add(statement.name)
+    if not statement.param_count:
+        return f"EXECUTE {statement.name}"
+    return f"EXECUTE {statement.name} ({', '.join(['%s'] * statement.param_count)})"
+
+
+def _acquire(host, port, dbname, timeout_ms, attempts=None, fresh=False):
+    """Obtém uma conexão ociosa do pool ou abre uma nova.
+
+    O pool é separado por servidor, banco e tempo limite, que é definido na
+    abertura da conexão (ver statement_timeout_ms). Com fresh=True, o pool é
+    ignorado e uma conexão nova é sempre aberta.
+
+    Returns:
+        tuple: (conexão, chave do pool, True se a conexão foi aberta agora).
+    """
+    key = (host, port, dbname, timeout_ms)
+    if POOL_SIZE > 0 and dialect() == "postgres" and not fresh:
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with _pool_lock:
+            idle = _pool.get(key, [])
+            while idle:
+                candidate, released_at = idle.pop()
+                if candidate.closed or now - released_at > POOL_MAX_IDLE_SECONDS:
+                    stale.append(candidate)
+                else:
+                    conn = candidate
+                    break
+        for candidate in stale:
+            _discard(candidate)
+        if conn is not None:
+            _untouched_checkouts.add(conn)
+            return conn, key, False
+    conn = get_connection(host, port, dbname, attempts=attempts, timeout_ms=timeout_ms)
+    return conn, key, True
+
+
+def _discard(conn):
+    """Fecha uma conexão e esquece os comandos preparados nela."""
+    _prepared_on.pop(conn, None)
+    try:
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Erro ao fechar conexão: {e}")
+
+
+def _release(key, conn, reusable):
+    """Devolve uma conexão ao pool, ou a fecha se o pool estiver cheio.
+
+    A conexão é descartada se estiver quebrada ou se o bloco terminou com
+    uma falha de conexão (reusable=False).
+    """
+    if reusable and POOL_SIZE > 0 and dialect() == "postgres" and not conn.closed:
+        try:
+            conn.rollback()
+            conn.autocommit = False
+        except Exception:
+            reusable = False
+        if reusable:
+            with _pool_lock:
+                idle = _pool.setdefault(key, [])
+                if len(idle) < POOL_SIZE:
+                    idle.append((conn, time.monotonic()))
+                    return
+    _discard(conn)
+
+
+def _log_retry(retry_state):
+    """Registra uma nova tentativa de conexão."""
+    logger.warning(
+        f"Falha transitória ao conectar (tentativa {retry_state.attempt_number}): "
+        f"{retry_state.outcome.exception()}"
+    )
+
+
+def dialect():
+    """Retorna o dialeto do backend configurado ("postgres" ou "sqlite").
+
+    Consultas sem tradução automática para o SQLite (ver db.backends.sqlite)
+    utilizam o dialeto para escolher a variante do comando.
+
+    Example:
+        >>> if dialect() == "sqlite":
+        >>>     ...
+    """
+    return get_backend().NAME
+
+
+def get_connection(host=None, port=None, dbname=None, attempts=None, timeout_ms=None):
+    """Estabelece uma conexão com o banco de dados configurado.
 
     Esta função utiliza as variáveis de ambiente para obter as credenciais
-    necessárias e tenta conectar ao banco de dados. Em caso de falha, um erro
-    é registrado.
+    necessárias e tenta conectar ao banco de dados. Falhas transitórias são
+    repetidas até attempts vezes, com espera exponencial aleatória; em caso
+    de falha definitiva, um erro é registrado no disjuntor do servidor, que
+    passa a recusar novas conexões após BREAKER_FAILURES falhas seguidas.
+    Apenas a conexão é repetida: um comando que falhou pode ter sido
+    aplicado, e repetir consultas lentas aumentaria a carga do servidor.
+    Com DB_BACKEND=sqlite, a conexão é aberta no arquivo DB_SQLITE_PATH e
+    host e porta são ignorados.
+
+    Args:
+        host (str, optional): Servidor a conectar. Padrão é DB_HOST (primário).
+        port (str, optional): Porta do servidor. Padrão é DB_PORT.
+        dbname (str, optional): Nome do banco. Padrão é DB_NAME.
+        attempts (int, optional): Tentativas de conexão. Padrão é RETRY_ATTEMPTS.
+        timeout_ms (int, optional): Tempo limite dos comandos da conexão.
+            Padrão é statement_timeout_ms().
 
     Returns:
         connection: Objeto de conexão ao banco de dados.
 
     Raises:
         OperationalError: Lança um erro se a conexão falhar.
+        DatabaseUnavailableError: Se o disjuntor do servidor estiver aberto.
     """
+    backend = get_backend()
+    breaker = _breaker_for(host, port, dbname)
+    breaker.before_connect()
+    if timeout_ms is None:
+        timeout_ms = statement_timeout_ms()
+    retrying = Retrying(
+        stop=stop_after_attempt(max(1, attempts or RETRY_ATTEMPTS)),
+        wait=wait_random_exponential(multiplier=RETRY_BASE_SECONDS, max=RETRY_MAX_WAIT_SECONDS),
+        retry=retry_if_exception(backend.is_transient),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
     try:
-        return psycopg2.connect(
-            dbname=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-        )
-    except OperationalError as e:
+        conn = retrying(backend.connect, host, port, dbname, timeout_ms)
+    except backend.OperationalError as e:
+        breaker.record_failure()
         logger.error(f"Erro ao conectar ao banco de dados: {e}")
         raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return conn
+
+
+def replica_hosts():
+    """Lista as réplicas de leitura configuradas em DB_REPLICA_HOSTS.
+
+    A variável contém endereços host:porta separados por vírgula; nome do
+    banco, usuário e senha são os mesmos do primário.
+
+    Returns:
+        list[tuple[str, str | None]]: Pares (host, porta).
+
+    Example:
+        >>> os.environ["DB_REPLICA_HOSTS"] = "localhost:5433,localhost:5434"
+        >>> replica_hosts()
+        [('localhost', '5433'), ('localhost', '5434')]
+    """
+    hosts = []
+    for item in os.getenv("DB_REPLICA_HOSTS", "").split(","):
+        item = item.strip()
+        if item:
+            host, _, port = item.partition(":")
+            hosts.append((host, port or None))
+    return hosts
+
+
+def _connect_replica(timeout_ms, fresh=False):
+    """Conecta à próxima réplica (rodízio), tentando as demais em caso de falha.
+
+    Args:
+        timeout_ms (int): Tempo limite dos comandos da conexão.
+        fresh (bool, optional): Se True, não reaproveita conexões do pool.
+
+    Returns:
+        tuple | None: Resultado de _acquire para uma réplica, ou None se
+            nenhuma réplica estiver configurada ou disponível.
+    """
+    hosts = replica_hosts() if dialect() == "postgres" else []
+    if not hosts:
+        return None
+    start = next(_replica_counter)
+    for offset in range(len(hosts)):
+        host, port = hosts[(start + offset) % len(hosts)]
+        try:
+            return _acquire(host, port, None, timeout_ms, attempts=1, fresh=fresh)
+        except (get_backend().OperationalError, DatabaseUnavailableError):
+            logger.warning(f"Réplica {host}:{port} indisponível")
+    return None
 
 
 @contextmanager
-def get_db_connection():
+def get_db_connection(target="primary", fresh=False):
     """Context manager para gerenciar a conexão com o banco de dados.
 
     Esta função cria um gerenciador de contexto que garante que a conexão
-    ao banco de dados será fechada após seu uso.
+    ao banco de dados será devolvida ao pool (ou fechada) após seu uso, com
+    a transação pendente revertida. Com target="replica", a
+    conexão é aberta em uma das réplicas de leitura; sem réplicas
+    configuradas ou disponíveis, o primário é utilizado. Com shards
+    configurados, a conexão é aberta no shard atual (ver
+    db.shards.current_spec), sem réplicas. Réplicas e shards não se aplicam
+    ao backend SQLite. Os comandos da conexão são cancelados após o tempo
+    limite do ponto de chamada (ver statement_timeout_ms).
+
+    Args:
+        target (str, optional): "primary" ou "replica". Padrão é "primary".
+        fresh (bool, optional): Se True, abre uma conexão nova em vez de
+            reaproveitar uma conexão ociosa do pool. Padrão é False.
 
     Yields:
         connection: Objeto de conexão ao banco de dados.
@@ -70,11 +607,460 @@ def get_db_connection():
         >>> with get_db_connection() as conn:
         >>>     # Operações com o banco de dados
     """
-    conn = get_connection()
+    start = time.perf_counter()
+    caller = _caller()
+    timeout_ms = statement_timeout_ms(caller)
+    spec = shards.current_spec()
+    if spec is not None:
+        target = f"shard:{spec['dbname']}"
+        conn, key, opened = _acquire(
+            spec["host"], spec["port"], spec["dbname"], timeout_ms, fresh=fresh
+        )
+    else:
+        acquired = _connect_replica(timeout_ms, fresh) if target == "replica" else None
+        if acquired is None:
+            target = "primary"
+            acquired = _acquire(None, None, None, timeout_ms, fresh=fresh)
+        conn, key, opened = acquired
+    if opened:
+        _notify_hooks(
+            {
+                "query": None,
+                "kind": "connect",
+                "caller": caller,
+                "duration": time.perf_counter() - start,
+                "rowcount": 0,
+                "error": None,
+                "target": target,
+            }
+        )
+    reusable = True
     try:
         yield conn
+    except Exception as e:
+        backend = get_backend()
+        if backend.is_timeout(e):
+            logger.warning(f"Tempo limite de {timeout_ms} ms excedido em {caller}")
+            raise QueryTimeoutError(caller, timeout_ms) from e
+        reusable = not backend.is_transient(e)
+        raise
+    except BaseException:
+        reusable = False
+        raise
     finally:
-        conn.close()
+        _release(key, conn, reusable)
+
+
+def set_session_resolver(resolver):
+    """Define a função que identifica a sessão atual para a leitura das próprias escritas.
+
+    Por padrão a sessão é a thread atual. A aplicação Streamlit registra o
+    ID da sessão do navegador, pois execuções de uma mesma sessão podem
+    ocorrer em threads diferentes.
+
+    Args:
+        resolver (callable): Função sem argumentos que retorna uma chave
+            hashable da sessão atual, ou None se não houver sessão.
+
+    Example:
+        >>> set_session_resolver(lambda: get_script_run_ctx().session_id)
+    """
+    global _session_resolver
+    _session_resolver = resolver
+
+
+def _session_key():
+    """Retorna a chave da sessão atual, ou None se não for possível obtê-la."""
+    try:
+        return _session_resolver()
+    except Exception:
+        return None
+
+
+def _mark_write():
+    """Registra que a sessão atual confirmou uma escrita no primário."""
+    key = _session_key()
+    if key is None or READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    with _writes_lock:
+        _last_writes[key] = now
+        if len(_last_writes) > 1000:
+            for stale in [
+                k for k, t in _last_writes.items() if now - t > READ_YOUR_WRITES_SECONDS
+            ]:
+                del _last_writes[stale]
+
+
+def _read_target():
+    """Escolhe o servidor das leituras fora de uma transação.
+
+    Returns:
+        str: "primary" se a sessão escreveu há menos de
+            READ_YOUR_WRITES_SECONDS; caso contrário, "replica".
+    """
+    key = _session_key()
+    if key is not None:
+        with _writes_lock:
+            last = _last_writes.get(key)
+        if last is not None and time.monotonic() - last < READ_YOUR_WRITES_SECONDS:
+            return "primary"
+    return "replica"
+
+
+def register_query_hook(hook):
+    """Registra uma função chamada após a execução de cada comando SQL.
+
+    O gancho recebe um dicionário com as chaves:
+        - query (str | None): Comando SQL executado
+        - kind (str): "query" para leituras, "update" para escritas ou
+          "connect" para a abertura de conexões
+        - caller (str): Função de fora do pacote db que originou o comando
+        - duration (float): Tempo de execução do comando em segundos
+        - rowcount (int): Linhas retornadas ou afetadas (-1 se desconhecido)
+        - error (Exception | None): Erro ocorrido, se houver
+        - target (str): "primary", "replica" ou "shard:<banco>" (apenas em
+          "connect", emitido somente quando uma nova conexão é aberta)
+
+    Erros lançados pelo gancho são registrados e nunca interrompem a consulta.
+
+    Args:
+        hook (callable): Função que recebe o dicionário do evento.
+
+    Example:
+        >>> register_query_hook(lambda event: print(event["duration"]))
+    """
+    if hook not in _query_hooks:
+        _query_hooks.append(hook)
+
+
+def unregister_query_hook(hook):
+    """Remove um gancho registrado com register_query_hook.
+
+    Args:
+        hook (callable): Função previamente registrada.
+    """
+    if hook in _query_hooks:
+        _query_hooks.remove(hook)
+
+
+def _caller():
+    """Identifica a função de fora do pacote db que originou o comando.
+
+    Returns:
+        str: Nome no formato "modulo.funcao", ou "desconhecido".
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not (module == "db" or module.startswith("db.") or module == "contextlib"):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "desconhecido"
+
+
+def _notify_hooks(event):
+    """Repassa um evento de execução para todos os ganchos registrados."""
+    if not _query_hooks:
+        return
+    for hook in list(_query_hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            logger.error(f"Erro no gancho de consulta: {e}")
+
+
+def _run_statement(cursor, query, params, kind, fetch):
+    """Executa um comando em um cursor, medindo o tempo e notificando os ganchos.
+
+    Comandos registrados com prepared() são executados pelo nome no
+    PostgreSQL, preparando-os antes na conexão se necessário.
+
+    Args:
+        cursor (cursor): Cursor aberto na conexão da transação.
+        query (str): Comando SQL a ser executado.
+        params (tuple): Parâmetros do comando.
+        kind (str): "query" ou "update".
+        fetch (bool): Se True, retorna as linhas produzidas pelo comando.
+
+    Returns:
+        list | None: Linhas retornadas quando fetch=True; caso contrário, None.
+    """
+    start = time.perf_counter()
+    error = None
+    rows = None
+    try:
+        sql = query
+        if (
+            isinstance(query, PreparedStatement)
+            and PREPARED_ENABLED
+            and dialect() == "postgres"
+        ):
+            sql = _prepared_sql(cursor, query)
+        cursor.execute(sql, params or ())
+        if _untouched_checkouts:
+            _untouched_checkouts.discard(cursor.connection)
+        if fetch:
+            rows = cursor.fetchall()
+        return rows
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _notify_hooks(
+            {
+                "query": query,
+                "kind": kind,
+                "caller": _caller() if _query_hooks else None,
+                "duration": time.perf_counter() - start,
+                "rowcount": len(rows) if rows is not None else cursor.rowcount,
+                "error": error,
+            }
+        )
+
+
+class UnitOfWork:
+    """Unidade de trabalho que executa vários comandos em uma única transação.
+
+    Todos os comandos compartilham a mesma conexão e são confirmados com um
+    único COMMIT ao final do bloco transaction(). Instâncias são criadas
+    apenas por transaction(). O atributo wrote indica se algum comando de
+    escrita foi executado (inclusive em savepoints); blocos somente de
+    leitura não fixam a sessão no primário (ver READ_YOUR_WRITES_SECONDS).
+
+    Example:
+        >>> with transaction() as uow:
+        >>>     uow.execute("DELETE FROM boletos WHERE id = %s", (1,))
+        >>>     with uow.savepoint():
+        >>>         uow.execute("UPDATE ...")
+    """
+
+    def __init__(self, conn, read_only=False):
+        self.conn = conn
+        self.read_only = read_only
+        self.wrote = False
+        self._savepoints = 0
+
+    def query(self, query, params=None):
+        """Executa uma consulta na transação e retorna as linhas.
+
+        Args:
+            query (str): Consulta SQL a ser executada.
+            params (tuple, optional): Parâmetros da consulta.
+
+        Returns:
+            list: Lista de tuplas com os resultados.
+        """
+        with self.conn.cursor() as cursor:
+            return _run_statement(cursor, query, params, "query", True)
+
+    def execute(self, query, params=None, returning=False):
+        """Executa um comando de escrita na transação, sem confirmá-lo.
+
+        Args:
+            query (str): Comando SQL a ser executado.
+            params (tuple, optional): Parâmetros do comando.
+            returning (bool, optional): Se True, retorna as linhas da cláusula
+                RETURNING.
+
+        Returns:
+            list | None: Linhas retornadas quando returning=True.
+
+        Raises:
+            RuntimeError: Se a transação for somente de leitura.
+        """
+        self._check_writable()
+        with self.conn.cursor() as cursor:
+            rows = _run_statement(cursor, query, params, "update", returning)
+        self.wrote = True
+        return rows
+
+    def execute_batch(self, query, params_seq, page_size=500):
+        """Executa o mesmo comando para vários conjuntos de parâmetros.
+
+        Os comandos são enviados em lotes de page_size por ida ao banco e
+        confirmados junto com o restante da transação.
+
+        Args:
+            query (str): Comando SQL a ser executado.
+            params_seq (iterable): Sequência de tuplas de parâmetros.
+            page_size (int, optional): Comandos enviados por ida ao banco.
+
+        Raises:
+            RuntimeError: Se a transação for somente de leitura.
+        """
+        self._check_writable()
+        with self.conn.cursor() as cursor:
+            start = time.perf_counter()
+            error = None
+            try:
+                get_backend().execute_batch(cursor, query, params_seq, page_size=page_size)
+                self.wrote = True
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _notify_hooks(
+                    {
+                        "query": query,
+                        "kind": "update",
+                        "caller": _caller() if _query_hooks else None,
+                        "duration": time.perf_counter() - start,
+                        "rowcount": cursor.rowcount,
+                        "error": error,
+                    }
+                )
+
+    def _check_writable(self):
+        """Recusa escritas em transações somente de leitura (possivelmente numa réplica)."""
+        if self.read_only:
+            raise RuntimeError("Escrita em uma transação somente de leitura")
+
+    @contextmanager
+    def savepoint(self):
+        """Cria um savepoint; erros no bloco desfazem apenas os seus comandos.
+
+        O erro é propagado após o ROLLBACK TO SAVEPOINT, permitindo que o
+        chamador decida se continua a transação.
+
+        Example:
+            >>> with uow.savepoint():
+            >>>     uow.execute("INSERT ...")
+        """
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+        except Exception:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+
+def current_unit_of_work():
+    """Retorna a unidade de trabalho ativa na thread atual, se houver.
+
+    Returns:
+        UnitOfWork | None: Unidade de trabalho aberta por transaction().
+    """
+    return getattr(_local, "unit_of_work", None)
+
+
+@contextmanager
+def transaction(read_only=False):
+    """Context manager que agrupa vários comandos em uma única transação.
+
+    Ao final do bloco a transação é confirmada; se ocorrer um erro, ela é
+    revertida e o erro é propagado. Enquanto o bloco estiver ativo,
+    execute_query e execute_update chamados na mesma thread participam da
+    transação, permitindo compor as funções de queries.py existentes.
+    Chamadas aninhadas tornam-se savepoints da transação externa. Com
+    shards configurados, a transação é aberta no shard atual e todos os
+    comandos do bloco são executados nele.
+
+    Com read_only=True, a transação é aberta no servidor escolhido para as
+    leituras da sessão (réplica, exceto logo após uma escrita; ver
+    _read_target), garantindo que todas as consultas do bloco vejam o mesmo
+    estado do banco sem fixar a sessão no primário. Comandos de escrita são
+    recusados.
+
+    Args:
+        read_only (bool, optional): Transação somente de leitura. Padrão é False.
+
+    Yields:
+        UnitOfWork: Unidade de trabalho da transação.
+
+    Raises:
+        OperationalError: Se a conexão com o banco falhar.
+        DatabaseUnavailableError: Se o disjuntor do servidor estiver aberto.
+        QueryTimeoutError: Se um comando exceder o tempo limite.
+        Exception: Qualquer erro ocorrido no bloco, após o rollback.
+
+    Example:
+        >>> with transaction():
+        >>>     delete_bill(1)
+        >>>     delete_bill(2)
+        >>> with transaction(read_only=True) as uow:
+        >>>     uow.query("SELECT now()")
+    """
+    active = current_unit_of_work()
+    if active is not None:
+        with active.savepoint():
+            yield active
+        return
+
+    with get_db_connection(_read_target() if read_only else "primary") as conn:
+        unit_of_work = UnitOfWork(conn, read_only)
+        _local.unit_of_work = unit_of_work
+        try:
+            yield unit_of_work
+            conn.commit()
+            if unit_of_work.wrote:
+                _mark_write()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro durante a transação: {e}")
+            raise
+        finally:
+            _local.unit_of_work = None
+
+
+def _is_stale(conn, error):
+    """Indica se a conexão veio do pool e falhou antes do primeiro comando.
+
+    Uma conexão ociosa pode ter sido encerrada pelo servidor (reinício,
+    idle_session_timeout, firewall); a falha só aparece no primeiro comando.
+    """
+    return conn in _untouched_checkouts and get_backend().is_disconnect(error)
+
+
+def _execute_single(target, query, params, kind, fetch):
+    """Executa um único comando fora de transaction(), confirmando as escritas.
+
+    Se uma conexão reaproveitada do pool falhar com erro de conexão antes do
+    primeiro comando, ela é descartada e o comando é repetido uma única vez
+    em uma conexão nova. Um comando que já chegou a ser executado na conexão
+    nunca é repetido.
+
+    Args:
+        target (str): "primary" ou "replica" (ver get_db_connection).
+        query (str): Comando SQL a ser executado.
+        params (tuple): Parâmetros do comando.
+        kind (str): "query" ou "update"; as atualizações são confirmadas.
+        fetch (bool): Se True, retorna as linhas produzidas pelo comando.
+
+    Returns:
+        list | None: Linhas retornadas quando fetch=True; caso contrário, None.
+    """
+    fresh = False
+    while True:
+        stale = False
+        try:
+            with get_db_connection(target, fresh=fresh) as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        rows = _run_statement(cursor, query, params, kind, fetch)
+                    if kind == "update":
+                        conn.commit()
+                        _mark_write()
+                    return rows
+                except Exception as e:
+                    stale = not fresh and _is_stale(conn, e)
+                    if not stale:
+                        conn.rollback()
+                        action = "consulta" if kind == "query" else "transação"
+                        logger.error(f"Erro durante a {action}: {e}")
+                    raise
+        except get_backend().OperationalError as e:
+            if not stale:
+                raise
+            logger.warning(f"Conexão ociosa do pool encerrada; repetindo em uma nova: {e}")
+            fresh = True
 
 
 def execute_query(query, params=None):
@@ -82,62 +1068,78 @@ def execute_query(query, params=None):
 
     Esta função executa uma consulta SQL que pode retornar dados e
     utiliza um gerenciador de contexto para a conexão com o banco de dados.
+    A consulta é encaminhada a uma réplica de leitura, exceto logo após uma
+    escrita da mesma sessão (ver READ_YOUR_WRITES_SECONDS). Dentro de um
+    bloco transaction(), a consulta utiliza a conexão da transação ativa
+    (primário) e erros são propagados ao chamador.
 
     Args:
         query (str): Consulta SQL a ser executada.
         params (tuple, optional): Parâmetros da consulta. Padrão é None.
 
     Returns:
-        list: Lista de tuplas contendo os resultados da consulta.
+        list | None: Lista de tuplas contendo os resultados da consulta, ou
+            None se a consulta falhar (inclusive com o banco indisponível).
 
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
+        QueryTimeoutError: Se a consulta exceder o tempo limite; ao contrário
+            dos demais erros, é sempre propagado para ser exibido pela página.
     """
+    unit_of_work = current_unit_of_work()
+    if unit_of_work is not None:
+        return unit_of_work.query(query, params)
+
+    backend = get_backend()
     try:
-        with get_db_connection() as conn:
-            try:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params or ())
-                    return cursor.fetchall()
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Erro durante a consulta: {e}")
-                raise
-    except OperationalError as e:
+        return _execute_single(_read_target(), query, params, "query", True)
+    except QueryTimeoutError:
+        raise
+    except DatabaseUnavailableError as e:
+        logger.warning(str(e))
+    except backend.OperationalError as e:
         logger.error(f"Erro de conexão: {e}")
     except Exception as e:
         logger.error(f"Erro inesperado: {e}")
 
 
-def execute_update(query, params=None):
+def execute_update(query, params=None, returning=False):
     """Executa uma atualização SQL e comita as alterações.
 
-    Esta função executa comandos SQL que não retornam dados (como INSERT,
-    UPDATE e DELETE) e gerencia transações no banco de dados.
+    Esta função executa comandos SQL de escrita (como INSERT, UPDATE e
+    DELETE) e gerencia transações no banco de dados. Quando o comando possui
+    uma cláusula RETURNING, as linhas retornadas podem ser obtidas na mesma
+    transação. Dentro de um bloco transaction(), o comando participa da
+    transação ativa, não é confirmado individualmente e erros são propagados.
 
     Args:
         query (str): Consulta SQL a ser executada.
         params (tuple, optional): Parâmetros da consulta. Padrão é None.
+        returning (bool, optional): Se True, retorna as linhas produzidas pelo
+            comando (cláusula RETURNING). Padrão é False.
+
+    Returns:
+        list | None: Linhas retornadas quando returning=True; caso contrário, None.
 
     Raises:
         OperationalError: Lança um erro se houver problemas de conexão.
         IntegrityError: Lança um erro se houver problemas de integridade.
+        QueryTimeoutError: Se o comando exceder o tempo limite (sempre propagado).
     """
-    try:
-        with get_db_connection() as conn:
-            try:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params or ())
-                conn.commit()
-
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Erro durante a transação: {e}")
-                raise
+    unit_of_work = current_unit_of_work()
+    if unit_of_work is not None:
+        return unit_of_work.execute(query, params, returning)
 
-    except OperationalError as e:
+    backend = get_backend()
+    try:
+        return _execute_single("primary", query, params, "update", returning)
+    except QueryTimeoutError:
+        raise
+    except DatabaseUnavailableError as e:
+        logger.warning(str(e))
+    except backend.OperationalError as e:
         logger.error(f"Erro de conexão: {e}")
-    except IntegrityError as e:
+    except backend.IntegrityError as e:
         logger.error(f"Erro de integridade: {e}")
     except Exception as e:
         logger.error(f"Erro inesperado: {e}")
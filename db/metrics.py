@@ -0,0 +1,138 @@
+"""Módulo de instrumentação de latência das consultas ao banco de dados.
+
+Este módulo coleta, em memória, estatísticas de cada comando executado pelo
+db.conn, agrupadas pela função que originou a consulta, e registra em log
+os comandos que excedem o limite de consulta lenta.
+
+Componentes principais:
+    - install: Registra o coletor como gancho do db.conn
+    - snapshot: Retorna as estatísticas acumuladas por função
+    - export_json: Exporta as estatísticas em JSON
+    - reset: Zera as estatísticas acumuladas
+
+Configuração (variáveis de ambiente):
+    - DB_METRICS: "0" desativa a coleta (padrão: ativada)
+    - DB_SLOW_QUERY_MS: Limite em milissegundos para o log de consulta lenta
+      (padrão: 500)
+
+Dependências:
+    - db.conn.register_query_hook: Para receber os eventos de execução
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from db.conn import register_query_hook
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+_lock = threading.Lock()
+_stats = {}
+_started_at = time.time()
+
+
+def _new_entry(caller, kind):
+    """Cria o registro de estatísticas vazio de uma função."""
+    return {
+        "caller": caller,
+        "kind": kind,
+        "calls": 0,
+        "errors": 0,
+        "rows": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "slow": 0,
+    }
+
+
+def record(event):
+    """Acumula um evento de execução recebido do db.conn.
+
+    Args:
+        event (dict): Evento no formato documentado em register_query_hook.
+    """
+    duration_ms = event["duration"] * 1000
+    caller = event.get("caller") or "desconhecido"
+    kind = event["kind"]
+    if kind == "connect" and event.get("target"):
+        # Conexões ao primário e às réplicas são contabilizadas separadamente
+        kind = f"connect:{event['target']}"
+    key = (caller, kind)
+
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = _new_entry(caller, kind)
+        entry["calls"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        if event["rowcount"] and event["rowcount"] > 0:
+            entry["rows"] += event["rowcount"]
+        if event["error"] is not None:
+            entry["errors"] += 1
+        if duration_ms >= SLOW_QUERY_MS:
+            entry["slow"] += 1
+
+    if duration_ms >= SLOW_QUERY_MS:
+        statement = " ".join((event["query"] or kind).split())
+        logger.warning(
+            f"Consulta lenta ({duration_ms:.1f} ms, {event['rowcount']} linhas) "
+            f"em {caller}: {statement[:200]}"
+        )
+
+
+def snapshot():
+    """Retorna as estatísticas acumuladas, ordenadas pelo tempo total.
+
+    Returns:
+        list[dict]: Um registro por (função, tipo) com chamadas, erros, linhas,
+            tempo total, tempo médio, tempo máximo e consultas lentas.
+
+    Example:
+        >>> snapshot()[0]["caller"]
+        'slips.queries.get_bills'
+    """
+    with _lock:
+        entries = [dict(entry) for entry in _stats.values()]
+
+    for entry in entries:
+        entry["avg_ms"] = entry["total_ms"] / entry["calls"] if entry["calls"] else 0.0
+    return sorted(entries, key=lambda entry: entry["total_ms"], reverse=True)
+
+
+def export_json():
+    """Exporta as estatísticas acumuladas em formato JSON.
+
+    Returns:
+        str: Documento JSON com o início da coleta, o limite de consulta lenta
+            e as estatísticas por função.
+    """
+    return json.dumps(
+        {
+            "started_at": _started_at,
+            "slow_query_ms": SLOW_QUERY_MS,
+            "stats": snapshot(),
+        },
+        indent=2,
+    )
+
+
+def reset():
+    """Zera as estatísticas acumuladas."""
+    global _started_at
+    with _lock:
+        _stats.clear()
+        _started_at = time.time()
+
+
+def install():
+    """Registra o coletor de métricas no db.conn, se habilitado.
+
+    Pode ser chamada várias vezes; o gancho é registrado apenas uma vez.
+    """
+    if os.getenv("DB_METRICS", "1") != "0":
+        register_query_hook(record)
@@ -0,0 +1,184 @@
+"""Módulo de invalidação de cache entre processos via LISTEN/NOTIFY.
+
+Gatilhos nas tabelas da aplicação (ver db.schema) emitem, ao confirmar cada
+transação, uma notificação no canal CHANNEL com o payload "tabela:usuario_id"
+para cada usuário afetado, inclusive em escritas feitas por outras réplicas,
+pelo agendador ou fora da aplicação. Uma thread em segundo plano por
+processo (uma por shard, quando DB_SHARDS está configurado) escuta o canal
+e incrementa a versão da tabela para o usuário; as
+sessões comparam essas versões com as que já viram e descartam apenas os
+caches afetados.
+
+Componentes principais:
+    - start_listener: Inicia a thread de escuta (uma vez por processo)
+    - register_handler: Registra uma função chamada a cada notificação
+    - changed_tables: Tabelas alteradas para um usuário desde a última verificação
+
+Funcionalidades:
+    * Reconexão automática; após uma reconexão todas as sessões descartam
+      seus caches, pois notificações podem ter sido perdidas
+    * Desabilitado com DB_NOTIFY=0 e com o backend SQLite (processo único,
+      sem LISTEN/NOTIFY)
+
+Dependências:
+    - db.conn.get_connection: Conexão dedicada, em autocommit, para o LISTEN
+    - select: Espera por notificações sem consumir CPU
+"""
+
+import logging
+import os
+import select
+import threading
+from db.conn import dialect, get_connection
+from db.shards import shard_specs
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "invalidacao_cache"
+POLL_TIMEOUT_SECONDS = 5
+RECONNECT_SECONDS = 5
+
+_handlers = []
+_versions = {}
+_epoch = 0
+_lock = threading.Lock()
+_listeners = []
+
+
+def register_handler(handler):
+    """Registra uma função chamada na thread de escuta a cada notificação.
+
+    Args:
+        handler (callable): Função que recebe (tabela, usuario_id).
+
+    Example:
+        >>> register_handler(lambda table, user_id: print(table, user_id))
+    """
+    if handler not in _handlers:
+        _handlers.append(handler)
+
+
+def _dispatch(payload):
+    """Registra uma notificação "tabela:usuario_id" e repassa aos handlers."""
+    table, _, user_id = payload.partition(":")
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        logger.warning(f"Notificação de invalidação inválida: {payload}")
+        return
+
+    with _lock:
+        tables = _versions.setdefault(user_id, {})
+        tables[table] = tables.get(table, 0) + 1
+
+    for handler in list(_handlers):
+        try:
+            handler(table, user_id)
+        except Exception as e:
+            logger.error(f"Erro no handler de invalidação: {e}")
+
+
+def _reset():
+    """Invalida todos os caches após (re)conectar, pois notificações podem ter sido perdidas."""
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _versions.clear()
+    for handler in list(_handlers):
+        try:
+            handler(None, None)
+        except Exception as e:
+            logger.error(f"Erro no handler de invalidação: {e}")
+
+
+def changed_tables(user_id, seen):
+    """Retorna as tabelas alteradas para um usuário desde a última verificação.
+
+    Args:
+        user_id (int): ID do usuário.
+        seen (dict | None): Estado retornado pela verificação anterior da
+            sessão; None na primeira verificação.
+
+    Returns:
+        tuple: (tabelas, estado). tabelas é um conjunto de nomes de tabelas
+            ou None quando todos os caches devem ser descartados; estado deve
+            ser guardado na sessão e repassado na próxima chamada.
+
+    Example:
+        >>> tables, seen = changed_tables(1, st.session_state.get("seen"))
+    """
+    with _lock:
+        current = {"epoch": _epoch, "tables": dict(_versions.get(user_id, {}))}
+
+    if seen is None:
+        return set(), current
+    if seen["epoch"] != current["epoch"]:
+        return None, current
+    tables = {
+        table
+        for table, version in current["tables"].items()
+        if seen["tables"].get(table) != version
+    }
+    return tables, current
+
+
+class _Listener(threading.Thread):
+    """Thread que escuta o canal de invalidação e reconecta em caso de falha.
+
+    Args:
+        spec (dict | None): Shard escutado (ver db.shards.shard_specs), ou
+            None para o banco padrão.
+    """
+
+    def __init__(self, spec=None):
+        name = f"cache-invalidation-{spec['dbname']}" if spec else "cache-invalidation"
+        super().__init__(name=name, daemon=True)
+        self.spec = spec or {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = get_connection(**self.spec)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                _reset()
+                self._listen(conn)
+            except Exception as e:
+                logger.error(f"Erro na escuta de invalidações: {e}")
+                self._stop_event.wait(RECONNECT_SECONDS)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _listen(self, conn):
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([conn], [], [], POLL_TIMEOUT_SECONDS)
+            if not ready:
+                continue
+            conn.poll()
+            while conn.notifies:
+                _dispatch(conn.notifies.pop(0).payload)
+
+    def stop(self):
+        """Encerra a escuta e aguarda a thread."""
+        self._stop_event.set()
+        self.join()
+
+
+def start_listener():
+    """Inicia a thread de escuta de invalidações, se habilitada.
+
+    Pode ser chamada várias vezes; as threads são iniciadas apenas uma vez
+    por processo. Com shards configurados, cada shard tem a sua thread.
+    """
+    if os.getenv("DB_NOTIFY", "1") == "0" or dialect() != "postgres":
+        return
+    with _lock:
+        if not _listeners:
+            for spec in shard_specs() or [None]:
+                listener = _Listener(spec)
+                listener.start()
+                _listeners.append(listener)
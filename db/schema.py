@@ -0,0 +1,927 @@
+"""Módulo de definição e criação do esquema do banco de dados.
+
+Este módulo centraliza os comandos DDL das tabelas e índices utilizados
+pela aplicação, garantindo que existam antes do primeiro uso. Em bancos já
+existentes, as tabelas principais são preservadas e apenas as estruturas
+ausentes são criadas.
+
+Funcionalidades principais:
+    - Declaração dos comandos de criação de tabelas e índices
+    - Aplicação idempotente do esquema (CREATE ... IF NOT EXISTS)
+    - Execução única por processo
+    - Criação e desanexação das partições mensais do livro-razão (lancamentos)
+    - Diretório global de usuários no banco padrão quando há shards (db.shards)
+    - Esquema equivalente para o backend SQLite (SQLITE_SCHEMA_STATEMENTS)
+
+Dependências:
+    - db.conn.transaction: Para execução dos comandos DDL em uma única transação
+
+Exceções:
+    - Erros de execução são registrados pelo db.conn e não interrompem a aplicação
+    - SchemaError: Índice único de usuários impossível de criar por cadastros
+      duplicados (e-mail ou telefone); interrompe a inicialização com a lista
+      dos IDs duplicados, pois sem o índice o cadastro aceitaria duplicações
+"""
+
+import logging
+from datetime import date
+from db.conn import BATCH_TIMEOUT_MS, dialect, statement_budget, transaction
+from db.shards import for_each_shard, is_sharded, use_shard
+
+logger = logging.getLogger(__name__)
+
+# Índices únicos dos quais o cadastro depende para rejeitar e-mails e
+# telefones duplicados: (tabela, coluna) de cada índice
+UNIQUE_USER_INDEXES = {
+    "idx_usuarios_email_unico": ("usuarios", "email"),
+    "idx_usuarios_telefone_unico": ("usuarios", "telefone"),
+    "idx_diretorio_usuarios_email": ("diretorio_usuarios", "email"),
+    "idx_diretorio_usuarios_telefone": ("diretorio_usuarios", "telefone"),
+}
+
+
+class SchemaError(Exception):
+    """Erro que impede a aplicação do esquema e interrompe a inicialização."""
+
+
+# Partições mensais do livro-razão criadas na inicialização, em meses
+# antes e depois do mês atual
+LEDGER_MONTHS_BACK = 12
+LEDGER_MONTHS_AHEAD = 12
+
+# Carga do livro-razão a partir das tabelas de origem, apenas quando vazio
+LEDGER_BACKFILL = """
+    INSERT INTO lancamentos
+        (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+         descricao, valor, pago)
+    SELECT c.usuario_id, 'cartao', c.id, p.k + 1,
+           date_trunc('month', c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+           (c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+           c.nome_conta, c.valor_parcela, FALSE
+    FROM cartoes_credito c
+    CROSS JOIN LATERAL generate_series(0, c.num_parcelas - 1) AS p(k)
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    UNION ALL
+    SELECT usuario_id, 'boleto', id, 1, date_trunc('month', data_vencimento)::date,
+           data_vencimento::date, titulo, valor_total, pago
+    FROM boletos
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    UNION ALL
+    SELECT usuario_id, 'conta_fixa', conta_id, 1, mes, mes, titulo, valor, pago
+    FROM contas_fixas_mensais
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    """
+
+SCHEMA_STATEMENTS = [
+    # Tabelas principais da aplicação (bancos novos, testes e benchmarks)
+    """
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id SERIAL PRIMARY KEY,
+        nome TEXT NOT NULL,
+        sobrenome TEXT NOT NULL,
+        email TEXT NOT NULL,
+        senha TEXT NOT NULL,
+        telefone TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Renda (
+        user_id INTEGER PRIMARY KEY REFERENCES usuarios (id) ON DELETE CASCADE,
+        valor NUMERIC(12, 2) NOT NULL,
+        data_atualizacao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cartoes_credito (
+        id SERIAL PRIMARY KEY,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        nome_conta TEXT NOT NULL,
+        num_parcelas INTEGER NOT NULL,
+        valor_parcela NUMERIC(12, 2) NOT NULL,
+        importancia TEXT NOT NULL,
+        dia_vencimento TIMESTAMP NOT NULL,
+        data_criacao TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS boletos (
+        id SERIAL PRIMARY KEY,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        titulo TEXT NOT NULL,
+        valor_total NUMERIC(12, 2) NOT NULL,
+        data_vencimento TIMESTAMP NOT NULL,
+        parcelado BOOLEAN NOT NULL DEFAULT FALSE,
+        num_parcelas INTEGER,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        data_pagamento TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contas_fixas (
+        id SERIAL PRIMARY KEY,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        titulo TEXT NOT NULL,
+        valor_total NUMERIC(12, 2) NOT NULL
+    )
+    """,
+    # Tokens de recuperação de senha (armazenados apenas como hash)
+    """
+    CREATE TABLE IF NOT EXISTS tokens_recuperacao (
+        telefone TEXT PRIMARY KEY,
+        token_hash CHAR(64) NOT NULL,
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        expira_em TIMESTAMPTZ NOT NULL,
+        criado_em TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_tokens_recuperacao_expira_em
+        ON tokens_recuperacao (expira_em)
+    """,
+    # Unicidade de e-mail e telefone garantida pelo banco no cadastro
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_email_unico
+        ON usuarios (email)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_telefone_unico
+        ON usuarios (telefone)
+        WHERE telefone IS NOT NULL AND telefone <> ''
+    """,
+    # Histórico de renda com data de vigência
+    """
+    CREATE TABLE IF NOT EXISTS renda_historico (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        vigente_desde DATE NOT NULL,
+        criado_em TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_renda_historico_user_vigencia
+        ON renda_historico (user_id, vigente_desde)
+    """,
+    # Boletos pendentes: vencidos e a vencer sem percorrer o histórico pago
+    """
+    CREATE INDEX IF NOT EXISTS idx_boletos_pendentes
+        ON boletos (usuario_id, data_vencimento)
+        WHERE pago = FALSE
+    """,
+    # Lembretes de vencimento: busca por data entre todos os usuários
+    """
+    CREATE INDEX IF NOT EXISTS idx_boletos_pendentes_vencimento
+        ON boletos (data_vencimento)
+        WHERE pago = FALSE
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_cartoes_credito_ultima_parcela
+        ON cartoes_credito ((dia_vencimento + (num_parcelas - 1) * INTERVAL '1 month'))
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lembretes_enviados (
+        tipo TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        vencimento DATE NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        enviado_em TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (tipo, item_id, vencimento)
+    )
+    """,
+    # Vigência das contas fixas e lançamentos mensais materializados
+    """
+    ALTER TABLE contas_fixas
+        ADD COLUMN IF NOT EXISTS data_inicio DATE NOT NULL DEFAULT DATE '1900-01-01'
+    """,
+    """
+    ALTER TABLE contas_fixas ADD COLUMN IF NOT EXISTS data_fim DATE
+    """,
+    # Versão das sessões do usuário: incrementada no logout, revoga os tokens
+    # de sessão emitidos anteriormente (auth.session)
+    """
+    ALTER TABLE usuarios
+        ADD COLUMN IF NOT EXISTS sessao_versao INTEGER NOT NULL DEFAULT 0
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contas_fixas_mensais (
+        conta_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        mes DATE NOT NULL,
+        titulo TEXT NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (conta_id, mes)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_contas_fixas_mensais_usuario_mes
+        ON contas_fixas_mensais (usuario_id, mes)
+    """,
+    # Rastreamento de alterações para a atualização incremental das listas:
+    # atualizado_em mantido por gatilho e exclusões registradas em
+    # registros_excluidos, inclusive as feitas fora da aplicação
+    """
+    CREATE TABLE IF NOT EXISTS registros_excluidos (
+        tabela TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        excluido_em TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_registros_excluidos_usuario
+        ON registros_excluidos (tabela, usuario_id, excluido_em)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION definir_atualizado_em() RETURNS trigger AS $$
+    BEGIN
+        NEW.atualizado_em := clock_timestamp();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION registrar_exclusao() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO registros_excluidos (tabela, item_id, usuario_id)
+        VALUES (TG_TABLE_NAME, OLD.id, OLD.usuario_id);
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    ALTER TABLE boletos
+        ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_boletos_usuario_atualizado
+        ON boletos (usuario_id, atualizado_em)
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_boletos_atualizado_em
+        BEFORE UPDATE ON boletos
+        FOR EACH ROW EXECUTE FUNCTION definir_atualizado_em()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_boletos_exclusao
+        AFTER DELETE ON boletos
+        FOR EACH ROW EXECUTE FUNCTION registrar_exclusao()
+    """,
+    """
+    ALTER TABLE cartoes_credito
+        ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_cartoes_credito_usuario_atualizado
+        ON cartoes_credito (usuario_id, atualizado_em)
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_cartoes_credito_atualizado_em
+        BEFORE UPDATE ON cartoes_credito
+        FOR EACH ROW EXECUTE FUNCTION definir_atualizado_em()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_cartoes_credito_exclusao
+        AFTER DELETE ON cartoes_credito
+        FOR EACH ROW EXECUTE FUNCTION registrar_exclusao()
+    """,
+    """
+    ALTER TABLE contas_fixas
+        ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_contas_fixas_usuario_atualizado
+        ON contas_fixas (usuario_id, atualizado_em)
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_atualizado_em
+        BEFORE UPDATE ON contas_fixas
+        FOR EACH ROW EXECUTE FUNCTION definir_atualizado_em()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_exclusao
+        AFTER DELETE ON contas_fixas
+        FOR EACH ROW EXECUTE FUNCTION registrar_exclusao()
+    """,
+    # Invalidação de cache entre processos (db.notify): ao confirmar a
+    # transação, uma notificação "tabela:usuario_id" por usuário afetado
+    """
+    CREATE OR REPLACE FUNCTION notificar_alteracao() RETURNS trigger AS $$
+    BEGIN
+        EXECUTE 'SELECT pg_notify(''invalidacao_cache'', '
+            || quote_literal(TG_TABLE_NAME || ':') || ' || u) '
+            || 'FROM (SELECT DISTINCT ' || quote_ident(TG_ARGV[0])
+            || ' AS u FROM alteradas) AS s';
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_boletos_notificar_insercao
+        AFTER INSERT ON boletos
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_boletos_notificar_atualizacao
+        AFTER UPDATE ON boletos
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_boletos_notificar_exclusao
+        AFTER DELETE ON boletos
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_cartoes_credito_notificar_insercao
+        AFTER INSERT ON cartoes_credito
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_cartoes_credito_notificar_atualizacao
+        AFTER UPDATE ON cartoes_credito
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_cartoes_credito_notificar_exclusao
+        AFTER DELETE ON cartoes_credito
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_notificar_insercao
+        AFTER INSERT ON contas_fixas
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_notificar_atualizacao
+        AFTER UPDATE ON contas_fixas
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_notificar_exclusao
+        AFTER DELETE ON contas_fixas
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_mensais_notificar_insercao
+        AFTER INSERT ON contas_fixas_mensais
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_mensais_notificar_atualizacao
+        AFTER UPDATE ON contas_fixas_mensais
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_contas_fixas_mensais_notificar_exclusao
+        AFTER DELETE ON contas_fixas_mensais
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('usuario_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_renda_historico_notificar_insercao
+        AFTER INSERT ON renda_historico
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('user_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_renda_historico_notificar_atualizacao
+        AFTER UPDATE ON renda_historico
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('user_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_renda_historico_notificar_exclusao
+        AFTER DELETE ON renda_historico
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('user_id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_usuarios_notificar_atualizacao
+        AFTER UPDATE ON usuarios
+        REFERENCING NEW TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('id')
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_usuarios_notificar_exclusao
+        AFTER DELETE ON usuarios
+        REFERENCING OLD TABLE AS alteradas
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_alteracao('id')
+    """,
+    # Livro-razão unificado, particionado por mês de competência. Meses sem
+    # partição própria ficam na partição padrão até ensure_ledger_partitions.
+    """
+    CREATE TABLE IF NOT EXISTS lancamentos (
+        usuario_id INTEGER NOT NULL,
+        origem TEXT NOT NULL,
+        origem_id INTEGER NOT NULL,
+        parcela INTEGER NOT NULL DEFAULT 1,
+        competencia DATE NOT NULL,
+        vencimento DATE NOT NULL,
+        descricao TEXT NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (origem, origem_id, parcela, competencia)
+    ) PARTITION BY RANGE (competencia)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lancamentos_padrao PARTITION OF lancamentos DEFAULT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_lancamentos_usuario_competencia
+        ON lancamentos (usuario_id, competencia)
+    """,
+    # Carga inicial do livro-razão a partir das tabelas de origem
+    LEDGER_BACKFILL,
+    # A renda já cadastrada passa a valer para todo o período anterior
+    """
+    INSERT INTO renda_historico (user_id, valor, vigente_desde)
+    SELECT r.user_id, r.valor, DATE '1900-01-01'
+    FROM Renda r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM renda_historico h WHERE h.user_id = r.user_id
+    )
+    """,
+]
+
+# Esquema do backend SQLite (DB_BACKEND=sqlite): as mesmas tabelas e
+# colunas, com gatilhos do SQLite para atualizado_em e registros_excluidos.
+# Sem particionamento do livro-razão e sem notificações entre processos.
+_SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+_SQLITE_TRACKED_TABLES = ("boletos", "cartoes_credito", "contas_fixas")
+
+SQLITE_SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        sobrenome TEXT NOT NULL,
+        email TEXT NOT NULL,
+        senha TEXT NOT NULL,
+        telefone TEXT,
+        sessao_versao INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Renda (
+        user_id INTEGER PRIMARY KEY REFERENCES usuarios (id) ON DELETE CASCADE,
+        valor NUMERIC(12, 2) NOT NULL,
+        data_atualizacao TIMESTAMP NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE TABLE IF NOT EXISTS cartoes_credito (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        nome_conta TEXT NOT NULL,
+        num_parcelas INTEGER NOT NULL,
+        valor_parcela NUMERIC(12, 2) NOT NULL,
+        importancia TEXT NOT NULL,
+        dia_vencimento TIMESTAMP NOT NULL,
+        data_criacao TIMESTAMP NOT NULL DEFAULT (%s),
+        atualizado_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % (_SQLITE_NOW, _SQLITE_NOW),
+    """
+    CREATE TABLE IF NOT EXISTS boletos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        titulo TEXT NOT NULL,
+        valor_total NUMERIC(12, 2) NOT NULL,
+        data_vencimento TIMESTAMP NOT NULL,
+        parcelado BOOLEAN NOT NULL DEFAULT FALSE,
+        num_parcelas INTEGER,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        data_pagamento TIMESTAMP,
+        atualizado_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE TABLE IF NOT EXISTS contas_fixas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios (id) ON DELETE CASCADE,
+        titulo TEXT NOT NULL,
+        valor_total NUMERIC(12, 2) NOT NULL,
+        data_inicio DATE NOT NULL DEFAULT '1900-01-01',
+        data_fim DATE,
+        atualizado_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE TABLE IF NOT EXISTS tokens_recuperacao (
+        telefone TEXT PRIMARY KEY,
+        token_hash CHAR(64) NOT NULL,
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        expira_em TIMESTAMPTZ NOT NULL,
+        criado_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE INDEX IF NOT EXISTS idx_tokens_recuperacao_expira_em
+        ON tokens_recuperacao (expira_em)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_email_unico
+        ON usuarios (email)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_telefone_unico
+        ON usuarios (telefone)
+        WHERE telefone IS NOT NULL AND telefone <> ''
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS renda_historico (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        vigente_desde DATE NOT NULL,
+        criado_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_renda_historico_user_vigencia
+        ON renda_historico (user_id, vigente_desde)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_boletos_pendentes
+        ON boletos (usuario_id, data_vencimento)
+        WHERE pago = FALSE
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lembretes_enviados (
+        tipo TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        vencimento DATE NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        enviado_em TIMESTAMPTZ NOT NULL DEFAULT (%s),
+        PRIMARY KEY (tipo, item_id, vencimento)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE TABLE IF NOT EXISTS contas_fixas_mensais (
+        conta_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        mes DATE NOT NULL,
+        titulo TEXT NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (conta_id, mes)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_contas_fixas_mensais_usuario_mes
+        ON contas_fixas_mensais (usuario_id, mes)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS registros_excluidos (
+        tabela TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        excluido_em TIMESTAMPTZ NOT NULL DEFAULT (%s)
+    )
+    """ % _SQLITE_NOW,
+    """
+    CREATE INDEX IF NOT EXISTS idx_registros_excluidos_usuario
+        ON registros_excluidos (tabela, usuario_id, excluido_em)
+    """,
+    *[
+        statement % {"table": table, "now": _SQLITE_NOW}
+        for table in _SQLITE_TRACKED_TABLES
+        for statement in (
+            """
+            CREATE INDEX IF NOT EXISTS idx_%(table)s_usuario_atualizado
+                ON %(table)s (usuario_id, atualizado_em)
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_%(table)s_atualizado_em
+                AFTER UPDATE ON %(table)s FOR EACH ROW
+                WHEN NEW.atualizado_em IS OLD.atualizado_em
+            BEGIN
+                UPDATE %(table)s SET atualizado_em = %(now)s WHERE id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_%(table)s_exclusao
+                AFTER DELETE ON %(table)s FOR EACH ROW
+            BEGIN
+                INSERT INTO registros_excluidos (tabela, item_id, usuario_id)
+                VALUES ('%(table)s', OLD.id, OLD.usuario_id);
+            END
+            """,
+        )
+    ],
+    """
+    CREATE TABLE IF NOT EXISTS lancamentos (
+        usuario_id INTEGER NOT NULL,
+        origem TEXT NOT NULL,
+        origem_id INTEGER NOT NULL,
+        parcela INTEGER NOT NULL DEFAULT 1,
+        competencia DATE NOT NULL,
+        vencimento DATE NOT NULL,
+        descricao TEXT NOT NULL,
+        valor NUMERIC(12, 2) NOT NULL,
+        pago BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (origem, origem_id, parcela, competencia)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_lancamentos_usuario_competencia
+        ON lancamentos (usuario_id, competencia)
+    """,
+]
+
+# Carga do livro-razão no SQLite (benchmarks): sem generate_series, as
+# parcelas dos cartões são geradas por uma CTE recursiva
+SQLITE_LEDGER_BACKFILL = """
+    WITH RECURSIVE p(k) AS (
+        SELECT 0
+        UNION ALL
+        SELECT k + 1 FROM p
+        WHERE k + 1 < (SELECT MAX(num_parcelas) FROM cartoes_credito)
+    )
+    INSERT INTO lancamentos
+        (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+         descricao, valor, pago)
+    SELECT c.usuario_id, 'cartao', c.id, p.k + 1,
+           date_trunc('month', c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+           (c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+           c.nome_conta, c.valor_parcela, FALSE
+    FROM cartoes_credito c
+    JOIN p ON p.k < c.num_parcelas
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    UNION ALL
+    SELECT usuario_id, 'boleto', id, 1, date_trunc('month', data_vencimento)::date,
+           data_vencimento::date, titulo, valor_total, pago
+    FROM boletos
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    UNION ALL
+    SELECT usuario_id, 'conta_fixa', conta_id, 1, mes, mes, titulo, valor, pago
+    FROM contas_fixas_mensais
+    WHERE NOT EXISTS (SELECT 1 FROM lancamentos)
+    """
+
+# Diretório global de usuários, apenas no banco padrão e quando há shards:
+# gera IDs únicos entre os shards e resolve os logins por e-mail e telefone
+DIRECTORY_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS diretorio_usuarios (
+        id SERIAL PRIMARY KEY,
+        email TEXT NOT NULL,
+        telefone TEXT,
+        criado_em TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_diretorio_usuarios_email
+        ON diretorio_usuarios (email)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_diretorio_usuarios_telefone
+        ON diretorio_usuarios (telefone)
+        WHERE telefone IS NOT NULL AND telefone <> ''
+    """,
+]
+
+_schema_ready = False
+
+
+def ensure_schema():
+    """Aplica o esquema da aplicação no banco de dados uma única vez por processo.
+
+    Todos os comandos são idempotentes, de modo que várias réplicas podem
+    executá-los simultaneamente sem conflito. Os comandos são executados em
+    uma única transação, com um savepoint por comando: uma falha isolada é
+    registrada sem impedir a criação das demais estruturas. A exceção são os
+    índices únicos de e-mail e telefone (UNIQUE_USER_INDEXES), dos quais o
+    cadastro depende: se houver usuários duplicados, a inicialização é
+    interrompida com a lista dos IDs a corrigir. Com shards configurados, o
+    esquema é aplicado em cada shard e o banco padrão recebe apenas o
+    diretório global de usuários. Com o backend SQLite, é aplicado
+    SQLITE_SCHEMA_STATEMENTS. Os comandos utilizam o tempo limite das
+    tarefas em lote (BATCH_TIMEOUT_MS), pois a carga inicial do livro-razão
+    pode ser demorada.
+
+    Returns:
+        None: A função não retorna valor, mas cria as estruturas ausentes.
+
+    Raises:
+        SchemaError: Se um índice único de usuários não puder ser criado por
+            haver e-mails ou telefones duplicados.
+
+    Example:
+        >>> ensure_schema()
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    with statement_budget(BATCH_TIMEOUT_MS):
+        _schema_ready = _apply_schema()
+
+
+def _apply_schema():
+    """Aplica o esquema em cada banco; retorna False se algum falhar."""
+    if dialect() == "sqlite":
+        return _apply_statements(SQLITE_SCHEMA_STATEMENTS)
+
+    if is_sharded():
+        with use_shard(None):
+            if not _apply_statements(DIRECTORY_STATEMENTS):
+                return False
+
+    today = date.today()
+    for _ in for_each_shard():
+        if not _apply_statements(SCHEMA_STATEMENTS):
+            return False
+        ensure_ledger_partitions(
+            add_months(today, -LEDGER_MONTHS_BACK), add_months(today, LEDGER_MONTHS_AHEAD)
+        )
+    return True
+
+
+def _apply_statements(statements):
+    """Executa os comandos DDL no banco atual, um savepoint por comando.
+
+    Returns:
+        bool: False se a transação não pôde ser aberta ou confirmada.
+
+    Raises:
+        SchemaError: Se um índice de UNIQUE_USER_INDEXES falhar por duplicados.
+    """
+    try:
+        with transaction() as uow:
+            for statement in statements:
+                try:
+                    with uow.savepoint():
+                        uow.execute(statement)
+                except Exception as e:
+                    logger.error(f"Erro ao aplicar esquema: {e}")
+                    _check_unique_index(uow, statement)
+    except SchemaError:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao aplicar esquema: {e}")
+        return False
+    return True
+
+
+def _check_unique_index(uow, statement):
+    """Interrompe a inicialização se um índice único de usuários falhou por duplicados.
+
+    Args:
+        uow (UnitOfWork): Transação do esquema.
+        statement (str): Comando que falhou.
+
+    Raises:
+        SchemaError: Com os IDs dos usuários duplicados, se houver.
+    """
+    name = next((index for index in UNIQUE_USER_INDEXES if index in statement), None)
+    if name is None:
+        return
+
+    table, column = UNIQUE_USER_INDEXES[name]
+    rows = uow.query(
+        f"""
+        SELECT {column}, id FROM {table}
+        WHERE {column} IN (
+            SELECT {column} FROM {table}
+            WHERE {column} IS NOT NULL AND {column} <> ''
+            GROUP BY {column}
+            HAVING COUNT(*) > 1
+        )
+        ORDER BY {column}, id
+        """
+    )
+    if not rows:
+        return
+
+    groups = {}
+    for value, user_id in rows:
+        groups.setdefault(value, []).append(str(user_id))
+    report = "; ".join(f"IDs {', '.join(ids)}" for ids in groups.values())
+    raise SchemaError(
+        f"Não foi possível criar o índice único {name}: {len(groups)} {column}(s) "
+        f"cadastrado(s) em mais de um registro de {table} ({report}). "
+        f"Corrija ou remova os cadastros duplicados e reinicie a aplicação."
+    )
+
+
+def add_months(day, months):
+    """Retorna o primeiro dia do mês deslocado em months meses."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month):
+    """Nome da partição mensal do livro-razão (lancamentos_AAAAMM)."""
+    return f"lancamentos_{month:%Y%m}"
+
+
+def ensure_ledger_partitions(first, last):
+    """Cria as partições mensais ausentes do livro-razão no intervalo.
+
+    Lançamentos do mês que já estejam na partição padrão são movidos para a
+    nova partição na mesma transação, antes de ela ser anexada. Cada mês é
+    criado em um savepoint próprio: uma falha isolada é registrada sem
+    impedir os demais.
+
+    Args:
+        first (date): Qualquer data do primeiro mês.
+        last (date): Qualquer data do último mês.
+
+    Returns:
+        list[str]: Nomes das partições criadas (sempre vazia no SQLite, que
+            não particiona o livro-razão).
+
+    Example:
+        >>> ensure_ledger_partitions(date(2025, 1, 1), date(2025, 12, 1))
+    """
+    created = []
+    if dialect() == "sqlite":
+        return created
+    month = first.replace(day=1)
+    try:
+        with transaction() as uow:
+            while month <= last:
+                name = _partition_name(month)
+                following = add_months(month, 1)
+                try:
+                    with uow.savepoint():
+                        exists = uow.query("SELECT to_regclass(%s)", (name,))[0][0]
+                        if exists is None:
+                            uow.execute(
+                                f"CREATE TABLE {name} "
+                                "(LIKE lancamentos INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                            )
+                            uow.execute(
+                                f"""
+                                WITH movidos AS (
+                                    DELETE FROM lancamentos_padrao
+                                    WHERE competencia >= %s AND competencia < %s
+                                    RETURNING *
+                                )
+                                INSERT INTO {name} SELECT * FROM movidos
+                                """,
+                                (month, following),
+                            )
+                            uow.execute(
+                                f"ALTER TABLE lancamentos ATTACH PARTITION {name} "
+                                "FOR VALUES FROM (%s) TO (%s)",
+                                (month, following),
+                            )
+                            created.append(name)
+                except Exception as e:
+                    logger.error(f"Erro ao criar a partição {name}: {e}")
+                month = following
+    except Exception as e:
+        logger.error(f"Erro ao criar as partições do livro-razão: {e}")
+    return created
+
+
+def detach_ledger_partitions(before, drop=False):
+    """Desanexa as partições mensais do livro-razão anteriores a um mês.
+
+    As partições desanexadas continuam no banco como tabelas comuns, podendo
+    ser arquivadas (pg_dump) e removidas. Com drop=True são removidas
+    imediatamente.
+
+    Args:
+        before (date): Partições de meses anteriores a este são desanexadas.
+        drop (bool, optional): Remove as tabelas após desanexá-las.
+
+    Returns:
+        list[str]: Nomes das partições desanexadas.
+    """
+    limit = _partition_name(before.replace(day=1))
+    detached = []
+    if dialect() == "sqlite":
+        return detached
+    with transaction() as uow:
+        rows = uow.query(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'lancamentos'::regclass
+              AND c.relname ~ '^lancamentos_[0-9]{6}$'
+              AND c.relname < %s
+            ORDER BY c.relname
+            """,
+            (limit,),
+        )
+        for (name,) in rows:
+            uow.execute(f"ALTER TABLE lancamentos DETACH PARTITION {name}")
+            if drop:
+                uow.execute(f"DROP TABLE {name}")
+            detached.append(name)
+    return detached
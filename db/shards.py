@@ -0,0 +1,179 @@
+"""Módulo de roteamento por usuário entre vários bancos PostgreSQL (shards).
+
+Todos os dados da aplicação pertencem a um usuário, de modo que cada
+usuário e seus boletos, cartões, contas fixas e renda ficam inteiramente em
+um dos bancos listados em DB_SHARDS, escolhido por hash do ID do usuário.
+O banco padrão (DB_HOST/DB_NAME) guarda o diretório global de usuários
+(diretorio_usuarios), que gera IDs únicos entre os shards e resolve os
+logins por e-mail e telefone.
+
+Sem DB_SHARDS, ou com o backend SQLite, toda a aplicação usa apenas o
+banco padrão.
+
+Componentes principais:
+    - shard_specs: Bancos configurados em DB_SHARDS
+    - shard_for_user: Índice do shard de um usuário
+    - use_shard / use_user_shard: Fixam o shard dos comandos do bloco
+    - for_each_shard: Percorre os shards (tarefas que envolvem vários usuários)
+    - set_user_resolver: Define o usuário da sessão atual para o roteamento
+    - current_spec: Banco a ser usado pelo db.conn no momento
+
+Exemplo:
+    DB_SHARDS=localhost:5432/financas_0,localhost:5432/financas_1
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from db.backends import get_backend
+
+_local = threading.local()
+_user_resolver = None
+
+
+def shard_specs():
+    """Lista os bancos configurados em DB_SHARDS.
+
+    Cada item tem o formato host:porta/banco; usuário e senha são os mesmos
+    do banco padrão.
+
+    Returns:
+        list[dict]: Dicionários com host, port e dbname, na ordem configurada;
+            lista vazia com o backend SQLite.
+
+    Example:
+        >>> os.environ["DB_SHARDS"] = "localhost:5432/financas_0"
+        >>> shard_specs()
+        [{'host': 'localhost', 'port': '5432', 'dbname': 'financas_0'}]
+    """
+    specs = []
+    if get_backend().NAME != "postgres":
+        return specs
+    for item in os.getenv("DB_SHARDS", "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        address, _, dbname = item.partition("/")
+        host, _, port = address.partition(":")
+        specs.append(
+            {
+                "host": host or os.getenv("DB_HOST"),
+                "port": port or os.getenv("DB_PORT"),
+                "dbname": dbname or os.getenv("DB_NAME"),
+            }
+        )
+    return specs
+
+
+def is_sharded():
+    """Indica se há shards configurados."""
+    return bool(shard_specs())
+
+
+def shard_for_user(user_id):
+    """Retorna o índice do shard de um usuário.
+
+    O hash é estável entre processos e versões do Python.
+
+    Args:
+        user_id (int): ID do usuário.
+
+    Returns:
+        int: Índice em shard_specs(), ou 0 sem shards configurados.
+    """
+    count = len(shard_specs())
+    if count <= 1:
+        return 0
+    digest = hashlib.md5(str(int(user_id)).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def set_user_resolver(resolver):
+    """Define a função que retorna o usuário da sessão atual.
+
+    Usada quando nenhum shard foi fixado com use_shard/use_user_shard, de
+    modo que as funções de queries.py que recebem apenas o ID de um item
+    (por exemplo, update_bill) sejam roteadas ao shard do usuário logado.
+
+    Args:
+        resolver (callable): Função sem argumentos que retorna o ID do
+            usuário atual, ou None.
+    """
+    global _user_resolver
+    _user_resolver = resolver
+
+
+@contextmanager
+def use_shard(index):
+    """Fixa o shard dos comandos executados no bloco (na thread atual).
+
+    Args:
+        index (int | None): Índice em shard_specs(); None usa o banco padrão
+            (diretório global).
+
+    Example:
+        >>> with use_shard(1):
+        >>>     purge_sent_reminders()
+    """
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(index)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+@contextmanager
+def use_user_shard(user_id):
+    """Fixa o shard do usuário informado para os comandos do bloco.
+
+    Args:
+        user_id (int): ID do usuário.
+    """
+    with use_shard(shard_for_user(user_id) if is_sharded() else None):
+        yield
+
+
+def for_each_shard():
+    """Percorre os shards, fixando cada um durante a iteração.
+
+    Sem shards configurados, o banco padrão é visitado uma única vez.
+
+    Yields:
+        int | None: Índice do shard atual (None para o banco padrão).
+
+    Example:
+        >>> for _ in for_each_shard():
+        >>>     claim_due_reminders(3)
+    """
+    indexes = range(len(shard_specs())) if is_sharded() else [None]
+    for index in indexes:
+        with use_shard(index):
+            yield index
+
+
+def current_spec():
+    """Retorna o banco a ser usado pelos comandos da thread atual.
+
+    Returns:
+        dict | None: Dicionário de shard_specs(), ou None para o banco padrão.
+    """
+    specs = shard_specs()
+    if not specs:
+        return None
+
+    stack = getattr(_local, "stack", None)
+    if stack:
+        index = stack[-1]
+        return specs[index] if index is not None else None
+
+    user_id = None
+    if _user_resolver is not None:
+        try:
+            user_id = _user_resolver()
+        except Exception:
+            user_id = None
+    if user_id is None:
+        return None
+    return specs[shard_for_user(user_id)]
@@ -5,16 +5,22 @@ dentro da aplicação, permitindo a recuperação, atualização e exclusão de
 
 Componentes principais:
     - save_fixed_account: Função para salvar uma nova conta fixa ou atualizar uma existente
-    - get_fixed_accounts: Função para recuperar as contas fixas do usuário
+    - get_fixed_account_changes: Função para recuperar as contas fixas novas ou alteradas
     - update_fixed_account: Função para atualizar uma conta fixa específica
     - delete_fixed_account: Função para excluir uma conta fixa
+    - materialize_fixed_accounts: Função para gerar os lançamentos do mês
+    - set_fixed_account_paid: Função para marcar um lançamento como pago
 
 Módulos integrados:
     - streamlit: Para a construção da interface do usuário
+    - ui.fragments: Para reexecutar apenas a linha alterada (rerun_fragment)
 
 Funcionalidades:
     - Visualização das contas fixas cadastradas
     - Criação, edição e exclusão de contas fixas conforme as entradas do usuário
+    - Acompanhamento dos lançamentos do mês atual (pago/pendente)
+    - Edição e exclusão em fragmentos: apenas a linha alterada é reexecutada
+    - Atualização incremental da lista carregada (apenas contas alteradas)
 
 Fluxo da aplicação:
     1. Importar funções necessárias para manipulação de contas fixas
@@ -22,11 +28,18 @@ Fluxo da aplicação:
 """
 
 import streamlit as st
+from datetime import date
+from admin.profiler import section
+from db.changes import merge_changes
+from db.conn import QueryTimeoutError
+from ui.fragments import fragment, rerun_fragment
 from .queries import (
     save_fixed_account,
-    get_fixed_accounts,
+    get_fixed_account_changes,
     update_fixed_account,
     delete_fixed_account,
+    materialize_fixed_accounts,
+    set_fixed_account_paid,
 )
 
 
@@ -45,7 +58,7 @@ def fixed_accounts_page():
 
     Componentes:
         - save_fixed_account: Função para salvar uma nova conta fixa
-        - get_fixed_accounts: Função para recuperar contas fixas existentes
+        - get_fixed_account_changes: Função para recuperar contas fixas novas ou alteradas
         - display_fixed_accounts: Função para exibir contas cadastradas
     """
     user_id = st.session_state.get("user_id")
@@ -62,24 +75,74 @@ def fixed_accounts_page():
         st.subheader("Nova Conta Fixa")
         title = st.text_input("Título da Conta*")
         total_value = st.number_input("Valor Mensal (R$)*", min_value=0.01, step=0.01)
+        start_date = st.date_input("Início da Cobrança*", value=date.today())
 
         if st.form_submit_button("📤 Salvar Conta"):
-            if not all([title, total_value]):
+            if not all([title, total_value, start_date]):
                 st.error("Campos obrigatórios marcados com *")
             else:
                 try:
-                    save_fixed_account(user_id, title, total_value)
+                    account = save_fixed_account(
+                        user_id, title, total_value, start_date.replace(day=1)
+                    )
                     st.success("Conta fixa salva com sucesso!")
-                    st.session_state.pop("accounts", None)
+                    replace_account(account[0], account)
                     st.rerun()
+                except QueryTimeoutError as e:
+                    st.warning(f"⏳ {e}")
                 except Exception as e:
                     st.error(f"Erro ao salvar a conta fixa: {e}")
 
-    if "accounts" not in st.session_state:
-        st.session_state.accounts = get_fixed_accounts(user_id)
+    with section("Consulta de contas fixas"):
+        refresh_accounts(user_id)
     accounts = st.session_state.accounts
 
-    display_fixed_accounts(accounts)
+    with section("Listagem de contas fixas"):
+        display_fixed_accounts(accounts)
+
+    if "month_accounts" not in st.session_state:
+        with section("Lançamentos do mês"):
+            today = date.today()
+            st.session_state.month_accounts = materialize_fixed_accounts(
+                user_id, [(today.year, today.month)]
+            )
+
+    with section("Listagem dos lançamentos do mês"):
+        display_month_accounts(st.session_state.month_accounts)
+
+
+def refresh_accounts(user_id):
+    """Carrega ou atualiza incrementalmente a lista de contas fixas da sessão.
+
+    Na primeira visita todas as contas são lidas; nas seguintes, apenas as
+    alteradas ou excluídas desde a última leitura (accounts_watermark). Se a
+    marca d'água expirou, a lista é recarregada.
+
+    Args:
+        user_id (int): ID do usuário logado.
+    """
+    watermark = None
+    if st.session_state.get("accounts") is not None:
+        watermark = st.session_state.get("accounts_watermark")
+
+    try:
+        changes = get_fixed_account_changes(user_id, watermark)
+        if changes is None:
+            watermark = None
+            changes = get_fixed_account_changes(user_id, None)
+    except Exception as e:
+        st.error(f"Erro ao carregar as contas fixas: {e}")
+        st.session_state.setdefault("accounts", [])
+        return
+
+    rows, deleted, st.session_state.accounts_watermark = changes
+    if watermark is None:
+        st.session_state.accounts = rows
+    elif rows or deleted:
+        st.session_state.accounts = merge_changes(
+            st.session_state.accounts, rows, deleted
+        )
+        st.session_state.pop("month_accounts", None)
 
 
 def display_fixed_accounts(accounts):
@@ -102,9 +165,55 @@ def display_fixed_accounts(accounts):
         return
 
     for account in accounts:
-        with st.container(border=True):
-            editing = st.session_state.get(f"editing_{account[0]}", False)
-            show_account_editor(account) if editing else show_account_info(account)
+        account_row(account[0])
+
+
+@fragment
+def account_row(account_id):
+    """Renderiza uma conta fixa como fragmento independente.
+
+    Edições e exclusões reexecutam apenas este fragmento, lendo a conta da
+    lista mantida na sessão. Os lançamentos do mês são recarregados na
+    próxima execução completa da página.
+
+    Args:
+        account_id (int): ID da conta fixa a ser exibida.
+    """
+    accounts = st.session_state.get("accounts") or []
+    account = next((a for a in accounts if a[0] == account_id), None)
+    if account is None:
+        return
+
+    with st.container(border=True):
+        editing = st.session_state.get(f"editing_{account_id}", False)
+        show_account_editor(account) if editing else show_account_info(account)
+
+
+def replace_account(account_id, account):
+    """Atualiza a lista de contas fixas da sessão sem consultá-la novamente.
+
+    A conta retornada pela escrita (RETURNING) substitui a de mesmo ID ou,
+    se for nova, é acrescentada ao final; com account None a conta é
+    removida. Se a lista ainda não foi carregada, nada é feito.
+
+    Args:
+        account_id (int): ID da conta fixa alterada.
+        account (tuple | None): Conta retornada pela escrita, ou None se foi excluída.
+    """
+    st.session_state.pop("month_accounts", None)
+    if st.session_state.get("accounts") is None:
+        return
+    accounts = []
+    found = False
+    for item in st.session_state.accounts:
+        if item[0] != account_id:
+            accounts.append(item)
+        elif account is not None:
+            accounts.append(account)
+            found = True
+    if account is not None and not found:
+        accounts.append(account)
+    st.session_state.accounts = accounts
 
 
 def show_account_info(account):
@@ -123,17 +232,22 @@ def show_account_info(account):
 
     cols[0].write(f"**{account[1]}**")
     cols[1].write(f"**Valor Mensal**\nR$ {account[2]:.2f}")
+    period = f"Desde {account[3]:%m/%Y}"
+    if account[4]:
+        period += f" até {account[4]:%m/%Y}"
+    cols[2].write(f"**Vigência**\n{period}")
 
     if cols[3].button("✏️ Editar", key=f"edit_{account[0]}"):
         st.session_state[f"editing_{account[0]}"] = True
-        st.rerun()
+        rerun_fragment()
 
     if cols[3].button("🗑️", key=f"del_{account[0]}"):
         try:
             delete_fixed_account(account[0])
-            st.success("Conta fixa deletada com sucesso!")
-            st.session_state.pop("accounts", None)
-            st.rerun()
+            replace_account(account[0], None)
+            rerun_fragment()
+        except QueryTimeoutError as e:
+            st.warning(f"⏳ {e}")
         except Exception as e:
             st.error(f"Erro ao deletar a conta fixa: {e}")
 
@@ -141,8 +255,9 @@ def show_account_info(account):
 def show_account_editor(account):
     """Renderiza um formulário para editar uma conta fixa.
 
-    Esta função permite ao usuário modificar o título e o valor mensal
-    de uma conta fixa existente.
+    Esta função permite ao usuário modificar o título, o valor mensal e o
+    fim da cobrança de uma conta fixa existente. A alteração vale a partir
+    do mês atual; os meses anteriores não são modificados.
 
     Args:
         account (tuple): Tupla contendo informações da conta fixa a ser editada.
@@ -157,18 +272,72 @@ def show_account_editor(account):
         new_value = st.number_input(
             "Valor Mensal (R$)*", value=float(account[2]), min_value=0.01, step=0.01
         )
+        new_end_date = st.date_input(
+            "Fim da Cobrança", value=account[4], min_value=account[3]
+        )
 
         col1, col2, _ = st.columns([2, 2, 4])
         if col1.form_submit_button("💾 Salvar"):
             try:
-                update_fixed_account(account[0], new_title, new_value)
-                st.success("Conta fixa atualizada com sucesso!")
+                updated = update_fixed_account(
+                    account[0], new_title, new_value, new_end_date
+                )
                 st.session_state[f"editing_{account[0]}"] = False
-                st.session_state.pop("accounts", None)
-                st.rerun()
+                replace_account(account[0], updated)
+                rerun_fragment()
+            except QueryTimeoutError as e:
+                st.warning(f"⏳ {e}")
             except Exception as e:
                 st.error(f"Erro ao atualizar a conta fixa: {e}")
 
         if col2.form_submit_button("❌ Cancelar"):
             st.session_state[f"editing_{account[0]}"] = False
-            st.rerun()
+            rerun_fragment()
+
+
+def display_month_accounts(entries):
+    """Exibe os lançamentos das contas fixas no mês atual.
+
+    Cada lançamento pode ser marcado como pago ou pendente.
+
+    Args:
+        entries (list): Lista de tuplas (conta_id, mes, titulo, valor, pago).
+
+    Returns:
+        None: A função não retorna valor, mas atualiza a interface do Streamlit.
+    """
+    st.divider()
+    st.subheader(f"Contas do Mês ({date.today():%m/%Y})")
+
+    if not entries:
+        st.info("Nenhuma conta fixa vigente neste mês.")
+        return
+
+    for account_id, month, title, value, paid in entries:
+        month_account_row(account_id, month, title, value, paid)
+
+
+@fragment
+def month_account_row(account_id, month, title, value, paid):
+    """Renderiza um lançamento do mês como fragmento independente.
+
+    Args:
+        account_id (int): ID da conta fixa.
+        month (date): Mês do lançamento.
+        title (str): Título da conta.
+        value (Decimal): Valor do lançamento.
+        paid (bool): Status de pagamento carregado com a lista.
+    """
+    cols = st.columns([3, 2, 2])
+    cols[0].write(f"**{title}**")
+    cols[1].write(f"R$ {value:.2f}")
+    key = f"paid_{account_id}_{month:%Y%m}"
+    new_paid = cols[2].checkbox("Pago", value=paid, key=key)
+    if new_paid != st.session_state.get(f"{key}_saved", paid):
+        try:
+            set_fixed_account_paid(account_id, month, new_paid)
+            st.session_state[f"{key}_saved"] = new_paid
+        except QueryTimeoutError as e:
+            st.warning(f"⏳ {e}")
+        except Exception as e:
+            st.error(f"Erro ao atualizar o lançamento: {e}")
@@ -1,93 +1,89 @@
-"""Módulo de conexão e registro de log para a aplicação.
+"""Módulo de operações de banco de dados para contas fixas.
 
-Este módulo é responsável por gerenciar a conexão com o banco de dados
-e registrar eventos e erros ocorridos durante a execução da aplicação.
+Este módulo é responsável pelas operações de leitura e escrita de contas fixas,
+utilizando a camada de acesso compartilhada em db.conn.
 
 Componentes principais:
     - execute_query: Função para executar consultas SQL no banco de dados
-    - get_connection: Função para estabelecer e retornar a conexão com o banco de dados
-    - logging: Módulo para registrar logs de eventos e erros
+    - execute_update: Função para executar comandos SQL de escrita
+    - transaction: Agrupa as escritas na conta e nos seus lançamentos mensais
 
 Funcionalidades:
-    - Estabelecer conexão com o banco de dados
     - Executar consultas SQL de leitura
-    - Registrar mensagens de log para monitoramento e depuração
+    - Executar comandos de escrita pela mesma camada de acesso dos demais módulos
+    - Materializar as contas fixas em lançamentos mensais (contas_fixas_mensais),
+      preservando os meses anteriores quando uma conta é alterada
+    - Verificar com uma leitura se faltam lançamentos antes de gerá-los, sem
+      escrever no primário quando o período já está materializado
+    - Sincronizar os lançamentos mensais com o livro-razão (lancamentos)
+    - Retornar a linha afetada pelas escritas (RETURNING) para atualizar listas em cache
+    - Ler apenas as contas alteradas desde uma marca d'água
 
 Fluxo da aplicação:
     1. Importar funções necessárias para manipulação de banco de dados
-    2. Configurar e utilizar o sistema de logging
+    2. Delegar conexão, transação e registro de erros ao módulo db.conn
 """
 
-from db.conn import execute_query, get_connection
-import logging
+from datetime import date
+from db.changes import fetch_changes
+from db.conn import dialect, execute_query, execute_update, transaction
+from ledger.queries import set_entry_paid, sync_fixed_account
 
-# Configura o logger
-logging.basicConfig(level=logging.ERROR)
-logger = logging.getLogger(__name__)
 
-
-def execute_non_query(query, params=None):
-    """Executa uma consulta que não espera resultados.
-
-    Esta função executa comandos SQL que não retornam dados (como INSERT, UPDATE, DELETE)
-    e gerencia transações, garantindo que as alterações sejam confirmadas ou revertidas
-    em caso de erro.
-
-    Fluxo:
-        1. Estabelece conexão com o banco de dados
-        2. Executa a consulta SQL fornecida
-        3. Comita as alterações ou reverte em caso de erro
-
-    Exceções:
-        - Registra erros de execução e reverte a transação em caso de falha.
-
-    Args:
-        query (str): Consulta SQL a ser executada.
-        params (tuple, optional): Parâmetros da consulta. Padrão é None.
-    """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query, params)
-        conn.commit()
-    except Exception as e:
-        logger.error(f"Erro durante a execução da consulta: {e}")
-        conn.rollback()
-        raise
-    finally:
-        cursor.close()
-        conn.close()
-
-
-def save_fixed_account(user_id, title, total_value):
+def save_fixed_account(user_id, title, total_value, start_date=None, end_date=None):
     """Salva uma nova conta fixa no banco de dados.
 
-    Esta função insere uma nova conta fixa associada a um usuário.
+    Esta função insere uma nova conta fixa associada a um usuário, válida a
+    partir do mês de start_date e, opcionalmente, até o mês de end_date.
 
     Args:
         user_id (int): ID do usuário ao qual a conta está associada.
         title (str): Título da conta fixa.
         total_value (float): Valor total da conta fixa.
+        start_date (date, optional): Início da vigência. Padrão é o mês atual.
+        end_date (date, optional): Fim da vigência. Padrão é sem término.
+
+    Returns:
+        tuple: Conta inserida, no mesmo formato de get_fixed_accounts.
+
+    Raises:
+        Exception: Qualquer erro do banco de dados, após o rollback (ver
+            db.conn.transaction).
 
     Exemplo:
-        >>> save_fixed_account(1, "Aluguel", 1200.00)
+        >>> save_fixed_account(1, "Aluguel", 1200.00, date(2025, 1, 1))
     """
     insert_query = """
-        INSERT INTO contas_fixas (usuario_id, titulo, valor_total)
-        VALUES (%s, %s, %s)
+        INSERT INTO contas_fixas (usuario_id, titulo, valor_total, data_inicio, data_fim)
+        VALUES (%s, %s, %s, COALESCE(%s, date_trunc('month', CURRENT_DATE)::date), %s)
+        RETURNING id, titulo, valor_total, data_inicio, data_fim
     """
-    execute_non_query(insert_query, (user_id, title, total_value))
+    with transaction() as uow:
+        rows = uow.execute(
+            insert_query,
+            (user_id, title, total_value, start_date, end_date),
+            returning=True,
+        )
+    return rows[0]
 
 
-def update_fixed_account(account_id, title, total_value):
+def update_fixed_account(account_id, title, total_value, end_date=None):
     """Atualiza os detalhes de uma conta fixa existente.
 
-    Esta função modifica o título e o valor total de uma conta fixa existente.
+    Esta função modifica o título, o valor total e o fim da vigência de uma
+    conta fixa existente. Os lançamentos mensais já materializados e ainda
+    não pagos a partir do mês atual são atualizados na mesma transação; os
+    meses anteriores permanecem inalterados.
 
     Args:
         account_id (int): ID da conta fixa a ser atualizada.
         title (str): Novo título da conta fixa.
         total_value (float): Novo valor total da conta fixa.
+        end_date (date, optional): Fim da vigência. Padrão é sem término.
+
+    Returns:
+        tuple | None: Conta atualizada, no mesmo formato de
+            get_fixed_accounts, ou None se a conta não existir.
 
     Exemplo:
         >>> update_fixed_account(1, "Aluguel Atualizado", 1300.00)
@@ -95,16 +91,42 @@ def update_fixed_account(account_id, title, total_value):
     update_query = """
         UPDATE contas_fixas SET
             titulo = %s,
-            valor_total = %s
+            valor_total = %s,
+            data_fim = %s
         WHERE id = %s
+        RETURNING id, titulo, valor_total, data_inicio, data_fim
+    """
+    ledger_update_query = """
+        UPDATE contas_fixas_mensais SET
+            titulo = %s,
+            valor = %s
+        WHERE conta_id = %s
+          AND mes >= date_trunc('month', CURRENT_DATE)
+          AND pago = FALSE
+    """
+    ledger_delete_query = """
+        DELETE FROM contas_fixas_mensais
+        WHERE conta_id = %s
+          AND mes > %s
+          AND pago = FALSE
     """
-    execute_non_query(update_query, (title, total_value, account_id))
+    with transaction() as uow:
+        rows = uow.execute(
+            update_query, (title, total_value, end_date, account_id), returning=True
+        )
+        uow.execute(ledger_update_query, (title, total_value, account_id))
+        if end_date:
+            uow.execute(ledger_delete_query, (account_id, end_date))
+        sync_fixed_account(account_id, _current_month())
+    return rows[0] if rows else None
 
 
 def delete_fixed_account(account_id):
     """Exclui uma conta fixa do banco de dados.
 
-    Esta função remove uma conta fixa com base no ID fornecido.
+    Esta função remove uma conta fixa com base no ID fornecido, junto com
+    seus lançamentos mensais não pagos a partir do mês atual. Os lançamentos
+    dos meses anteriores são mantidos no histórico.
 
     Args:
         account_id (int): ID da conta fixa a ser excluída.
@@ -112,8 +134,18 @@ def delete_fixed_account(account_id):
     Exemplo:
         >>> delete_fixed_account(1)
     """
-    delete_query = "DELETE FROM contas_fixas WHERE id = %s"
-    execute_non_query(delete_query, (account_id,))
+    with transaction() as uow:
+        uow.execute("DELETE FROM contas_fixas WHERE id = %s", (account_id,))
+        uow.execute(
+            """
+            DELETE FROM contas_fixas_mensais
+            WHERE conta_id = %s
+              AND mes >= date_trunc('month', CURRENT_DATE)
+              AND pago = FALSE
+            """,
+            (account_id,),
+        )
+        sync_fixed_account(account_id, _current_month())
 
 
 def get_fixed_accounts(user_id):
@@ -125,14 +157,296 @@ def get_fixed_accounts(user_id):
         user_id (int): ID do usuário cujas contas fixas devem ser recuperadas.
 
     Returns:
-        list: Lista de tuplas contendo ID, título e valor total das contas fixas.
+        list: Lista de tuplas contendo ID, título, valor total, início e fim
+            da vigência das contas fixas.
 
     Exemplo:
         >>> accounts = get_fixed_accounts(1)
     """
     query = """
-        SELECT id, titulo, valor_total
+        SELECT id, titulo, valor_total, data_inicio, data_fim
         FROM contas_fixas
         WHERE usuario_id = %s
     """
     return execute_query(query, (user_id,))
+
+
+def get_fixed_account_changes(user_id, since):
+    """Recupera as contas fixas alteradas e excluídas desde uma marca d'água.
+
+    Args:
+        user_id (int): ID do usuário.
+        since (datetime | None): Marca d'água da leitura anterior; None
+            retorna todas as contas.
+
+    Returns:
+        tuple | None: (contas, ids_excluidos, marca_dagua), com as contas no
+            mesmo formato de get_fixed_accounts, ou None se a lista precisar
+            ser recarregada por completo.
+
+    Exemplo:
+        >>> accounts, deleted, watermark = get_fixed_account_changes(1, None)
+    """
+    return fetch_changes(
+        "contas_fixas", "id, titulo, valor_total, data_inicio, data_fim", user_id, since
+    )
+
+
+def _month_start(year, month):
+    """Retorna o primeiro dia do mês informado."""
+    return date(year, month, 1)
+
+
+def _current_month():
+    """Retorna o primeiro dia do mês atual."""
+    today = date.today()
+    return _month_start(today.year, today.month)
+
+
+def _month_range(months):
+    """Retorna o primeiro e o último mês (primeiro dia) de uma lista de pares."""
+    first = min(_month_start(ano, mes) for ano, mes in months)
+    last = max(_month_start(ano, mes) for ano, mes in months)
+    return first, last
+
+
+def _has_missing_entries(user_id, first, last):
+    """Verifica, apenas com leitura, se faltam lançamentos mensais no período.
+
+    Args:
+        user_id (int): ID do usuário.
+        first (date): Primeiro mês do período.
+        last (date): Último mês do período.
+
+    Returns:
+        bool: True se alguma conta vigente em algum mês do período ainda não
+            tiver o lançamento do mês (ou se a consulta falhar).
+    """
+    if dialect() == "sqlite":
+        query = """
+            WITH RECURSIVE m(mes) AS (
+                SELECT %s::date
+                UNION ALL
+                SELECT m.mes + INTERVAL '1 month' FROM m WHERE m.mes < %s::date
+            )
+            SELECT EXISTS (
+                SELECT 1
+                FROM contas_fixas c
+                CROSS JOIN m
+                WHERE c.usuario_id = %s
+                  AND c.data_inicio < m.mes + INTERVAL '1 month'
+                  AND (c.data_fim IS NULL OR c.data_fim >= m.mes)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM contas_fixas_mensais f
+                      WHERE f.conta_id = c.id AND f.mes = m.mes
+                  )
+            )
+        """
+    else:
+        query = """
+            SELECT EXISTS (
+                SELECT 1
+                FROM contas_fixas c
+                CROSS JOIN generate_series(%s::date, %s::date, INTERVAL '1 month') AS m(mes)
+                WHERE c.usuario_id = %s
+                  AND c.data_inicio < m.mes + INTERVAL '1 month'
+                  AND (c.data_fim IS NULL OR c.data_fim >= m.mes)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM contas_fixas_mensais f
+                      WHERE f.conta_id = c.id AND f.mes = m.mes::date
+                  )
+            )
+        """
+    result = execute_query(query, (first, last, user_id))
+    return not result or bool(result[0][0])
+
+
+def ensure_fixed_account_entries(user_id, months):
+    """Gera os lançamentos mensais ausentes de um período, se houver.
+
+    A verificação é uma leitura (encaminhada às réplicas, quando houver); a
+    escrita no primário, que fixa as leituras seguintes da sessão no
+    primário por DB_READ_YOUR_WRITES_SECONDS, só ocorre quando um mês ainda
+    não foi materializado para alguma conta vigente, como na primeira
+    consulta de um mês ou após criar ou editar uma conta.
+
+    Args:
+        user_id (int): ID do usuário.
+        months (list[tuple[int, int]]): Lista de pares (ano, mês).
+
+    Returns:
+        bool: True se lançamentos foram gerados.
+
+    Exemplo:
+        >>> ensure_fixed_account_entries(1, [(2025, 1)])
+        False
+    """
+    if not months or not _has_missing_entries(user_id, *_month_range(months)):
+        return False
+    materialize_fixed_accounts(user_id, months)
+    return True
+
+
+def materialize_fixed_accounts(user_id, months):
+    """Gera e retorna os lançamentos mensais das contas fixas de um período.
+
+    Os lançamentos ausentes no intervalo entre o menor e o maior mês
+    informados são criados em lote a partir das contas vigentes em cada mês.
+    Lançamentos já existentes não são alterados, de modo que meses passados
+    não mudam quando uma conta é editada. A geração, a cópia dos novos
+    lançamentos para o livro-razão e a leitura são feitas em um único comando
+    (no SQLite, em três comandos na mesma transação). Se nenhum lançamento
+    estiver faltando, os existentes são apenas lidos, sem escrita.
+
+    Args:
+        user_id (int): ID do usuário.
+        months (list[tuple[int, int]]): Lista de pares (ano, mês).
+
+    Returns:
+        list: Lista de tuplas (conta_id, mes, titulo, valor, pago) ordenadas
+            por mês e título.
+
+    Exemplo:
+        >>> materialize_fixed_accounts(1, [(2025, 1), (2025, 2)])
+    """
+    if not months:
+        return []
+
+    first, last = _month_range(months)
+    if not _has_missing_entries(user_id, first, last):
+        return (
+            execute_query(
+                """
+                SELECT conta_id, mes, titulo, valor, pago
+                FROM contas_fixas_mensais
+                WHERE usuario_id = %s AND mes BETWEEN %s AND %s
+                ORDER BY mes, titulo
+                """,
+                (user_id, first, last),
+            )
+            or []
+        )
+    if dialect() == "sqlite":
+        return _materialize_fixed_accounts_sqlite(user_id, first, last)
+
+    query = """
+        WITH novos AS (
+            INSERT INTO contas_fixas_mensais (conta_id, usuario_id, mes, titulo, valor)
+            SELECT c.id, c.usuario_id, m.mes::date, c.titulo, c.valor_total
+            FROM contas_fixas c
+            CROSS JOIN generate_series(%s::date, %s::date, INTERVAL '1 month') AS m(mes)
+            WHERE c.usuario_id = %s
+              AND c.data_inicio < m.mes + INTERVAL '1 month'
+              AND (c.data_fim IS NULL OR c.data_fim >= m.mes)
+            ON CONFLICT (conta_id, mes) DO NOTHING
+            RETURNING conta_id, usuario_id, mes, titulo, valor, pago
+        ),
+        razao AS (
+            INSERT INTO lancamentos
+                (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+                 descricao, valor, pago)
+            SELECT usuario_id, 'conta_fixa', conta_id, 1, mes, mes, titulo, valor, pago
+            FROM novos
+            ON CONFLICT DO NOTHING
+        )
+        SELECT conta_id, mes, titulo, valor, pago FROM novos
+        UNION ALL
+        SELECT conta_id, mes, titulo, valor, pago
+        FROM contas_fixas_mensais
+        WHERE usuario_id = %s AND mes BETWEEN %s AND %s
+        ORDER BY mes, titulo
+    """
+    return (
+        execute_update(
+            query, (first, last, user_id, user_id, first, last), returning=True
+        )
+        or []
+    )
+
+
+def _materialize_fixed_accounts_sqlite(user_id, first, last):
+    """Variante de materialize_fixed_accounts sem CTEs de escrita nem generate_series."""
+    with transaction() as uow:
+        uow.execute(
+            """
+            WITH RECURSIVE m(mes) AS (
+                SELECT %s::date
+                UNION ALL
+                SELECT m.mes + INTERVAL '1 month' FROM m WHERE m.mes < %s::date
+            )
+            INSERT INTO contas_fixas_mensais (conta_id, usuario_id, mes, titulo, valor)
+            SELECT c.id, c.usuario_id, m.mes, c.titulo, c.valor_total
+            FROM contas_fixas c
+            CROSS JOIN m
+            WHERE c.usuario_id = %s
+              AND c.data_inicio < m.mes + INTERVAL '1 month'
+              AND (c.data_fim IS NULL OR c.data_fim >= m.mes)
+            ON CONFLICT (conta_id, mes) DO NOTHING
+            """,
+            (first, last, user_id),
+        )
+        uow.execute(
+            """
+            INSERT INTO lancamentos
+                (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+                 descricao, valor, pago)
+            SELECT usuario_id, 'conta_fixa', conta_id, 1, mes, mes, titulo, valor, pago
+            FROM contas_fixas_mensais
+            WHERE usuario_id = %s AND mes BETWEEN %s AND %s
+            ON CONFLICT DO NOTHING
+            """,
+            (user_id, first, last),
+        )
+        return uow.query(
+            """
+            SELECT conta_id, mes, titulo, valor, pago
+            FROM contas_fixas_mensais
+            WHERE usuario_id = %s AND mes BETWEEN %s AND %s
+            ORDER BY mes, titulo
+            """,
+            (user_id, first, last),
+        )
+
+
+def get_fixed_account_totals(user_id, months):
+    """Calcula o total das contas fixas de cada mês informado.
+
+    Args:
+        user_id (int): ID do usuário.
+        months (list[tuple[int, int]]): Lista de pares (ano, mês).
+
+    Returns:
+        dict: Dicionário {(ano, mês): total}, com 0 para meses sem contas.
+
+    Exemplo:
+        >>> get_fixed_account_totals(1, [(2025, 1)])
+        {(2025, 1): Decimal('1200.00')}
+    """
+    totals = {(ano, mes): 0 for ano, mes in months}
+    for _, month, _, value, _ in materialize_fixed_accounts(user_id, months):
+        key = (month.year, month.month)
+        if key in totals:
+            totals[key] += value
+    return totals
+
+
+def set_fixed_account_paid(account_id, month, paid):
+    """Marca o lançamento mensal de uma conta fixa como pago ou pendente.
+
+    Args:
+        account_id (int): ID da conta fixa.
+        month (date): Qualquer data do mês do lançamento.
+        paid (bool): Novo status de pagamento.
+
+    Exemplo:
+        >>> set_fixed_account_paid(1, date(2025, 2, 1), True)
+    """
+    with transaction():
+        execute_update(
+            """
+            UPDATE contas_fixas_mensais SET pago = %s
+            WHERE conta_id = %s AND mes = date_trunc('month', %s::date)
+            """,
+            (paid, account_id, month),
+        )
+        set_entry_paid("conta_fixa", account_id, month, paid)
@@ -14,6 +14,7 @@ Módulos integrados:
 Funcionalidades:
     - Visualização da renda mensal atual
     - Atualização da renda mensal conforme as entradas do usuário
+    - Registro da data de vigência de cada alteração de renda
 
 Fluxo da aplicação:
     1. Importar funções necessárias para manipulação de renda
@@ -22,6 +23,7 @@ Fluxo da aplicação:
 
 import streamlit as st
 import pytz
+from datetime import date
 from .queries import (
     get_existing_income,
     save_income,
@@ -92,11 +94,18 @@ def income_page():
                 "Insira sua Renda Mensal", min_value=0.0, step=100.0, format="%.2f"
             )
 
+        effective_from = st.date_input(
+            "Vigente a partir de",
+            value=date.today(),
+            format="DD/MM/YYYY",
+            help="Meses anteriores continuam usando a renda vigente na época.",
+        )
+
         submitted = st.form_submit_button("💾 Salvar Renda")
 
         if submitted:
             try:
-                save_income(user_id, new_income)
+                save_income(user_id, new_income, effective_from)
                 st.success("✅ Renda atualizada com sucesso!")
                 st.session_state.existing_income = get_existing_income(user_id)
                 st.rerun()
@@ -6,6 +6,7 @@ facilitando a interação com as tabelas de dados da aplicação.
 Componentes principais:
     - execute_query: Função para executar consultas SQL de leitura
     - execute_update: Função para executar comandos SQL de escrita
+    - get_income_for_months: Renda vigente em cada mês, a partir do histórico
 
 Módulos integrados:
     - db.conn: Conexão com o banco de dados e gerenciamento de transações
@@ -14,6 +15,7 @@ Funcionalidades:
     - Realizar operações CRUD básicas
     - Suporte a transações seguras
     - Manutenção da integridade dos dados
+    - Histórico de renda com data de vigência (renda_historico)
 
 Fluxo da aplicação:
     1. Conectar ao banco de dados
@@ -21,14 +23,33 @@ Fluxo da aplicação:
     3. Retornar resultados ou confirmar mudanças
 """
 
-from db.conn import execute_query, execute_update
+from datetime import date
+from db.conn import dialect, execute_query, prepared, transaction
+
+# Renda vigente de cada mês do resumo (variante do PostgreSQL)
+GET_INCOME_FOR_MONTHS = prepared(
+    "get_income_for_months",
+    """
+    SELECT m.ano, m.mes, h.valor
+    FROM unnest(%s::int[], %s::int[]) AS m(ano, mes)
+    LEFT JOIN LATERAL (
+        SELECT valor
+        FROM renda_historico
+        WHERE user_id = %s
+          AND vigente_desde < make_date(m.ano, m.mes, 1) + INTERVAL '1 month'
+        ORDER BY vigente_desde DESC
+        LIMIT 1
+    ) h ON TRUE;
+    """,
+)
 
 
 def get_existing_income(user_id):
-    """Recupera a renda existente de um usuário no banco de dados.
+    """Recupera a renda vigente de um usuário no banco de dados.
 
-    Esta função executa uma consulta para obter o valor e a data de atualização
-    da renda associada a um usuário específico.
+    A renda vigente é derivada do histórico: o último valor cuja vigência já
+    começou. Valores cadastrados com vigência futura passam a ser exibidos
+    automaticamente quando a data chega.
 
     Args:
         user_id (int): ID do usuário cuja renda deve ser recuperada.
@@ -40,34 +61,110 @@ def get_existing_income(user_id):
         >>> incomes = get_existing_income(123)
     """
     return execute_query(
-        "SELECT valor, data_atualizacao FROM Renda WHERE user_id = %s;", (user_id,)
+        """
+        SELECT valor, criado_em
+        FROM renda_historico
+        WHERE user_id = %s AND vigente_desde <= %s
+        ORDER BY vigente_desde DESC
+        LIMIT 1;
+        """,
+        (user_id, date.today()),
     )
 
 
-def save_income(user_id, new_income):
+def save_income(user_id, new_income, effective_from=None):
     """Armazena ou atualiza a renda de um usuário no banco de dados.
 
-    Esta função insere um novo registro de renda ou atualiza um registro existente
-    com base no ID do usuário. Se um registro já existir, seu valor é atualizado
-    e a data de atualização é definida para o timestamp atual.
+    O valor é registrado no histórico de renda com sua data de vigência,
+    preservando a renda dos meses anteriores. Em seguida, na mesma transação,
+    a renda atual (tabela Renda) recebe o valor vigente hoje segundo o
+    histórico: uma renda com vigência futura, ou retroativa a uma data
+    anterior à de outro valor já vigente, não substitui a renda atual.
 
     Args:
         user_id (int): ID do usuário ao qual a renda está associada.
         new_income (float): Novo valor da renda a ser salvo.
+        effective_from (date, optional): Data a partir da qual a renda vale.
+            Padrão é a data atual.
 
     Returns:
         None: A função não retorna valor, mas persiste os dados no banco de dados.
 
     Example:
-        >>> save_income(123, 4500.00)
+        >>> save_income(123, 4500.00, date(2025, 3, 1))
     """
-    execute_update(
-        """
-        INSERT INTO Renda (user_id, valor)
-        VALUES (%s, %s)
-        ON CONFLICT (user_id) DO UPDATE
-        SET valor = EXCLUDED.valor,
-            data_atualizacao = CURRENT_TIMESTAMP AT TIME ZONE 'America/Sao_Paulo';
-        """,
-        (user_id, new_income),
+    today = date.today()
+    effective_from = effective_from or today
+
+    with transaction() as uow:
+        uow.execute(
+            """
+            INSERT INTO renda_historico (user_id, valor, vigente_desde)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id, vigente_desde) DO UPDATE
+            SET valor = EXCLUDED.valor,
+                criado_em = NOW();
+            """,
+            (user_id, new_income, effective_from),
+        )
+        uow.execute(
+            """
+            INSERT INTO Renda (user_id, valor)
+            SELECT user_id, valor
+            FROM renda_historico
+            WHERE user_id = %s AND vigente_desde <= %s
+            ORDER BY vigente_desde DESC
+            LIMIT 1
+            ON CONFLICT (user_id) DO UPDATE
+            SET valor = EXCLUDED.valor,
+                data_atualizacao = CURRENT_TIMESTAMP AT TIME ZONE 'America/Sao_Paulo'
+            WHERE Renda.valor <> EXCLUDED.valor;
+            """,
+            (user_id, today),
+        )
+
+
+def get_income_for_months(user_id, months):
+    """Recupera a renda vigente em cada um dos meses informados.
+
+    A renda de um mês é o último valor do histórico cuja vigência começou
+    até o fim daquele mês. Todos os meses são resolvidos em uma única
+    consulta, com uma busca indexada por (user_id, vigente_desde) para cada mês
+    (no SQLite, que não possui LATERAL, por uma subconsulta correlacionada).
+
+    Args:
+        user_id (int): ID do usuário.
+        months (list[tuple[int, int]]): Lista de pares (ano, mês).
+
+    Returns:
+        dict: Dicionário {(ano, mês): valor}, com 0 para meses sem renda vigente.
+
+    Example:
+        >>> get_income_for_months(123, [(2025, 1), (2025, 2)])
+        {(2025, 1): Decimal('4000.00'), (2025, 2): Decimal('4500.00')}
+    """
+    if not months:
+        return {}
+
+    if dialect() == "sqlite":
+        result = execute_query(
+            """
+            SELECT m.ano, m.mes, (
+                SELECT valor
+                FROM renda_historico
+                WHERE user_id = %s
+                  AND vigente_desde < make_date(m.ano, m.mes, 1) + INTERVAL '1 month'
+                ORDER BY vigente_desde DESC
+                LIMIT 1
+            )
+            FROM unnest(%s::int[], %s::int[]) AS m(ano, mes);
+            """,
+            (user_id, [ano for ano, _ in months], [mes for _, mes in months]),
+        )
+        return {(ano, mes): valor or 0 for ano, mes, valor in result or []}
+
+    result = execute_query(
+        GET_INCOME_FOR_MONTHS,
+        ([ano for ano, _ in months], [mes for _, mes in months], user_id),
     )
+    return {(ano, mes): valor or 0 for ano, mes, valor in result or []}
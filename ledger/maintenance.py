@@ -0,0 +1,64 @@
+"""Manutenção das partições mensais do livro-razão (lancamentos).
+
+A inicialização da aplicação cria as partições de LEDGER_MONTHS_BACK meses
+antes a LEDGER_MONTHS_AHEAD meses depois do mês atual. Esta linha de
+comando cria partições de outros períodos e desanexa as antigas, que podem
+então ser arquivadas e removidas sem afetar as consultas dos meses atuais.
+Com shards configurados (DB_SHARDS), a manutenção é feita em cada shard.
+
+Exemplos:
+    python -m ledger.maintenance --ahead 24
+    python -m ledger.maintenance --detach-before 2023-01
+    python -m ledger.maintenance --detach-before 2023-01 --drop
+"""
+
+import argparse
+import logging
+from datetime import date, datetime
+from db.conn import set_workload
+from db.schema import (
+    LEDGER_MONTHS_AHEAD,
+    LEDGER_MONTHS_BACK,
+    add_months,
+    detach_ledger_partitions,
+    ensure_ledger_partitions,
+    ensure_schema,
+)
+from db.shards import for_each_shard
+
+logger = logging.getLogger(__name__)
+
+
+def _month(value):
+    """Converte um texto AAAA-MM no primeiro dia do mês."""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main(argv=None):
+    """Cria as partições do período e desanexa as anteriores ao limite."""
+    parser = argparse.ArgumentParser(prog="python -m ledger.maintenance")
+    parser.add_argument("--back", type=int, default=LEDGER_MONTHS_BACK)
+    parser.add_argument("--ahead", type=int, default=LEDGER_MONTHS_AHEAD)
+    parser.add_argument("--detach-before", type=_month, help="Mês limite (AAAA-MM)")
+    parser.add_argument("--drop", action="store_true", help="Remove após desanexar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    set_workload("batch")
+    ensure_schema()
+
+    today = date.today()
+    for shard in for_each_shard():
+        prefix = f"[shard {shard}] " if shard is not None else ""
+        created = ensure_ledger_partitions(
+            add_months(today, -args.back), add_months(today, args.ahead)
+        )
+        logger.info(f"{prefix}Partições criadas: {created or 'nenhuma'}")
+
+        if args.detach_before:
+            detached = detach_ledger_partitions(args.detach_before, args.drop)
+            logger.info(f"{prefix}Partições desanexadas: {detached or 'nenhuma'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Módulo do livro-razão unificado de lançamentos (tabela lancamentos).
+
+Cartões de crédito, boletos e contas fixas possuem tabelas e colunas
+próprias. Este módulo mantém uma cópia normalizada desses itens na tabela
+lancamentos, particionada por mês de competência, de modo que relatórios
+entre categorias sejam feitos em uma única consulta que lê apenas as
+partições do período.
+
+A sincronização é feita pelos módulos de queries de cada categoria, dentro
+da mesma transação da escrita na tabela de origem.
+
+Componentes principais:
+    - sync_credit_card: Regera os lançamentos das parcelas de um cartão
+    - sync_bill: Regera o lançamento de um boleto
+    - sync_fixed_account: Regera os lançamentos de uma conta fixa a partir de um mês
+    - remove_entries: Remove os lançamentos de um item excluído
+    - set_entry_paid: Atualiza o status de pagamento de um lançamento
+    - get_monthly_totals: Totais por mês e categoria em uma única consulta
+
+Dependências:
+    - db.conn.execute_query: Para as consultas de leitura
+    - db.conn.execute_update: Para as operações de escrita
+"""
+
+from db.conn import dialect, execute_query, execute_update, prepared
+
+ORIGINS = ("cartao", "boleto", "conta_fixa")
+
+# Agregado do resumo, executado a cada mês consultado
+GET_MONTHLY_TOTALS = prepared(
+    "get_monthly_totals",
+    """
+    SELECT competencia, origem, SUM(valor)
+    FROM lancamentos
+    WHERE usuario_id = %s
+      AND competencia BETWEEN %s::date AND %s::date
+    GROUP BY competencia, origem
+    """,
+)
+
+
+def remove_entries(origin, origin_id, since=None):
+    """Remove os lançamentos de um item, opcionalmente a partir de um mês.
+
+    Args:
+        origin (str): "cartao", "boleto" ou "conta_fixa".
+        origin_id (int): ID do item na tabela de origem.
+        since (date, optional): Primeiro mês de competência removido.
+    """
+    execute_update(
+        """
+        DELETE FROM lancamentos
+        WHERE origem = %s AND origem_id = %s
+          AND (%s::date IS NULL OR competencia >= %s::date)
+        """,
+        (origin, origin_id, since, since),
+    )
+
+
+def sync_credit_card(card_id):
+    """Regera os lançamentos das parcelas de um cartão de crédito.
+
+    Cada parcela vence um mês após a anterior, a partir de dia_vencimento,
+    e é lançada na competência do seu vencimento. No SQLite, que não possui
+    generate_series, as parcelas são numeradas por uma CTE recursiva.
+
+    Args:
+        card_id (int): ID do lançamento em cartoes_credito.
+
+    Example:
+        >>> with transaction():
+        >>>     sync_credit_card(10)
+    """
+    remove_entries("cartao", card_id)
+    if dialect() == "sqlite":
+        execute_update(
+            """
+            WITH RECURSIVE p(k) AS (
+                SELECT 0
+                UNION ALL
+                SELECT k + 1 FROM p
+                WHERE k + 1 < (SELECT num_parcelas FROM cartoes_credito WHERE id = %s)
+            )
+            INSERT INTO lancamentos
+                (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+                 descricao, valor)
+            SELECT c.usuario_id, 'cartao', c.id, p.k + 1,
+                   date_trunc('month', c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+                   (c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+                   c.nome_conta, c.valor_parcela
+            FROM cartoes_credito c
+            CROSS JOIN p
+            WHERE c.id = %s
+            """,
+            (card_id, card_id),
+        )
+        return
+
+    execute_update(
+        """
+        INSERT INTO lancamentos
+            (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+             descricao, valor)
+        SELECT c.usuario_id, 'cartao', c.id, p.k + 1,
+               date_trunc('month', c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+               (c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+               c.nome_conta, c.valor_parcela
+        FROM cartoes_credito c
+        CROSS JOIN LATERAL generate_series(0, c.num_parcelas - 1) AS p(k)
+        WHERE c.id = %s
+        """,
+        (card_id,),
+    )
+
+
+def sync_bill(bill_id):
+    """Regera o lançamento de um boleto na competência do seu vencimento.
+
+    Args:
+        bill_id (int): ID do boleto.
+    """
+    remove_entries("boleto", bill_id)
+    execute_update(
+        """
+        INSERT INTO lancamentos
+            (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+             descricao, valor, pago)
+        SELECT usuario_id, 'boleto', id, 1,
+               date_trunc('month', data_vencimento)::date, data_vencimento::date,
+               titulo, valor_total, pago
+        FROM boletos
+        WHERE id = %s
+        """,
+        (bill_id,),
+    )
+
+
+def sync_fixed_account(account_id, since):
+    """Regera os lançamentos de uma conta fixa a partir de um mês.
+
+    Os lançamentos são copiados de contas_fixas_mensais; meses anteriores a
+    since permanecem inalterados.
+
+    Args:
+        account_id (int): ID da conta fixa.
+        since (date): Primeiro mês de competência sincronizado.
+    """
+    remove_entries("conta_fixa", account_id, since)
+    execute_update(
+        """
+        INSERT INTO lancamentos
+            (usuario_id, origem, origem_id, parcela, competencia, vencimento,
+             descricao, valor, pago)
+        SELECT usuario_id, 'conta_fixa', conta_id, 1, mes, mes, titulo, valor, pago
+        FROM contas_fixas_mensais
+        WHERE conta_id = %s AND mes >= %s
+        """,
+        (account_id, since),
+    )
+
+
+def set_entry_paid(origin, origin_id, month, paid):
+    """Atualiza o status de pagamento dos lançamentos de um item em um mês.
+
+    Args:
+        origin (str): "cartao", "boleto" ou "conta_fixa".
+        origin_id (int): ID do item na tabela de origem.
+        month (date): Qualquer data do mês de competência.
+        paid (bool): Novo status de pagamento.
+    """
+    execute_update(
+        """
+        UPDATE lancamentos SET pago = %s
+        WHERE origem = %s AND origem_id = %s
+          AND competencia = date_trunc('month', %s::date)
+        """,
+        (paid, origin, origin_id, month),
+    )
+
+
+def get_monthly_totals(user_id, months):
+    """Totaliza os lançamentos de um usuário por mês e categoria.
+
+    O intervalo entre o menor e o maior mês informados restringe a
+    consulta às partições do período.
+
+    Args:
+        user_id (int): ID do usuário.
+        months (list[tuple[int, int]]): Lista de pares (ano, mês).
+
+    Returns:
+        dict: Dicionário {(ano, mês): {origem: total}} com todas as origens
+            de ORIGINS, zeradas quando não há lançamentos.
+
+    Example:
+        >>> get_monthly_totals(1, [(2025, 1)])
+        {(2025, 1): {'cartao': Decimal('320.00'), 'boleto': 0, 'conta_fixa': 0}}
+    """
+    totals = {(ano, mes): dict.fromkeys(ORIGINS, 0) for ano, mes in months}
+    if not months:
+        return totals
+
+    first = min(f"{ano:04d}-{mes:02d}-01" for ano, mes in months)
+    last = max(f"{ano:04d}-{mes:02d}-01" for ano, mes in months)
+    rows = execute_query(GET_MONTHLY_TOTALS, (user_id, first, last))
+    for month, origin, value in rows or []:
+        key = (month.year, month.month)
+        if key in totals:
+            totals[key][origin] = value
+    return totals
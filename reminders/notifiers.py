@@ -0,0 +1,77 @@
+"""Módulo de canais de envio dos lembretes de vencimento.
+
+Os lembretes são entregues por um notificador plugável, escolhido pela
+variável de ambiente REMINDER_NOTIFIER.
+
+Componentes principais:
+    - SmsNotifier: Envio por SMS, reutilizando auth.authentication.send_sms
+    - StubNotifier: Backend local que apenas registra as mensagens em log
+    - get_notifier: Retorna o notificador configurado
+
+Configuração:
+    - REMINDER_NOTIFIER: "sms" ou "stub" (padrão: "stub")
+"""
+
+import logging
+import os
+from auth.authentication import send_sms
+
+logger = logging.getLogger(__name__)
+
+
+class SmsNotifier:
+    """Notificador que envia os lembretes por SMS via Twilio."""
+
+    def send(self, phone, message):
+        """Envia a mensagem para o telefone informado.
+
+        Args:
+            phone (str): Telefone do destinatário, com código do país.
+            message (str): Corpo da mensagem.
+        """
+        send_sms(phone, message)
+
+
+class StubNotifier:
+    """Notificador local que registra as mensagens sem enviá-las.
+
+    Útil em desenvolvimento, testes e benchmarks. As mensagens ficam
+    disponíveis no atributo sent.
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, phone, message):
+        """Registra a mensagem em log e na lista sent.
+
+        Args:
+            phone (str): Telefone do destinatário.
+            message (str): Corpo da mensagem.
+        """
+        self.sent.append((phone, message))
+        logger.info(f"Lembrete para {phone}: {message}")
+
+
+NOTIFIERS = {
+    "sms": SmsNotifier,
+    "stub": StubNotifier,
+}
+
+
+def get_notifier(name=None):
+    """Cria o notificador configurado.
+
+    Args:
+        name (str, optional): Nome do notificador. Padrão é REMINDER_NOTIFIER.
+
+    Returns:
+        SmsNotifier | StubNotifier: Instância do notificador.
+
+    Raises:
+        ValueError: Se o nome não corresponder a um notificador conhecido.
+    """
+    name = name or os.getenv("REMINDER_NOTIFIER", "stub")
+    if name not in NOTIFIERS:
+        raise ValueError(f"Notificador desconhecido: {name}")
+    return NOTIFIERS[name]()
@@ -0,0 +1,127 @@
+"""Módulo de consultas dos lembretes de vencimento.
+
+Este módulo seleciona, em uma única consulta para todos os usuários, os
+boletos pendentes e as parcelas de cartão de crédito que vencem nos
+próximos dias, registrando-os no log de lembretes enviados.
+
+Componentes principais:
+    - claim_due_reminders: Reserva e retorna os lembretes ainda não enviados
+    - release_reminders: Libera lembretes cujo envio falhou
+    - purge_sent_reminders: Remove registros antigos do log de envios
+
+Funcionalidades:
+    * Consulta baseada em conjuntos, sem consultas por usuário
+    * Idempotência garantida pela chave (tipo, item_id, vencimento) do log,
+      inclusive com vários agendadores em execução simultânea
+
+Dependências:
+    - db.conn.execute_update: Para as operações de escrita com RETURNING
+"""
+
+from db.conn import execute_update
+
+
+def claim_due_reminders(days):
+    """Reserva os lembretes de vencimentos dos próximos dias ainda não enviados.
+
+    Os itens que vencem entre hoje e hoje + days são inseridos no log de
+    lembretes com ON CONFLICT DO NOTHING; apenas os itens efetivamente
+    inseridos por esta chamada são retornados. Assim, cada vencimento gera
+    um único lembrete, mesmo com execuções repetidas ou concorrentes.
+    Parcelas de cartão vencem mensalmente a partir de dia_vencimento.
+
+    Args:
+        days (int): Janela, em dias a partir de hoje, dos vencimentos.
+
+    Returns:
+        list[tuple]: Tuplas ordenadas por usuário e vencimento contendo:
+            (usuario_id, telefone, tipo, item_id, titulo, valor, vencimento)
+
+    Example:
+        >>> claim_due_reminders(3)
+    """
+    return (
+        execute_update(
+            """
+            WITH devidos AS (
+                SELECT 'boleto' AS tipo, b.id AS item_id,
+                       b.data_vencimento::date AS vencimento,
+                       b.usuario_id, b.titulo, b.valor_total AS valor
+                FROM boletos b
+                WHERE b.pago = FALSE
+                  AND b.data_vencimento >= CURRENT_DATE
+                  AND b.data_vencimento < CURRENT_DATE + %s + 1
+                UNION ALL
+                SELECT 'cartao', c.id,
+                       (c.dia_vencimento + p.k * INTERVAL '1 month')::date,
+                       c.usuario_id,
+                       c.nome_conta || ' (' || (p.k + 1) || '/' || c.num_parcelas || ')',
+                       c.valor_parcela
+                FROM cartoes_credito c
+                CROSS JOIN LATERAL generate_series(0, c.num_parcelas - 1) AS p(k)
+                WHERE c.dia_vencimento + (c.num_parcelas - 1) * INTERVAL '1 month'
+                      >= CURRENT_DATE
+                  AND c.dia_vencimento < CURRENT_DATE + %s + 1
+                  AND c.dia_vencimento + p.k * INTERVAL '1 month' >= CURRENT_DATE
+                  AND c.dia_vencimento + p.k * INTERVAL '1 month'
+                      < CURRENT_DATE + %s + 1
+            ),
+            reservados AS (
+                INSERT INTO lembretes_enviados (tipo, item_id, vencimento, usuario_id)
+                SELECT d.tipo, d.item_id, d.vencimento, d.usuario_id
+                FROM devidos d
+                JOIN usuarios u ON u.id = d.usuario_id
+                WHERE u.telefone IS NOT NULL AND u.telefone <> ''
+                ON CONFLICT DO NOTHING
+                RETURNING tipo, item_id, vencimento
+            )
+            SELECT d.usuario_id, u.telefone, d.tipo, d.item_id, d.titulo, d.valor,
+                   d.vencimento
+            FROM reservados r
+            JOIN devidos d USING (tipo, item_id, vencimento)
+            JOIN usuarios u ON u.id = d.usuario_id
+            ORDER BY d.usuario_id, d.vencimento;
+            """,
+            (days, days, days),
+            returning=True,
+        )
+        or []
+    )
+
+
+def release_reminders(keys):
+    """Remove do log os lembretes cujo envio falhou, para nova tentativa.
+
+    Args:
+        keys (list[tuple]): Tuplas (tipo, item_id, vencimento).
+
+    Example:
+        >>> release_reminders([("boleto", 10, date(2025, 3, 5))])
+    """
+    if not keys:
+        return
+    execute_update(
+        """
+        DELETE FROM lembretes_enviados
+        WHERE (tipo, item_id, vencimento) IN (
+            SELECT * FROM unnest(%s::text[], %s::int[], %s::date[])
+        );
+        """,
+        (
+            [key[0] for key in keys],
+            [key[1] for key in keys],
+            [key[2] for key in keys],
+        ),
+    )
+
+
+def purge_sent_reminders(keep_days=30):
+    """Remove do log os lembretes de vencimentos antigos.
+
+    Args:
+        keep_days (int, optional): Dias de histórico mantidos após o vencimento.
+    """
+    execute_update(
+        "DELETE FROM lembretes_enviados WHERE vencimento < CURRENT_DATE - %s;",
+        (keep_days,),
+    )
@@ -0,0 +1,106 @@
+"""Agendador de lembretes de boletos e parcelas de cartão a vencer.
+
+Processo independente da aplicação Streamlit que, periodicamente, reserva
+em uma única consulta os vencimentos dos próximos dias de todos os usuários
+e envia um lembrete agrupado por usuário pelo notificador configurado.
+
+Componentes principais:
+    - build_message: Monta o texto do lembrete de um usuário
+    - run_once: Executa um ciclo de reserva e envio
+    - main: Linha de comando com execução única ou periódica
+
+Exemplos:
+    python -m reminders.scheduler --once --days 3
+    REMINDER_NOTIFIER=sms python -m reminders.scheduler --interval 3600
+"""
+
+import argparse
+import logging
+import sys
+import time
+from itertools import groupby
+from db.conn import dialect, set_workload
+from db.shards import for_each_shard
+from .notifiers import get_notifier
+from .queries import claim_due_reminders, release_reminders, purge_sent_reminders
+
+logger = logging.getLogger(__name__)
+
+TYPE_LABELS = {"boleto": "Boleto", "cartao": "Cartão"}
+
+
+def build_message(items):
+    """Monta o lembrete agrupado com os vencimentos de um usuário.
+
+    Args:
+        items (list[tuple]): Tuplas retornadas por claim_due_reminders.
+
+    Returns:
+        str: Texto do lembrete.
+    """
+    lines = ["Controle Financeiro: vencimentos próximos"]
+    for _, _, kind, _, title, value, due_date in items:
+        lines.append(
+            f"- {TYPE_LABELS.get(kind, kind)} {title}: R$ {value:.2f} "
+            f"em {due_date.strftime('%d/%m/%Y')}"
+        )
+    return "\n".join(lines)
+
+
+def run_once(days, notifier):
+    """Executa um ciclo: reserva os lembretes pendentes e os envia.
+
+    Lembretes cujo envio falha são liberados no log para nova tentativa no
+    próximo ciclo. Com shards configurados, o ciclo percorre cada shard.
+
+    Args:
+        days (int): Janela de vencimentos, em dias a partir de hoje.
+        notifier: Objeto com o método send(phone, message).
+
+    Returns:
+        dict: Quantidade de usuários notificados, itens enviados e falhas.
+    """
+    stats = {"users": 0, "items": 0, "failures": 0}
+    for _ in for_each_shard():
+        purge_sent_reminders()
+        reminders = claim_due_reminders(days)
+
+        for _, user_items in groupby(reminders, key=lambda row: row[0]):
+            user_items = list(user_items)
+            try:
+                notifier.send(user_items[0][1], build_message(user_items))
+                stats["users"] += 1
+                stats["items"] += len(user_items)
+            except Exception as e:
+                logger.error(f"Erro ao enviar lembrete ao usuário {user_items[0][0]}: {e}")
+                release_reminders([(row[2], row[3], row[6]) for row in user_items])
+                stats["failures"] += 1
+    return stats
+
+
+def main(argv=None):
+    """Executa o agendador uma vez ou em intervalos regulares."""
+    parser = argparse.ArgumentParser(prog="python -m reminders.scheduler")
+    parser.add_argument("--days", type=int, default=3, help="Janela de vencimentos")
+    parser.add_argument("--interval", type=int, default=3600, help="Segundos entre ciclos")
+    parser.add_argument("--notifier", help="sms ou stub (padrão: REMINDER_NOTIFIER)")
+    parser.add_argument("--once", action="store_true", help="Executa um único ciclo")
+    args = parser.parse_args(argv)
+
+    if dialect() == "sqlite":
+        sys.exit("O agendador de lembretes não é suportado com DB_BACKEND=sqlite.")
+
+    logging.basicConfig(level=logging.INFO)
+    set_workload("batch")
+    notifier = get_notifier(args.notifier)
+
+    while True:
+        stats = run_once(args.days, notifier)
+        logger.info(f"Ciclo de lembretes concluído: {stats}")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,28 @@ Funcionalidades principais:
     - Criação de novos boletos
     - Visualização de boletos existentes
     - Controle de forma de pagamento (parcelado ou à vista)
+    - Edição e exclusão em fragmentos: apenas a linha alterada é reexecutada
+    - Atualização incremental da lista carregada (apenas boletos alterados)
 
 Dependências:
     - streamlit: Para criação da interface web
     - datetime: Para manipulação de datas
-    - .queries: Para operações de banco de dados (save_bill, get_bills, update_bill, delete_bill)
+    - ui.fragments: Para reexecutar apenas a linha alterada (rerun_fragment)
+    - .queries: Para operações de banco de dados (save_bill, get_bill_changes, update_bill, delete_bill)
 
 Exceções:
     - Erros de validação para campos obrigatórios
+    - Erros do banco de dados nas escritas, exibidos na página (st.error)
     - Erros de sessão para usuários não logados
 """
 
 import streamlit as st
+from admin.profiler import section
 from datetime import datetime, timedelta
-from .queries import save_bill, get_bills, update_bill, delete_bill
+from db.changes import merge_changes
+from db.conn import QueryTimeoutError
+from ui.fragments import fragment, rerun_fragment
+from .queries import save_bill, get_bill_changes, update_bill, delete_bill
 
 
 def slips_page():
@@ -88,26 +96,62 @@ def slips_page():
                 if st.session_state.installment and not installments:
                     st.error("Informe o número de parcelas!")
                 else:
-                    save_bill(
-                        user_id,
-                        title,
-                        total_value,
-                        due_date,
-                        st.session_state.installment,
-                        installments,
-                    )
-                    st.session_state.installment = False
-                    st.session_state.pop("bills", None)
-                    st.rerun()
+                    try:
+                        bill = save_bill(
+                            user_id,
+                            title,
+                            total_value,
+                            due_date,
+                            st.session_state.installment,
+                            installments,
+                        )
+                        st.session_state.installment = False
+                        replace_bill(bill[0], bill)
+                        st.rerun()
+                    except QueryTimeoutError as e:
+                        st.warning(f"⏳ {e}")
+                    except Exception as e:
+                        st.error(f"Erro ao salvar o boleto: {e}")
+
+    # Carrega a lista na primeira visita e, nas seguintes, apenas as alterações
+    with section("Consulta de boletos"):
+        refresh_bills(user_id)
+    bills = st.session_state.bills
 
-    bills = []
+    with section("Listagem de boletos"):
+        display_bills(bills)
 
-    # Verifica se os dados já estão armazenados na sessão
-    if "bills" not in st.session_state:
-        st.session_state.bills = get_bills(user_id)
-    bills = st.session_state.bills
 
-    display_bills(bills)
+def refresh_bills(user_id):
+    """Carrega ou atualiza incrementalmente a lista de boletos da sessão.
+
+    Na primeira visita todos os boletos são lidos; nas seguintes, apenas os
+    alterados ou excluídos desde a última leitura (bills_watermark), inclusive
+    fora desta sessão. Se a marca d'água expirou, a lista é recarregada.
+
+    Args:
+        user_id (int): ID do usuário logado.
+    """
+    watermark = None
+    if st.session_state.get("bills") is not None:
+        watermark = st.session_state.get("bills_watermark")
+
+    try:
+        changes = get_bill_changes(user_id, watermark)
+        if changes is None:
+            watermark = None
+            changes = get_bill_changes(user_id, None)
+    except Exception as e:
+        st.error(f"Erro ao carregar os boletos: {e}")
+        st.session_state.setdefault("bills", [])
+        return
+
+    rows, deleted, st.session_state.bills_watermark = changes
+    if watermark is None:
+        st.session_state.bills = rows
+    elif rows or deleted:
+        st.session_state.bills = merge_changes(st.session_state.bills, rows, deleted)
+        st.session_state.pop("upcoming_bills", None)
 
 
 def display_bills(bills):
@@ -133,11 +177,55 @@ def display_bills(bills):
         return
 
     for bill in bills:
-        with st.container(border=True):
-            if st.session_state.get(f"editing_{bill[0]}", False):
-                show_edit_form(bill)
-            else:
-                show_bill_info(bill)
+        bill_row(bill[0])
+
+
+@fragment
+def bill_row(bill_id):
+    """Renderiza um boleto como fragmento independente.
+
+    Edições e exclusões reexecutam apenas este fragmento, lendo o boleto da
+    lista mantida na sessão; o restante da página não é renderizado de novo.
+
+    Args:
+        bill_id (int): ID do boleto a ser exibido.
+    """
+    bill = next((b for b in st.session_state.get("bills") or [] if b[0] == bill_id), None)
+    if bill is None:
+        return
+
+    with st.container(border=True):
+        if st.session_state.get(f"editing_{bill_id}", False):
+            show_edit_form(bill)
+        else:
+            show_bill_info(bill)
+
+
+def replace_bill(bill_id, bill):
+    """Atualiza a lista de boletos da sessão sem consultá-la novamente.
+
+    O boleto retornado pela escrita (RETURNING) substitui o de mesmo ID ou,
+    se for novo, é acrescentado ao final; com bill None o boleto é removido.
+    Se a lista ainda não foi carregada, nada é feito.
+
+    Args:
+        bill_id (int): ID do boleto alterado.
+        bill (tuple | None): Boleto retornado pela escrita, ou None se foi excluído.
+    """
+    st.session_state.pop("upcoming_bills", None)
+    if st.session_state.get("bills") is None:
+        return
+    bills = []
+    found = False
+    for item in st.session_state.bills:
+        if item[0] != bill_id:
+            bills.append(item)
+        elif bill is not None:
+            bills.append(bill)
+            found = True
+    if bill is not None and not found:
+        bills.append(bill)
+    st.session_state.bills = bills
 
 
 def show_bill_info(bill):
@@ -191,13 +279,18 @@ def show_bill_info(bill):
     action_col = cols[5]
     if bill[6]:
         if action_col.button("🗑️", key=f"del_{bill[0]}"):
-            delete_bill(bill[0])
-            st.session_state.pop("bills", None)
-            st.rerun()
+            try:
+                delete_bill(bill[0])
+                replace_bill(bill[0], None)
+                rerun_fragment()
+            except QueryTimeoutError as e:
+                st.warning(f"⏳ {e}")
+            except Exception as e:
+                st.error(f"Erro ao excluir o boleto: {e}")
     else:
         if action_col.button("✏️ Editar", key=f"edit_{bill[0]}"):
             st.session_state[f"editing_{bill[0]}"] = True
-            st.rerun()
+            rerun_fragment()
 
 
 def show_edit_form(bill):
@@ -256,20 +349,25 @@ def show_edit_form(bill):
 
         col1, col2, _ = st.columns([2, 2, 4])
         if col1.form_submit_button("💾 Salvar"):
-            update_bill(
-                bill[0],
-                new_title,
-                new_total,
-                new_due_date,
-                new_installment,
-                new_installments,
-                new_paid,
-                payment_date,
-            )
-            st.session_state[f"editing_{bill[0]}"] = False
-            st.session_state.pop("bills", None)
-            st.rerun()
+            try:
+                updated = update_bill(
+                    bill[0],
+                    new_title,
+                    new_total,
+                    new_due_date,
+                    new_installment,
+                    new_installments,
+                    new_paid,
+                    payment_date,
+                )
+                st.session_state[f"editing_{bill[0]}"] = False
+                replace_bill(bill[0], updated)
+                rerun_fragment()
+            except QueryTimeoutError as e:
+                st.warning(f"⏳ {e}")
+            except Exception as e:
+                st.error(f"Erro ao atualizar o boleto: {e}")
 
         if col2.form_submit_button("❌ Cancelar"):
             st.session_state[f"editing_{bill[0]}"] = False
-            st.rerun()
+            rerun_fragment()
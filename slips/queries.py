@@ -6,19 +6,35 @@ integrando-se com o banco de dados através do módulo db.conn.
 Funcionalidades principais:
     - Criação de novos boletos
     - Recuperação de boletos existentes
+    - Escritas retornam a linha afetada (RETURNING) para atualizar listas em cache
+    - Leitura incremental dos boletos alterados desde uma marca d'água
     - Atualização de informações de boletos
     - Exclusão de boletos
+    - Consulta de boletos vencidos e a vencer (índice parcial de pendentes)
+    - Sincronização com o livro-razão (lancamentos) na mesma transação
 
 Dependências:
     - db.conn.execute_query: Para operações de leitura
     - db.conn.execute_update: Para operações de escrita
+    - ledger.queries: Para sincronizar o lançamento de cada boleto
+    - db.changes.fetch_changes: Para a leitura incremental
 
 Exceções:
     - Propaga exceções de database do db.conn
     - Assume que conexão com banco já está estabelecida
 """
 
-from db.conn import execute_query, execute_update
+from db.changes import fetch_changes
+from db.conn import execute_query, execute_update, prepared, transaction
+from ledger.queries import remove_entries, sync_bill
+
+# Lido a cada abertura da página de boletos: preparado uma vez por conexão
+GET_BILLS = prepared(
+    "get_bills",
+    """SELECT id, titulo, valor_total, data_vencimento,
+              parcelado, num_parcelas, pago, data_pagamento
+       FROM boletos WHERE usuario_id = %s""",
+)
 
 
 def save_bill(user_id, title, total_value, due_date, is_installment, installments):
@@ -33,7 +49,7 @@ def save_bill(user_id, title, total_value, due_date, is_installment, installment
         installments (int): Número de parcelas (0 se não parcelado)
 
     Returns:
-        None: A função não retorna valor mas persiste os dados no banco
+        tuple: Boleto inserido, no mesmo formato de get_bills
 
     Raises:
         DatabaseError: Em caso de falha na operação de inserção
@@ -41,14 +57,20 @@ def save_bill(user_id, title, total_value, due_date, is_installment, installment
     Example:
         >>> save_bill(123, "Aluguel", 1500.0, date(2023, 12, 5), False, 0)
     """
-    execute_update(
-        """
-        INSERT INTO boletos 
-            (usuario_id, titulo, valor_total, data_vencimento, parcelado, num_parcelas)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (user_id, title, total_value, due_date, is_installment, installments),
-    )
+    with transaction():
+        rows = execute_update(
+            """
+            INSERT INTO boletos 
+                (usuario_id, titulo, valor_total, data_vencimento, parcelado, num_parcelas)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING id, titulo, valor_total, data_vencimento,
+                      parcelado, num_parcelas, pago, data_pagamento
+            """,
+            (user_id, title, total_value, due_date, is_installment, installments),
+            returning=True,
+        )
+        sync_bill(rows[0][0])
+    return rows[0]
 
 
 def get_bills(user_id):
@@ -69,11 +91,33 @@ def get_bills(user_id):
         >>> get_bills(123)
         [(1, 'Aluguel', 1500.0, datetime.date(2023, 12, 5), False, 0, False, None)]
     """
-    return execute_query(
-        """SELECT id, titulo, valor_total, data_vencimento, 
-                  parcelado, num_parcelas, pago, data_pagamento 
-           FROM boletos WHERE usuario_id = %s""",
-        (user_id,),
+    return execute_query(GET_BILLS, (user_id,))
+
+
+def get_bill_changes(user_id, since):
+    """Recupera os boletos alterados e excluídos desde uma marca d'água.
+
+    Args:
+        user_id (int): ID do usuário para consulta
+        since (datetime | None): Marca d'água da leitura anterior; None
+            retorna todos os boletos
+
+    Returns:
+        tuple | None: (boletos, ids_excluidos, marca_dagua), com os boletos
+            no mesmo formato de get_bills, ou None se a lista precisar ser
+            recarregada por completo
+
+    Example:
+        >>> bills, deleted, watermark = get_bill_changes(123, None)
+        >>> get_bill_changes(123, watermark)
+        ([], [4], datetime.datetime(2025, 2, 10, 12, 0, tzinfo=...))
+    """
+    return fetch_changes(
+        "boletos",
+        """id, titulo, valor_total, data_vencimento,
+           parcelado, num_parcelas, pago, data_pagamento""",
+        user_id,
+        since,
     )
 
 
@@ -100,7 +144,8 @@ def update_bill(
         payment_date (date): Data efetiva de pagamento
 
     Returns:
-        None: Atualiza o registro no banco sem retornar valor
+        tuple | None: Boleto atualizado, no mesmo formato de get_bills, ou
+            None se o boleto não existir
 
     Raises:
         DatabaseError: Em caso de falha na atualização
@@ -109,29 +154,35 @@ def update_bill(
         - Define payment_date como NULL quando paid=False
         - Atualiza todas as colunas do registro
     """
-    execute_update(
-        """
-        UPDATE boletos SET
-            titulo = %s,
-            valor_total = %s,
-            data_vencimento = %s,
-            parcelado = %s,
-            num_parcelas = %s,
-            pago = %s,
-            data_pagamento = %s
-        WHERE id = %s
-        """,
-        (
-            title,
-            total_value,
-            due_date,
-            is_installment,
-            installments,
-            paid,
-            payment_date,
-            bill_id,
-        ),
-    )
+    with transaction():
+        rows = execute_update(
+            """
+            UPDATE boletos SET
+                titulo = %s,
+                valor_total = %s,
+                data_vencimento = %s,
+                parcelado = %s,
+                num_parcelas = %s,
+                pago = %s,
+                data_pagamento = %s
+            WHERE id = %s
+            RETURNING id, titulo, valor_total, data_vencimento,
+                      parcelado, num_parcelas, pago, data_pagamento
+            """,
+            (
+                title,
+                total_value,
+                due_date,
+                is_installment,
+                installments,
+                paid,
+                payment_date,
+                bill_id,
+            ),
+            returning=True,
+        )
+        sync_bill(bill_id)
+    return rows[0] if rows else None
 
 
 def delete_bill(bill_id):
@@ -150,4 +201,79 @@ def delete_bill(bill_id):
     Warning:
         Esta operação é irreversível e remove definitivamente o registro
     """
-    execute_update("DELETE FROM boletos WHERE id = %s", (bill_id,))
+    with transaction():
+        execute_update("DELETE FROM boletos WHERE id = %s", (bill_id,))
+        remove_entries("boleto", bill_id)
+
+
+def get_upcoming_bills(user_id, days=7, limit=5):
+    """Recupera os boletos pendentes vencidos ou que vencem nos próximos dias.
+
+    A consulta utiliza o índice parcial de boletos não pagos
+    (usuario_id, data_vencimento), sem percorrer o histórico de boletos pagos.
+    A situação e os dias restantes são calculados no próprio banco.
+
+    Args:
+        user_id (int): ID do usuário para consulta
+        days (int): Janela, em dias a partir de hoje, dos boletos a vencer
+        limit (int): Quantidade máxima de boletos retornados
+
+    Returns:
+        list[tuple]: Lista ordenada pelo vencimento com tuplas contendo:
+            (id, titulo, valor_total, data_vencimento, vencido, dias_restantes)
+
+    Example:
+        >>> get_upcoming_bills(123, days=7)
+        [(4, 'Energia', 180.0, datetime.datetime(2025, 2, 10, 0, 0), True, -2)]
+    """
+    return execute_query(
+        """SELECT id, titulo, valor_total, data_vencimento,
+                  data_vencimento < CURRENT_DATE AS vencido,
+                  data_vencimento::date - CURRENT_DATE AS dias_restantes
+           FROM boletos
+           WHERE usuario_id = %s
+             AND pago = FALSE
+             AND data_vencimento < CURRENT_DATE + %s + 1
+           ORDER BY data_vencimento
+           LIMIT %s""",
+        (user_id, days, limit),
+    )
+
+
+def count_pending_bills(user_id, days=7):
+    """Conta e totaliza os boletos pendentes vencidos e a vencer.
+
+    Args:
+        user_id (int): ID do usuário para consulta
+        days (int): Janela, em dias a partir de hoje, dos boletos a vencer
+
+    Returns:
+        dict: Dicionário com as chaves vencidos, valor_vencidos, a_vencer e
+            valor_a_vencer
+
+    Example:
+        >>> count_pending_bills(123)
+        {'vencidos': 1, 'valor_vencidos': 180.0, 'a_vencer': 2, 'valor_a_vencer': 530.0}
+    """
+    result = execute_query(
+        """SELECT COUNT(*) FILTER (WHERE data_vencimento < CURRENT_DATE),
+                  COALESCE(SUM(valor_total)
+                           FILTER (WHERE data_vencimento < CURRENT_DATE), 0),
+                  COUNT(*) FILTER (WHERE data_vencimento >= CURRENT_DATE),
+                  COALESCE(SUM(valor_total)
+                           FILTER (WHERE data_vencimento >= CURRENT_DATE), 0)
+           FROM boletos
+           WHERE usuario_id = %s
+             AND pago = FALSE
+             AND data_vencimento < CURRENT_DATE + %s + 1""",
+        (user_id, days),
+    )
+    overdue, overdue_value, due_soon, due_soon_value = (
+        result[0] if result else (0, 0, 0, 0)
+    )
+    return {
+        "vencidos": overdue,
+        "valor_vencidos": overdue_value,
+        "a_vencer": due_soon,
+        "valor_a_vencer": due_soon_value,
+    }
@@ -19,6 +19,9 @@ Funcionalidades:
 import streamlit as st
 from datetime import datetime
 from .queries import search_user_info
+from slips.queries import get_upcoming_bills, count_pending_bills
+
+UPCOMING_DAYS = 7
 
 
 def summary_page():
@@ -78,8 +81,14 @@ def summary_page():
 
     mostrar_valores = st.checkbox("👁️ Mostrar valores", value=False)
 
+    # O cache é descartado ao trocar de período, pois a renda é resolvida por mês
+    if st.session_state.get("dados_financeiros_periodo") != (mes, ano):
+        st.session_state.pop("dados_financeiros", None)
+        st.session_state.dados_financeiros_periodo = (mes, ano)
+
     if st.button("Atualizar Dados"):
         st.session_state.pop("dados_financeiros", None)
+        st.session_state.pop("upcoming_bills", None)
         dados = search_user_info(user_id, mes, ano)
         st.session_state.dados_financeiros = dados
     else:
@@ -132,6 +141,8 @@ def summary_page():
         st.write("🏠 **Contas Fixas**")
         st.write(formatar_valor(dados["gastos_contas_fixas"]))
 
+    show_upcoming_payments(user_id, formatar_valor)
+
     st.markdown("---")
     if saldo_restante > 0:
         st.success("🎉 Você está dentro do orçamento!")
@@ -139,3 +150,54 @@ def summary_page():
         st.error(
             "⚠️ Atenção! Você está gastando mais do que sua renda. Considere revisar seus gastos."
         )
+
+
+def show_upcoming_payments(user_id, formatar_valor):
+    """Exibe os contadores e a lista compacta de próximos pagamentos.
+
+    Os dados vêm de consultas sobre o índice parcial de boletos pendentes e
+    ficam em cache na sessão até que algum boleto seja alterado ou os dados
+    sejam atualizados manualmente.
+
+    Args:
+        user_id (int): ID do usuário logado
+        formatar_valor (callable): Função de formatação com controle de visibilidade
+
+    Returns:
+        None: A função não retorna valor, mas atualiza a interface do Streamlit.
+    """
+    if "upcoming_bills" not in st.session_state:
+        st.session_state.upcoming_bills = {
+            "counts": count_pending_bills(user_id, UPCOMING_DAYS),
+            "bills": get_upcoming_bills(user_id, UPCOMING_DAYS) or [],
+        }
+    counts = st.session_state.upcoming_bills["counts"]
+    bills = st.session_state.upcoming_bills["bills"]
+
+    st.subheader("📅 Próximos Pagamentos")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            "⚠️ Boletos vencidos",
+            counts["vencidos"],
+            formatar_valor(counts["valor_vencidos"]),
+            delta_color="off",
+        )
+    with col2:
+        st.metric(
+            f"⏳ A vencer em {UPCOMING_DAYS} dias",
+            counts["a_vencer"],
+            formatar_valor(counts["valor_a_vencer"]),
+            delta_color="off",
+        )
+
+    for _, title, value, due_date, overdue, days_remaining in bills:
+        situation = (
+            f"Atraso: {abs(days_remaining)} dias"
+            if overdue
+            else "Vence hoje" if days_remaining == 0 else f"{days_remaining} dias"
+        )
+        st.write(
+            f"{'🔴' if overdue else '🟡'} **{title}** — "
+            f"{due_date.strftime('%d/%m/%Y')} · {formatar_valor(value)} · {situation}"
+        )
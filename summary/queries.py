@@ -1,15 +1,15 @@
 """Módulo de operações financeiras em banco de dados.
 
 Este módulo fornece funcionalidades para:
-- Verificar estado de tabelas no banco de dados
 - Recuperar informações financeiras consolidadas de usuários
 
 Componentes principais:
-    - table_is_empty: Verifica se tabela está vazia
     - search_user_info: Obtém dados financeiros consolidados
 
 Dependências:
-    - db.conn.execute_query: Função para execução de queries SQL
+    - income.queries.get_income_for_months: Renda vigente no mês consultado
+    - fixedaccounts.queries.ensure_fixed_account_entries: Lançamentos das contas fixas
+    - ledger.queries.get_monthly_totals: Gastos do mês por categoria no livro-razão
     - datetime: Para manipulação de datas
 
 Exceções:
@@ -17,29 +17,10 @@ Exceções:
     - As funções retornam valores padrão (0) em caso de dados ausentes
 """
 
-from db.conn import execute_query
 from datetime import datetime
-
-
-def table_is_empty(table_name):
-    """Verifica se uma tabela específica está vazia no banco de dados.
-
-    Args:
-        table_name (str): Nome da tabela a ser verificada
-
-    Returns:
-        bool: True se a tabela estiver vazia, False caso contrário
-
-    Raises:
-        DatabaseError: Se ocorrer erro na query (propagado de execute_query)
-
-    Exemplo:
-        >>> table_is_empty("usuarios")
-        True
-    """
-    query = f"SELECT COUNT(*) FROM {table_name}"
-    result = execute_query(query)
-    return result[0][0] == 0
+from fixedaccounts.queries import ensure_fixed_account_entries
+from income.queries import get_income_for_months
+from ledger.queries import get_monthly_totals
 
 
 def search_user_info(usuario_id, mes=None, ano=None):
@@ -66,13 +47,16 @@ def search_user_info(usuario_id, mes=None, ano=None):
             }
 
     Lógica:
-        1. Verifica se tabelas relevantes estão vazias
-        2. Busca renda do usuário na tabela Renda
-        3. Calcula gastos por categoria (cartões, boletos, contas fixas)
+        1. Busca a renda vigente no mês a partir do histórico de renda
+        2. Gera os lançamentos das contas fixas do mês, apenas se ainda não
+           existirem (a verificação é uma leitura)
+        3. Calcula gastos por categoria (cartões, boletos, contas fixas) em
+           uma única consulta ao livro-razão; cada parcela de cartão conta
+           no mês do seu vencimento
         4. Retorna valores consolidados
 
     Notas:
-        - Retorna valores zerados se todas tabelas estiverem vazias
+        - Retorna valores zerados para usuários sem lançamentos no mês
         - Usa data atual como fallback para mês/ano não informados
         - Valores nulos no banco são convertidos para 0
 
@@ -85,56 +69,15 @@ def search_user_info(usuario_id, mes=None, ano=None):
     if ano is None:
         ano = datetime.now().year
 
-    if (
-        table_is_empty("Renda")
-        and table_is_empty("cartoes_credito")
-        and table_is_empty("boletos")
-        and table_is_empty("contas_fixas")
-    ):
-        return {
-            "renda_mensal": 0,
-            "gastos_cartao": 0,
-            "gastos_boletos": 0,
-            "gastos_contas_fixas": 0,
-        }
-
-    renda_query = "SELECT valor FROM Renda WHERE user_id = %s"
-    renda = execute_query(renda_query, (usuario_id,))
-    renda_mensal = renda[0][0] if renda else 0
-
-    gastos_cartao = 0
-    if not table_is_empty("cartoes_credito"):
-        cartao_query = """
-            SELECT SUM(valor_parcela) 
-            FROM cartoes_credito 
-            WHERE usuario_id = %s 
-              AND EXTRACT(MONTH FROM dia_vencimento) = %s
-              AND EXTRACT(YEAR FROM dia_vencimento) = %s
-        """
-        result = execute_query(cartao_query, (usuario_id, mes, ano))
-        gastos_cartao = result[0][0] if result and result[0][0] else 0
-
-    gastos_boletos = 0
-    if not table_is_empty("boletos"):
-        boletos_query = """
-            SELECT SUM(valor_total) 
-            FROM boletos 
-            WHERE usuario_id = %s 
-              AND EXTRACT(MONTH FROM data_vencimento) = %s
-              AND EXTRACT(YEAR FROM data_vencimento) = %s
-        """
-        result = execute_query(boletos_query, (usuario_id, mes, ano))
-        gastos_boletos = result[0][0] if result and result[0][0] else 0
-
-    gastos_contas_fixas = 0
-    if not table_is_empty("contas_fixas"):
-        contas_fixas_query = """
-            SELECT SUM(valor_total) 
-            FROM contas_fixas 
-            WHERE usuario_id = %s
-        """
-        result = execute_query(contas_fixas_query, (usuario_id,))
-        gastos_contas_fixas = result[0][0] if result and result[0][0] else 0
+    renda_mensal = get_income_for_months(usuario_id, [(ano, mes)]).get((ano, mes), 0)
+
+    # Gera os lançamentos ausentes das contas fixas do mês antes da consulta
+    # ao livro-razão; sem escrita (e sem fixar a sessão no primário) se já existirem
+    ensure_fixed_account_entries(usuario_id, [(ano, mes)])
+    gastos = get_monthly_totals(usuario_id, [(ano, mes)])[(ano, mes)]
+    gastos_cartao = gastos["cartao"]
+    gastos_boletos = gastos["boleto"]
+    gastos_contas_fixas = gastos["conta_fixa"]
 
     return {
         "renda_mensal": renda_mensal,
@@ -0,0 +1,71 @@
+"""Utilitários para as linhas das listas renderizadas como fragmentos Streamlit.
+
+As linhas de boletos, cartões e contas fixas são fragmentos (@st.fragment):
+uma edição ou exclusão reexecuta apenas a linha afetada. O mesmo fragmento,
+porém, também é executado durante as execuções completas do app.py (por
+exemplo, na primeira renderização da página ou no AppTest), quando o
+Streamlit não permite st.rerun(scope="fragment").
+
+Componentes principais:
+    - fragment: Declara um fragmento que exibe o aviso de tempo limite das
+      consultas (QueryTimeoutError), como o app.py nas execuções completas
+    - rerun_fragment: Reexecuta o fragmento atual ou, fora de uma
+      reexecução de fragmento, o app inteiro
+
+Dependências:
+    - streamlit: Para o controle das reexecuções
+    - db.conn: Para o erro de tempo limite das consultas
+"""
+
+import functools
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from db.conn import QueryTimeoutError
+
+
+def fragment(func):
+    """Declara uma função como fragmento Streamlit (@st.fragment).
+
+    As reexecuções de um fragmento não passam pelo app.py e, portanto, pelo
+    seu tratamento de QueryTimeoutError; o aviso é exibido aqui, no lugar do
+    fragmento, sem interromper a sessão.
+
+    Args:
+        func (callable): Função que renderiza o fragmento.
+
+    Returns:
+        callable: Fragmento que exibe o aviso de tempo limite.
+
+    Example:
+        >>> @fragment
+        >>> def bill_row(bill_id):
+        >>>     ...
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except QueryTimeoutError as e:
+            st.warning(f"⏳ {e}")
+
+    return st.fragment(wrapper)
+
+
+def rerun_fragment():
+    """Reexecuta apenas o fragmento atual, quando possível.
+
+    Durante uma reexecução do fragmento, apenas ele é executado novamente;
+    se o fragmento está sendo executado como parte de uma execução completa
+    do app.py, o app inteiro é reexecutado.
+
+    Example:
+        >>> if st.button("✏️ Editar"):
+        >>>     st.session_state["editing_1"] = True
+        >>>     rerun_fragment()
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        st.rerun(scope="fragment")
+    else:
+        st.rerun()